@@ -0,0 +1,78 @@
+"""
+Benchmark the PHD2 guide log parser of GuidingSessionData on a synthetic log.
+
+Usage (from the repository root):
+    python benchmarks/bench_parseGuidingLog.py [size of the log in MB]
+
+The log (1 GB by default) is generated into a temporary directory: sections of one hour of 2 s guiding frames,
+with a dither every 5 minutes.
+"""
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from GuidingData import GuidingSessionData  # noqa: E402
+
+SECTIONHEADER = """Dither = both axes, Dither scale = 1.000, Image noise reduction = none, Guide-frame time lapse = 0, \
+Server enabled
+Pixel scale = 3.87 arc-sec/px, Binning = 1, Focal length = 200 mm
+Exposure = 2000 ms
+RA Guide Speed = 7.5 a-s/s, Dec Guide Speed = 7.5 a-s/s, Cal Dec = 10.1, Last Cal Issue = None, Timestamp = 2024-01-10 20:30:00
+Frame,Time,mount,dx,dy,RARawDistance,DECRawDistance,RAGuideDistance,DECGuideDistance,RADuration,RADirection,DECDuration,DECDirection,XStep,YStep,StarMass,SNR,ErrorCode
+"""
+
+
+def createSection(day, hour):
+    lines = ["Guiding Begins at 2024-01-%02i %02i:00:00\r\n" % (day, hour), SECTIONHEADER.replace("\n", "\r\n")]
+    for frame in range(1, 1801):
+        if frame % 150 == 0:
+            lines.append("INFO: DITHER by 1.234, -0.567, new lock pos = 641.334, 479.633\r\n")
+            lines.append("INFO: SETTLING STATE CHANGE, Settling started\r\n")
+        if frame % 150 == 5:
+            lines.append("INFO: SETTLING STATE CHANGE, Settling complete\r\n")
+        d = ((frame * 7919) % 200 - 100) / 250.0
+        lines.append('%i,%.3f,"Mount",%.3f,%.3f,%.3f,%.3f,%.3f,%.3f,%i,W,%i,N,,,%i,%.2f,0\r\n'
+                     % (frame, frame * 2.0, d, -d, d, -d, d * 0.7, -d * 0.7, abs(d) * 100, abs(d) * 50,
+                        12000 + frame % 500, 30.0 + frame % 10))
+    lines.append("Guiding Ends at 2024-01-%02i %02i:59:59\r\n\r\n" % (day, hour))
+    return "".join(lines)
+
+
+def createLog(fname, size):
+    written = 0
+    sections = 0
+    with open(fname, "w", newline="") as file:
+        file.write("PHD2 version 2.6.11, Log version 2.5. Log enabled at 2024-01-01 18:00:00\r\n\r\n")
+        while written < size:
+            text = createSection(1 + (sections // 24) % 28, sections % 24)
+            file.write(text)
+            written += len(text)
+            sections += 1
+    return sections
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+
+    with tempfile.TemporaryDirectory() as folder:
+        fname = os.path.join(folder, "PHD2_GuideLog_synthetic.txt")
+        print("Generating %i MB guide log in %s" % (size, folder))
+        sections = createLog(fname, size * 1024 * 1024)
+        mb = os.path.getsize(fname) / 1024 / 1024
+
+        data = GuidingSessionData()
+        start = time.perf_counter()
+        data.readGuidingSessionData(fname)
+        elapsed = time.perf_counter() - start
+
+        print("sections  frames     MB   seconds    MB/s  max RSS MB")
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print("%8i %7i %6.0f %9.2f %7.1f %11.0f" % (sections, data.count(), mb, elapsed, mb / elapsed, rss))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark the header scan of SessionData.parseLightFrames against the number of worker processes.
+
+Usage (from the repository root):
+    python benchmarks/bench_parseLightFrames.py [number of frames] [max workers]
+
+Synthetic light frames (header plus a small data unit) are generated into a temporary directory.
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from astropy.io import fits
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from SessionData import SessionData  # noqa: E402
+
+
+def createFrames(folder, count):
+    header = fits.getheader(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'testdata', 'fits', 'LIGHT.fits'))
+    data = np.zeros((64, 64), dtype=np.uint16)
+    filenames = []
+    for i in range(count):
+        header['DATE-LOC'] = '2024-01-%02iT%02i:%02i:%02i.000' % (10 + i // 86400, (i // 3600) % 24, (i // 60) % 60, i % 60)
+        fname = 'LIGHT_%05i.fits' % i
+        fits.PrimaryHDU(data=data, header=header).writeto(os.path.join(folder, fname))
+        filenames.append(fname)
+    return filenames
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    maxWorkers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+
+    with tempfile.TemporaryDirectory() as folder:
+        print("Generating %i frames in %s" % (count, folder))
+        filenames = createFrames(folder, count)
+
+        workers = 1
+        baseline = None
+        print("workers   seconds   frames/s   speedup")
+        while workers <= maxWorkers:
+            data = SessionData()
+            data.createNew()
+            start = time.perf_counter()
+            data.parseLightFrames(folder, filenames, workers=workers)
+            elapsed = time.perf_counter() - start
+            if baseline is None:
+                baseline = elapsed
+            print("%7i %9.3f %10.0f %9.2f" % (workers, elapsed, count / elapsed, baseline / elapsed))
+            workers *= 2
+
+
+if __name__ == "__main__":
+    main()
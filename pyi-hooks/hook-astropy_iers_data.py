@@ -0,0 +1,4 @@
+from PyInstaller.utils.hooks import collect_data_files
+
+# Bundled IERS and leap second tables, used by AstropyConfig.configureAstropy
+datas = collect_data_files('astropy_iers_data')
@@ -0,0 +1,87 @@
+import logging
+import threading
+
+import numpy as np
+from astropy.time import Time
+from astropy.utils import data, iers
+
+# Measured earth rotation data older than this (days) is reported as stale
+MAXMEASUREDAGE = 180.0
+
+_lock = threading.Lock()
+_status = None
+
+
+def configureAstropy() -> dict:
+    """
+    Configure astropy for offline use and return the status of the bundled IERS tables (see `getIersStatus`).
+
+    Astropy never downloads anything: the IERS-A table (earth rotation with predictions) and the leap second table
+    bundled with the pinned `astropy-iers-data` package are used. Times beyond the table are converted with
+    degraded accuracy and a warning, instead of an error.
+
+    Only the first call configures, it takes about a second to read the table. Later calls return the same status.
+    """
+    global _status
+    with _lock:
+        if _status is not None:
+            return _status
+
+        data.conf.allow_internet = False
+        iers.conf.auto_download = False
+        iers.conf.auto_max_age = None
+        iers.conf.iers_degraded_accuracy = 'warn'
+
+        table = iers.IERS_A.open(iers.IERS_A_FILE)
+        iers.earth_orientation_table.set(table)
+        _status = getIersStatus(table, iers.LeapSeconds.auto_open())
+        return _status
+
+
+def getIersStatus(table, leapSeconds, now=None) -> dict:
+    """
+    Return the dates covered by an IERS-A table and a leap second table (ISO dates) and whether they are stale.
+    """
+    if now is None:
+        now = Time.now()
+    measured = table['MJD'][np.asarray(table['PolPMFlag_A']) == 'I']
+    measuredUntil = Time(measured[-1] if len(measured) > 0 else table['MJD'][0], format='mjd')
+    predictedUntil = Time(table['MJD'][-1], format='mjd')
+    leapSecondsExpire = leapSeconds.expires
+
+    reasons = []
+    if now.mjd - measuredUntil.mjd > MAXMEASUREDAGE:
+        reasons.append("earth rotation data is %i days old" % int(now.mjd - measuredUntil.mjd))
+    if now > predictedUntil:
+        reasons.append("earth rotation predictions ended on " + predictedUntil.iso[:10])
+    if now > leapSecondsExpire:
+        reasons.append("leap second table expired on " + leapSecondsExpire.iso[:10])
+
+    return {'file': str(table.meta.get('data_path', iers.IERS_A_FILE)),
+            'version': _getIersDataVersion(),
+            'measuredUntil': measuredUntil.iso[:10],
+            'predictedUntil': predictedUntil.iso[:10],
+            'leapSecondsExpire': leapSecondsExpire.iso[:10],
+            'stale': len(reasons) > 0,
+            'reasons': reasons}
+
+
+def _getIersDataVersion():
+    try:
+        import astropy_iers_data
+        return astropy_iers_data.__version__
+    except ImportError:
+        return None
+
+
+def logIersStatus(status, log=None) -> None:
+    """
+    Log the IERS status, with a warning if the bundled tables are stale.
+    """
+    if log is None:
+        log = logging.getLogger("AstropyConfig")
+    log.info("IERS data %s: measured until %s, predicted until %s, leap seconds until %s",
+             status['version'], status['measuredUntil'], status['predictedUntil'], status['leapSecondsExpire'])
+    if status['stale']:
+        log.warning("Bundled IERS data is stale (%s), sun and moon positions may be less accurate. "
+                    "Update astropy-iers-data.", "; ".join(status['reasons']))
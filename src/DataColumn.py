@@ -1,5 +1,8 @@
 # declare constants
 INDEX = 'INDEX'
+# Sequence number of the exposure within its night and within its target
+NIGHTINDEX = 'NIGHTINDEX'
+TARGETINDEX = 'TARGETINDEX'
 FNAME = 'FNAME'
 EXPOSURE = 'EXPOSURE'
 EXPSTART = 'EXPSTART'
@@ -61,11 +64,12 @@ GUIDINGMINSNR = 'GUIDING(MINSNR)'
 GUIDINGMAXSNR = 'GUIDING(MAXSNR)'
 GUIDINGRMSSNR = 'GUIDING(RMSSNR)'
 GUIDINGMINSTARMASS = 'GUIDING(MINSTARMASS)'
+# Altitudes at the start of the exposure, float in degree
 MOONALT = 'MOONALT'
 SUNALT = 'SUNALT'
 
 
-Columns = [INDEX, FNAME, EXPSTART, EXPOSURE, GAIN, OFFSET, PIXSIZE, CAMERA,
+Columns = [INDEX, NIGHTINDEX, TARGETINDEX, FNAME, EXPSTART, EXPOSURE, GAIN, OFFSET, PIXSIZE, CAMERA,
            CCDTEMP, CCDSETTEMP, BAYERPAT, TELESCOPE, FOCALLENGTH, FOCRATIO,
            RA, DEC, AZIMUTH, ALTITUDE, AIRMASS, PIERSIDE,
            SITELONG, SITELAT, FILTER, OBJECT, ROTATION,
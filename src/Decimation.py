@@ -0,0 +1,119 @@
+import numpy as np
+
+# Default number of points drawn per pixel of the chart width (a minimum and a maximum)
+POINTSPERPIXEL = 2
+
+
+class MinMaxPyramid:
+    """
+    Level of detail pyramid of a time series for drawing, with the minimum and maximum of each bucket.
+
+    Level 0 holds the samples, level k buckets of 2**k consecutive samples. `query()` picks the coarsest level,
+    which still has at least one bucket per pixel, and returns the minimum and maximum of each bucket in time order.
+    Drawing these keeps all peaks visible, while the number of points is bounded by the width of the chart,
+    regardless of the number of samples. NaN samples (e.g. dropped frames) are ignored in buckets.
+
+    `x` must be sorted.
+    """
+
+    def __init__(self, x, y):
+        self.x = np.empty(0)
+        self.y = np.empty(0)
+        # Per level: (x of minimum, minimum, x of maximum, maximum)
+        self.levels = [(self.x, self.y, self.x, self.y)]
+        self.extend(x, y)
+
+    def extend(self, x, y, start=None):
+        """
+        Replace the samples from index `start` on (append, if None) by `x` and `y`.
+
+        Only the buckets containing replaced samples are computed again, so appending a few samples to a long
+        series is cheap. `x` must stay sorted.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        assert x.shape == y.shape, "x and y must have the same length"
+        if start is None:
+            start = len(self.x)
+        assert 0 <= start <= len(self.x), "start must be within the samples"
+        self.x = np.concatenate((self.x[:start], x))
+        self.y = np.concatenate((self.y[:start], y))
+
+        levels = [(self.x, self.y, self.x, self.y)]
+        while len(levels[-1][1]) > 1:
+            # The buckets before `start` only depend on samples, that did not change
+            start //= 2
+            tail = self._reduceLevel([values[2 * start:] for values in levels[-1]])
+            if len(levels) < len(self.levels):
+                tail = [np.concatenate((values[:start], new)) for values, new in zip(self.levels[len(levels)], tail)]
+            levels.append(tuple(tail))
+        self.levels = levels
+
+    @classmethod
+    def _reduceLevel(cls, level):
+        (xMin, yMin, xMax, yMax) = level
+        if len(yMin) % 2 == 1:
+            # Pad with a copy of the last bucket, which does not change its minimum and maximum
+            (xMin, yMin, xMax, yMax) = (np.append(xMin, xMin[-1]), np.append(yMin, yMin[-1]),
+                                        np.append(xMax, xMax[-1]), np.append(yMax, yMax[-1]))
+        xMin, yMin = cls._reduce(xMin, yMin, np.fmin)
+        xMax, yMax = cls._reduce(xMax, yMax, np.fmax)
+        return [xMin, yMin, xMax, yMax]
+
+    @staticmethod
+    def _reduce(x, y, function):
+        left = y[0::2]
+        right = y[1::2]
+        value = function(left, right)
+        # The left sample wins ties, a NaN loses against any number
+        useLeft = (value == left) | np.isnan(right)
+        return np.where(useLeft, x[0::2], x[1::2]), value
+
+    def __len__(self):
+        return len(self.x)
+
+    def getLevel(self, count, maxPoints):
+        """
+        Return the level to draw `count` samples with at most `maxPoints` points.
+        """
+        level = 0
+        points = count
+        while level + 1 < len(self.levels) and points > maxPoints:
+            level += 1
+            # Two points per bucket, one more bucket, if the range is not aligned
+            points = 2 * ((count >> level) + 1)
+        return level
+
+    def query(self, x1, x2, maxPoints):
+        """
+        Return the (x, y) arrays to draw the samples with x1 <= x <= x2 with at most about `maxPoints` points.
+        """
+        lo = int(np.searchsorted(self.x, x1, side='left'))
+        hi = int(np.searchsorted(self.x, x2, side='right'))
+        if hi <= lo:
+            return np.empty(0), np.empty(0)
+        level = self.getLevel(hi - lo, max(int(maxPoints), 2))
+        if level == 0:
+            return self.x[lo:hi], self.y[lo:hi]
+
+        first = lo >> level
+        last = ((hi - 1) >> level) + 1
+        (xMin, yMin, xMax, yMax) = (values[first:last] for values in self.levels[level])
+        # Both extremes of each bucket, the earlier one first
+        minFirst = xMin <= xMax
+        x = np.empty(2 * len(xMin))
+        y = np.empty(2 * len(xMin))
+        x[0::2] = np.where(minFirst, xMin, xMax)
+        y[0::2] = np.where(minFirst, yMin, yMax)
+        x[1::2] = np.where(minFirst, xMax, xMin)
+        y[1::2] = np.where(minFirst, yMax, yMin)
+        return x, y
+
+
+def findRuns(mask):
+    """
+    Return (start, end) index arrays of the runs of True values in a boolean array, `end` is exclusive.
+    """
+    mask = np.asarray(mask, dtype=bool)
+    edges = np.diff(np.concatenate(([False], mask, [False])).astype(np.int8))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
@@ -0,0 +1,83 @@
+import numpy as np
+from astropy import units as u
+from astropy.coordinates import FK5, SkyCoord
+
+# References of the dither offsets: the first frame, the median position of each target or of each pier side
+REFERENCEFIRST = 'first'
+REFERENCETARGET = 'target'
+REFERENCEPIERSIDE = 'pierside'
+REFERENCES = [REFERENCEFIRST, REFERENCETARGET, REFERENCEPIERSIDE]
+
+# Statistics of the dither steps computed by computeDitherOffsets
+STEPSTATISTICS = ['count', 'mean', 'median', 'min', 'max', 'std']
+
+
+def getPositions(ra, dec) -> SkyCoord:
+    """
+    Return one array valued SkyCoord for arrays of RA and DEC in degree.
+    """
+    return SkyCoord(frame=FK5, ra=np.asarray(ra, dtype=np.float64) * u.degree,
+                    dec=np.asarray(dec, dtype=np.float64) * u.degree)
+
+
+def getReferences(ra, dec, groups=None):
+    """
+    Return the reference position (RA, DEC arrays in degree) of each frame.
+
+    Without `groups` the first frame is the reference of all frames, otherwise the median position of the frames
+    with the same group label. RA is taken relative to the first frame of the group, so that the median works
+    across RA 0h.
+    """
+    ra = np.asarray(ra, dtype=np.float64)
+    dec = np.asarray(dec, dtype=np.float64)
+    if groups is None:
+        return np.full(len(ra), ra[0]), np.full(len(dec), dec[0])
+
+    (labels, group) = np.unique(np.asarray(groups), return_inverse=True)
+    refRa = np.empty(len(labels))
+    refDec = np.empty(len(labels))
+    for i in range(len(labels)):
+        rows = np.flatnonzero(group == i)
+        first = ra[rows[0]]
+        relative = (ra[rows] - first + 180.0) % 360.0 - 180.0
+        refRa[i] = (first + np.nanmedian(relative)) % 360.0
+        refDec[i] = np.nanmedian(dec[rows])
+    return refRa[group], refDec[group]
+
+
+def getStepStatistics(steps) -> dict:
+    """
+    Return `STEPSTATISTICS` of dither steps (arc-sec), missing steps (NaN) are ignored.
+    """
+    steps = np.asarray(steps, dtype=np.float64)
+    steps = steps[~np.isnan(steps)]
+    if len(steps) == 0:
+        return {'count': 0, 'mean': np.nan, 'median': np.nan, 'min': np.nan, 'max': np.nan, 'std': np.nan}
+    return {'count': len(steps), 'mean': float(np.mean(steps)), 'median': float(np.median(steps)),
+            'min': float(np.min(steps)), 'max': float(np.max(steps)), 'std': float(np.std(steps))}
+
+
+def computeDitherOffsets(ra, dec, groups=None) -> dict:
+    """
+    Compute the offsets of the solved positions of the frames from their reference (see `getReferences`)
+    and the steps between consecutive frames, with one transformation for all frames.
+
+    Returns a dict with the arrays `ra` and `dec` (offsets in arc-sec, RA along the great circle),
+    `steps` (angular distance to the previous frame in arc-sec, NaN for the first one) and `statistics`
+    of the steps.
+    """
+    ra = np.asarray(ra, dtype=np.float64)
+    dec = np.asarray(dec, dtype=np.float64)
+    if len(ra) == 0:
+        empty = np.empty(0)
+        return {'ra': empty, 'dec': empty, 'steps': empty, 'statistics': getStepStatistics(empty)}
+
+    positions = getPositions(ra, dec)
+    references = getPositions(*getReferences(ra, dec, groups))
+    (offsetRa, offsetDec) = references.spherical_offsets_to(positions)
+
+    steps = np.full(len(ra), np.nan)
+    if len(ra) > 1:
+        steps[1:] = positions[1:].separation(positions[:-1]).arcsec
+
+    return {'ra': offsetRa.arcsec, 'dec': offsetDec.arcsec, 'steps': steps, 'statistics': getStepStatistics(steps)}
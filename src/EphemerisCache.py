@@ -0,0 +1,187 @@
+import logging
+import math
+import os
+import threading
+
+import numpy as np
+from astropy.coordinates import get_body, get_sun
+
+from Spherical import getEarthLocation, getLocalTime, getMoonAltAzs, getSunAltAzs
+from UserCache import getUserCacheDirectory
+
+# Increment, when the format of the cached files changes
+VERSION = 1
+
+# Spacing of the grid in days. With linear interpolation the error of the altitudes is below 0.01 degree
+GRIDSTEP = 5.0 / 1440.0
+GRIDPOINTS = int(round(1.0 / GRIDSTEP)) + 1
+
+# Sites are rounded to this number of decimals of a degree (about 10 m)
+SITEDECIMALS = 4
+
+EPHEMERISDTYPE = np.dtype([('jd', 'f8'), ('sunAlt', 'f8'), ('sunAz', 'f8'),
+                           ('moonAlt', 'f8'), ('moonAz', 'f8'), ('moonIllumination', 'f8')])
+
+# Columns returned by EphemerisCache.getPositions()
+POSITIONS = ['sunAlt', 'sunAz', 'moonAlt', 'moonAz', 'moonIllumination']
+
+
+def getNightId(jd, lon):
+    """
+    Return the number of the night (noon to noon local mean time) at longitude `lon` (degree, east positive).
+
+    Julian days begin at noon UT, so this is the julian day number in local mean time. Works on arrays.
+    """
+    return np.floor(np.asarray(jd, dtype=np.float64) + np.asarray(lon, dtype=np.float64) / 360.0).astype(np.int64)
+
+
+def getNightStart(night, lon):
+    """
+    Return the julian date of the local mean noon starting the night `night`.
+    """
+    return night - lon / 360.0
+
+
+def computeEphemeris(night, lon, lat):
+    """
+    Compute sun and moon positions for a site on the grid of one night (from noon to noon).
+    """
+    grid = np.zeros(GRIDPOINTS, dtype=EPHEMERISDTYPE)
+    grid['jd'] = getNightStart(night, lon) + np.arange(GRIDPOINTS) * GRIDSTEP
+    sun = getSunAltAzs(grid['jd'], lon, lat)
+    moon = getMoonAltAzs(grid['jd'], lon, lat)
+    grid['sunAlt'] = sun.alt.deg
+    grid['sunAz'] = sun.az.deg
+    grid['moonAlt'] = moon.alt.deg
+    grid['moonAz'] = moon.az.deg
+    grid['moonIllumination'] = getMoonIllumination(grid['jd'], lon, lat)
+    return grid
+
+
+def getMoonIllumination(jd, lon, lat):
+    """
+    Return the illuminated fraction of the moon (0 to 1) from the phase angle sun-moon-observer.
+    """
+    time = getLocalTime(np.asarray(jd, dtype=np.float64), getEarthLocation(lon, lat))
+    sun = get_sun(time)
+    moon = get_body("moon", time)
+    elongation = sun.separation(moon).rad
+    phase = np.arctan2(sun.distance * np.sin(elongation), moon.distance - sun.distance * np.cos(elongation))
+    return (1.0 + np.cos(phase.value)) / 2.0
+
+
+def interpolate(grid, jd):
+    """
+    Linear interpolation of a grid at the julian dates `jd`. Azimuths are interpolated on the shorter arc.
+    """
+    result = dict()
+    for name in POSITIONS:
+        values = grid[name]
+        if name.endswith('Az'):
+            values = np.rad2deg(np.unwrap(np.deg2rad(values)))
+            result[name] = np.mod(np.interp(jd, grid['jd'], values), 360.0)
+        else:
+            result[name] = np.interp(jd, grid['jd'], values)
+    return result
+
+
+class EphemerisCache:
+    """
+    Sun and moon positions of a site, interpolated from a grid with a step of 5 minutes per night.
+
+    The grid of a (site, night) is computed with astropy once, kept in memory and stored as `.npy` file in the
+    user cache directory, so it is reused across sessions. Interpolated altitudes differ less than 0.01 degree from
+    the astropy positions. Azimuths are interpolated as well, but may be less accurate close to the zenith.
+    """
+
+    def __init__(self, directory=None):
+        if directory is None:
+            directory = os.path.join(getUserCacheDirectory(), 'ephemeris')
+        self.directory = str(directory)
+        os.makedirs(self.directory, exist_ok=True)
+        self.grids = dict()
+        self.hits = 0
+        self.misses = 0
+        self.log = logging.getLogger("EphemerisCache")
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _site(lon, lat):
+        return (round(float(lon), SITEDECIMALS), round(float(lat), SITEDECIMALS))
+
+    def _name(self, night, lon, lat):
+        return os.path.join(self.directory, "v%i_%i_%.*f_%.*f.npy" % (VERSION, night, SITEDECIMALS, lon,
+                                                                      SITEDECIMALS, lat))
+
+    def getGrid(self, night, lon, lat):
+        """
+        Return the grid of a night for the site (lon, lat) in degree, computing it if needed.
+        """
+        (lon, lat) = self._site(lon, lat)
+        key = (int(night), lon, lat)
+        with self.lock:
+            grid = self.grids.get(key)
+            if grid is not None:
+                self.hits += 1
+                return grid
+
+        name = self._name(*key)
+        try:
+            grid = np.load(name)
+            if grid.dtype != EPHEMERISDTYPE or len(grid) != GRIDPOINTS:
+                grid = None
+        except (OSError, ValueError) as e:
+            self.log.debug("No ephemeris for %s: %s", name, str(e))
+            grid = None
+
+        hit = grid is not None
+        if not hit:
+            grid = computeEphemeris(*key)
+            try:
+                with open(name + '.tmp', 'wb') as file:
+                    np.save(file, grid)
+                os.replace(name + '.tmp', name)
+            except OSError as e:
+                self.log.warning("Ephemeris cache store failed: %s", str(e))
+
+        with self.lock:
+            self.grids[key] = grid
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return grid
+
+    def getPositions(self, jd, lon, lat) -> dict:
+        """
+        Return sun and moon positions (`POSITIONS`, angles in degree) at the julian dates `jd` for one site.
+        """
+        jd = np.atleast_1d(np.asarray(jd, dtype=np.float64))
+        result = {name: np.full(len(jd), np.nan) for name in POSITIONS}
+        if not (math.isfinite(lon) and math.isfinite(lat)):
+            return result
+        (lon, lat) = self._site(lon, lat)
+        valid = np.isfinite(jd)
+        nights = np.where(valid, getNightId(np.where(valid, jd, 0.0), lon), 0)
+        for night in np.unique(nights[valid]):
+            rows = np.flatnonzero(valid & (nights == night))
+            values = interpolate(self.getGrid(night, lon, lat), jd[rows])
+            for name in POSITIONS:
+                result[name][rows] = values[name]
+        return result
+
+    def getCounts(self) -> tuple[int, int]:
+        return (self.hits, self.misses)
+
+
+_defaultCache = None
+
+
+def getDefaultEphemerisCache() -> EphemerisCache:
+    """
+    Return the ephemeris cache in the user cache directory.
+    """
+    global _defaultCache
+    if _defaultCache is None:
+        _defaultCache = EphemerisCache()
+    return _defaultCache
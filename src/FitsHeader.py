@@ -1,5 +1,273 @@
+import gzip
+import re
+
 from astropy.io import fits
 
+BLOCKSIZE = 2880
+CARDSIZE = 80
+CARDSPERBLOCK = BLOCKSIZE // CARDSIZE
+
+# Cards without a value
+COMMENTARY = frozenset(['COMMENT', 'HISTORY', ''])
+
+FITSEXTENSIONS = ('.fits', '.fit', '.fts')
+# Tile compressed (fpack) files
+FZEXTENSIONS = tuple(ext + '.fz' for ext in FITSEXTENSIONS)
+GZEXTENSIONS = tuple(ext + '.gz' for ext in FITSEXTENSIONS)
+
+# Keywords of a tile compressed image, that hold the keyword of the uncompressed image
+ZKEYWORDS = {'ZSIMPLE': 'SIMPLE', 'ZTENSION': 'XTENSION', 'ZBITPIX': 'BITPIX', 'ZNAXIS': 'NAXIS',
+             'ZEXTEND': 'EXTEND', 'ZBLOCKED': 'BLOCKED', 'ZPCOUNT': 'PCOUNT', 'ZGCOUNT': 'GCOUNT',
+             'ZHECKSUM': 'CHECKSUM', 'ZDATASUM': 'DATASUM'}
+# Keywords of the binary table holding a tile compressed image, which are not part of the image header
+ZTABLEKEYWORDS = frozenset(['XTENSION', 'BITPIX', 'NAXIS', 'PCOUNT', 'GCOUNT', 'TFIELDS', 'THEAP', 'CHECKSUM',
+                            'DATASUM', 'ZIMAGE', 'ZCMPTYPE', 'ZQUANTIZ', 'ZDITHER0', 'ZMASKCMP', 'ZBLANK',
+                            'ZSCALE', 'ZZERO'])
+ZTABLEPATTERN = re.compile(r'(NAXIS|T(TYPE|FORM|UNIT|SCAL|ZERO|NULL|DISP|DIM)|ZTILE|ZNAME|ZVAL)[0-9]+$')
+ZNAXISPATTERN = re.compile(r'ZNAXIS([0-9]+)$')
+
+
+def isFitsFile(name):
+    return name.endswith(FITSEXTENSIONS) or name.endswith(FZEXTENSIONS) or name.endswith(GZEXTENSIONS)
+
+
+def stripFitsExtension(name):
+    """
+    Remove the fits extension from a filename, including the extension of a compressed file (e.g. `.fits.fz`).
+    """
+    if name.endswith(FZEXTENSIONS) or name.endswith(GZEXTENSIONS):
+        name = name[:-3]
+    if name.endswith(FITSEXTENSIONS):
+        name = name.rsplit('.', 1)[0]
+    return name
+
 
 def getFitsHeader(name):
     return fits.getheader(name)
+
+
+def readFitsHeader(name, keys=None):
+    """
+    Read the primary header of a fits file and return its values as a dict of plain python values.
+
+    Only the header blocks up to the `END` card are read, the data unit is never touched.
+    If `keys` is given, only these keywords are parsed and reading stops, as soon as all of them have been found.
+    Keys missing from the header are missing from the result.
+
+    Gzipped files (`.fits.gz`) are decompressed only up to the end of the header.
+    For tile compressed files (`.fits.fz`) the header of the compressed image is returned, as if it was uncompressed.
+
+    Raises OSError, if the file is not a fits file.
+    """
+    name = str(name)
+    if name.endswith(FZEXTENSIONS):
+        with open(name, 'rb') as file:
+            return readCompressedHeader(file, keys)
+    if name.endswith(GZEXTENSIONS):
+        with gzip.open(name, 'rb') as file:
+            return readHeader(file, keys)
+    with open(name, 'rb') as file:
+        return readHeader(file, keys)
+
+
+def readHeader(file, keys=None):
+    """
+    Read one header from a binary file object positioned at the start of a HDU.
+    """
+    if keys is not None:
+        keys = frozenset(keys)
+    return parseCards(iterCards(file), keys)
+
+
+def readCompressedHeader(file, keys=None):
+    """
+    Read the image header of a tile compressed file.
+
+    The primary HDU of such a file is usually empty, its data (if any) is skipped and the header of the first
+    extension is read. If that is not a compressed image, the primary header is returned.
+    """
+    primary = parseCards(iterCards(file))
+    file.seek(dataSize(primary), 1)
+    try:
+        header = parseCards(iterCards(file))
+    except OSError:
+        return project(primary, keys)
+    if header.get('ZIMAGE') is not True:
+        return project(primary, keys)
+    return project(uncompressedHeader(header), keys)
+
+
+def uncompressedHeader(header):
+    """
+    Convert the header of a binary table holding a tile compressed image into the header of the image.
+    """
+    image = dict()
+    # Mandatory keywords first, in the order required for an image
+    for zkey in ['ZSIMPLE', 'ZTENSION', 'ZBITPIX', 'ZNAXIS']:
+        if zkey in header:
+            image[ZKEYWORDS[zkey]] = header[zkey]
+    for axis in range(1, header.get('ZNAXIS', 0) + 1):
+        zkey = 'ZNAXIS%i' % axis
+        if zkey in header:
+            image['NAXIS%i' % axis] = header[zkey]
+
+    for key, value in header.items():
+        if key in ZKEYWORDS:
+            image.setdefault(ZKEYWORDS[key], value)
+        elif key in ZTABLEKEYWORDS or ZTABLEPATTERN.match(key) or ZNAXISPATTERN.match(key):
+            continue
+        elif key == 'EXTNAME' and value == 'COMPRESSED_IMAGE':
+            continue
+        else:
+            image.setdefault(key, value)
+    return image
+
+
+def dataSize(header):
+    """
+    Return the size of the data unit following a header in bytes, including the padding to a full block.
+    """
+    naxis = header.get('NAXIS', 0)
+    if naxis == 0:
+        return 0
+    count = 1
+    for axis in range(1, naxis + 1):
+        count *= header.get('NAXIS%i' % axis, 0)
+    size = abs(header.get('BITPIX', 8)) // 8 * header.get('GCOUNT', 1) * (header.get('PCOUNT', 0) + count)
+    return (size + BLOCKSIZE - 1) // BLOCKSIZE * BLOCKSIZE
+
+
+def project(header, keys):
+    if keys is None:
+        return header
+    return {key: value for key, value in header.items() if key in keys}
+
+
+def iterCards(file):
+    """
+    Yield the 80 character cards of a header, stopping at the `END` card.
+
+    The file is read block by block, so that the file object is left at a block boundary.
+    """
+    first = True
+    while True:
+        block = file.read(BLOCKSIZE)
+        if len(block) < BLOCKSIZE:
+            raise OSError("Header is truncated or file is not a fits file")
+        if first:
+            if not (block.startswith(b'SIMPLE  =') or block.startswith(b'XTENSION=')):
+                raise OSError("File is not a fits file")
+            first = False
+        text = block.decode('ascii', errors='replace')
+        for i in range(0, BLOCKSIZE, CARDSIZE):
+            card = text[i:i + CARDSIZE]
+            if card.startswith('END') and card[3:].strip() == '':
+                return
+            yield card
+
+
+def parseCards(cards, keys=None):
+    """
+    Parse an iterable of header cards into a dict.
+
+    The first occurrence of a keyword wins, which matches `Header.__getitem__`.
+    Commentary cards are skipped. Cards that cannot be parsed here are handed to astropy.
+    """
+    result = dict()
+    wanted = None if keys is None else len(keys)
+    pending = None
+
+    for card in cards:
+        if pending is not None:
+            # Long string: collect CONTINUE cards
+            if card.startswith('CONTINUE'):
+                pending.append(card)
+                continue
+            _storeFallback(result, pending, keys)
+            pending = None
+
+        keyword = card[:8].rstrip()
+        if keyword in COMMENTARY or keyword == 'CONTINUE':
+            continue
+        if keyword == 'HIERARCH':
+            _storeFallback(result, [card], keys)
+            continue
+        if (keys is not None and keyword not in keys) or keyword in result:
+            continue
+        if card[8:10] != '= ':
+            continue
+
+        value = parseValue(card[10:])
+        if value is _FALLBACK:
+            _storeFallback(result, [card], keys)
+        elif value is _LONGSTRING:
+            pending = [card]
+        else:
+            result[keyword] = value
+
+        if wanted is not None and len(result) == wanted:
+            break
+
+    if pending is not None:
+        _storeFallback(result, pending, keys)
+
+    return result
+
+
+class _Marker:
+    pass
+
+
+_FALLBACK = _Marker()
+_LONGSTRING = _Marker()
+
+
+def parseValue(field):
+    """
+    Parse the value field of a card (columns 11-80).
+
+    Returns `_FALLBACK` for values, that need to be parsed by astropy (e.g. complex numbers)
+    and `_LONGSTRING` for strings continued on the following cards.
+    """
+    field = field.lstrip()
+    if field.startswith("'"):
+        pos = 1
+        while True:
+            end = field.find("'", pos)
+            if end < 0:
+                return _FALLBACK
+            if field.startswith("''", end):
+                pos = end + 2
+                continue
+            break
+        value = field[1:end].replace("''", "'").rstrip()
+        if value.endswith('&'):
+            return _LONGSTRING
+        return value
+
+    value = field.split('/', 1)[0].strip()
+    if value == 'T':
+        return True
+    if value == 'F':
+        return False
+    if value == '':
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return float(value.replace('D', 'E'))
+    except ValueError:
+        return _FALLBACK
+
+
+def _storeFallback(result, cards, keys):
+    card = fits.Card.fromstring(''.join(cards))
+    keyword = card.keyword
+    if (keys is not None and keyword not in keys) or keyword in result:
+        return
+    value = card.value
+    if value is fits.card.UNDEFINED:
+        value = None
+    result[keyword] = value
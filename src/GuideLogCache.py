@@ -0,0 +1,200 @@
+import glob
+import hashlib
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+
+from GuidingData import GuidingData, FRAMEDTYPE, parseGuidingLog
+from UserCache import getUserCacheDirectory
+
+# Increment, when the format of the cached files changes
+VERSION = 2
+
+
+class GuideLogCache:
+    """
+    Persistent cache of parsed PHD2 guide logs.
+
+    For each log the frames of all guiding sections are stored as one `.npy` file (records of `FRAMEDTYPE`)
+    and the sections as `.json` file next to it. Entries are keyed by the path of the log and remember its size and
+    modification time, so a log that changed (e.g. grew during a session) is parsed again.
+    Cached frames are memory mapped, they are only read from disk when accessed.
+
+    The `.npy` file of each size and modification time has its own name, because a file that is memory mapped
+    cannot be replaced or deleted on Windows. Data files of older versions are deleted, once they are not mapped.
+    """
+
+    def __init__(self, directory=None):
+        if directory is None:
+            directory = os.path.join(getUserCacheDirectory(), 'guidelogs')
+        self.directory = str(directory)
+        os.makedirs(self.directory, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self.log = logging.getLogger("GuideLogCache")
+        self.lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['lock'] = None
+        state['log'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+        self.log = logging.getLogger("GuideLogCache")
+
+    def _names(self, path):
+        """
+        Return the name of the `.json` file of a log and the prefix of the names of its `.npy` files.
+        """
+        key = hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()
+        base = os.path.join(self.directory, key)
+        return (base + '.json', base + '-')
+
+    def _removeData(self, prefix, keep=None) -> None:
+        # Best effort: a data file, that is still memory mapped, cannot be deleted on Windows
+        for name in glob.glob(glob.escape(prefix) + '*.npy'):
+            if name != keep:
+                try:
+                    os.remove(name)
+                except OSError as e:
+                    self.log.debug("Cannot remove %s: %s", name, str(e))
+
+    @staticmethod
+    def _stat(path):
+        stat = os.stat(path)
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def lookup(self, path):
+        """
+        Return the cached sections of the log at `path`, or None if it is not cached or changed since.
+        """
+        sections = self.load(path)
+        self._count(sections is not None)
+        return sections
+
+    def load(self, path):
+        """
+        Like `lookup()`, but without counting a hit or miss, e.g. to load a log stored by another process.
+        """
+        (metaName, prefix) = self._names(path)
+        try:
+            with open(metaName) as file:
+                meta = json.load(file)
+            stat = self._stat(path)
+            dataName = os.path.join(self.directory, meta['data'])
+            if meta['version'] != VERSION or meta['path'] != os.path.abspath(path) \
+                    or (meta['size'], meta['mtime']) != stat:
+                return None
+            if meta['frames'] > 0:
+                data = np.load(dataName, mmap_mode='r')
+            else:
+                data = np.empty(0, dtype=FRAMEDTYPE)
+            if data.dtype != FRAMEDTYPE or len(data) != meta['frames']:
+                return None
+        except (OSError, ValueError, KeyError) as e:
+            self.log.debug("No cache entry for %s: %s", path, str(e))
+            return None
+
+        sections = []
+        for entry in meta['sections']:
+            section = GuidingData()
+            section.guidingStart = entry['start']
+            section.guidingEnd = entry['end']
+            section.maxsnr = entry['maxsnr']
+            section.maxStarmass = entry['maxStarmass']
+            section.raRate = entry['raRate']
+            section.decRate = entry['decRate']
+            section.data = data[entry['offset']:entry['offset'] + entry['frames']]
+            sections.append(section)
+        return sections
+
+    def store(self, path, sections, stat=None) -> None:
+        """
+        Store the sections parsed from the log at `path`. `stat` is (size, mtime) of the log before parsing.
+        """
+        if stat is None:
+            stat = self._stat(path)
+        (metaName, prefix) = self._names(path)
+        dataName = "%s%i-%i.npy" % (prefix, stat[0], stat[1])
+        entries = []
+        offset = 0
+        for section in sections:
+            entries.append({'start': section.guidingStart, 'end': section.guidingEnd,
+                            'maxsnr': section.maxsnr, 'maxStarmass': section.maxStarmass,
+                            'raRate': section.raRate, 'decRate': section.decRate,
+                            'offset': offset, 'frames': len(section.data)})
+            offset += len(section.data)
+        meta = {'version': VERSION, 'path': os.path.abspath(path), 'size': stat[0], 'mtime': stat[1],
+                'frames': offset, 'data': os.path.basename(dataName), 'sections': entries}
+
+        try:
+            # An existing data file of the same version is complete and may be memory mapped
+            if offset > 0 and not os.path.exists(dataName):
+                data = np.concatenate([section.data for section in sections])
+                with open(dataName + '.tmp', 'wb') as file:
+                    np.save(file, data)
+                os.replace(dataName + '.tmp', dataName)
+            # The `.json` file is written last, so it never refers to a missing data file
+            with open(metaName + '.tmp', 'w') as file:
+                json.dump(meta, file)
+            os.replace(metaName + '.tmp', metaName)
+        except OSError as e:
+            self.log.warning("Guide log cache store failed: %s", str(e))
+            return
+        self._removeData(prefix, keep=dataName)
+
+    def invalidate(self, path) -> None:
+        (metaName, prefix) = self._names(path)
+        try:
+            os.remove(metaName)
+        except OSError:
+            pass
+        self._removeData(prefix)
+
+    def _count(self, hit: bool) -> None:
+        with self.lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def getCounts(self) -> tuple[int, int]:
+        return (self.hits, self.misses)
+
+    def readGuidingLog(self, path) -> list:
+        """
+        Return the guiding sections of a PHD2 guide log, from the cache if possible.
+        """
+        sections = self.lookup(path)
+        if sections is None:
+            sections = self.storeGuidingLog(path)
+        return sections
+
+    def storeGuidingLog(self, path) -> list:
+        """
+        Parse a PHD2 guide log, store it in the cache and return its sections.
+        """
+        stat = self._stat(path)
+        with open(path) as file:
+            sections = list(parseGuidingLog(file))
+        self.store(path, sections, stat)
+        return sections
+
+
+_defaultCache = None
+
+
+def getDefaultGuideLogCache() -> GuideLogCache:
+    """
+    Return the guide log cache in the user cache directory.
+    """
+    global _defaultCache
+    if _defaultCache is None:
+        _defaultCache = GuideLogCache()
+    return _defaultCache
@@ -0,0 +1,94 @@
+import logging
+import os
+
+from GuidingData import GuidingLogParser, GuidingSessionData
+
+
+class GuideLogFollower:
+    """
+    Follow a PHD2 guide log, while it is written, and add the new guiding frames to a `GuidingSessionData`.
+
+    `poll()` needs to be called periodically (e.g. from a QTimer). Each poll reads only the bytes appended since the
+    previous poll; an incomplete last line is kept until it is complete. The parser state (guide speed, open section,
+    dithering) is kept between polls, so frames are appended to the open section, which is already part of the
+    session data. Until the section ends, its end is the time of its last frame.
+    If the log is truncated or replaced by a smaller file, it is read again from the start.
+    """
+
+    def __init__(self, path, guidingData: GuidingSessionData):
+        self.path = str(path)
+        self.guidingData = guidingData
+        self.log = logging.getLogger("GuideLogFollower")
+        self.sections = []
+        self.reset()
+
+    def reset(self) -> None:
+        for section in self.sections:
+            if section in self.guidingData.guidingData:
+                self.guidingData.guidingData.remove(section)
+        self.sections = []
+        self.offset = 0
+        self.pending = b''
+        self.frames = 0
+        self.parser = GuidingLogParser()
+
+    def resume(self, sections, offset, rates) -> None:
+        """
+        Continue following at byte `offset` (see `GuideLogIndex.getResumePoint()`), with the guide speed `rates`
+        (RA, DEC) in effect there. `sections` were read from the log before `offset` and are part of the session data,
+        they are removed again, if the log is truncated.
+        """
+        self.reset()
+        self.sections = list(sections)
+        self.frames = sum(len(section.data) for section in self.sections)
+        self.offset = offset
+        (self.parser.raRate, self.parser.decRate) = rates
+
+    def poll(self) -> int:
+        """
+        Read the lines appended to the log and return the number of new guiding frames.
+        """
+        try:
+            size = os.path.getsize(self.path)
+        except OSError as e:
+            self.log.debug("Cannot read %s: %s", self.path, str(e))
+            return 0
+
+        if size < self.offset:
+            self.log.info("Guide log %s was truncated, reading it again", self.path)
+            self.reset()
+        if size == self.offset:
+            return 0
+
+        with open(self.path, 'rb') as file:
+            file.seek(self.offset)
+            chunk = file.read(size - self.offset)
+        self.offset += len(chunk)
+
+        data = self.pending + chunk
+        end = data.rfind(b'\n') + 1
+        self.pending = data[end:]
+        if end == 0:
+            return 0
+
+        text = data[:end].decode('utf-8', errors='replace').replace('\r\n', '\n')
+        for line in text.splitlines(keepends=True):
+            section = self.parser.feed(line)
+            if section is not None:
+                self._add(section)
+
+        section = self.parser.flush()
+        if section is not None and len(section.data) > 0:
+            section.guidingEnd = float(section.data['time'][-1])
+            self._add(section)
+
+        frames = sum(len(section.data) for section in self.sections)
+        added = frames - self.frames
+        self.frames = frames
+        return added
+
+    def _add(self, section) -> None:
+        if not any(section is known for known in self.sections):
+            self.sections.append(section)
+            self.guidingData.guidingData.append(section)
+            self.guidingData.guidingData.sort(key=lambda gd: gd.guidingStart)
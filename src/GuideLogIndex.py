@@ -0,0 +1,156 @@
+import logging
+import mmap
+import os
+import re
+
+import numpy as np
+
+from GuidingData import GUIDESPEED, GuidingLogParser, parseFloat, parseTime
+
+# Lines needed to find the guiding sections of a log, and the guide speed at their start
+SECTIONLINES = re.compile(rb'^(Guiding Begins at |Guiding Ends at |RA Guide Speed)([^\r\n]*)', re.MULTILINE)
+
+
+class GuideLogIndex:
+    """
+    Byte offsets and start/end times of the guiding sections of a PHD2 guide log.
+
+    The index is built by a single scan for the `Guiding Begins`/`Guiding Ends` lines of the memory mapped log, no
+    frames are parsed. `readSections()` then parses only the sections overlapping given time windows.
+    A section, that is not terminated at the end of the log, is not indexed (like in `parseGuidingLog`).
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.log = logging.getLogger("GuideLogIndex")
+        self.offsets = np.empty(0, dtype=np.int64)
+        self.ends = np.empty(0, dtype=np.int64)
+        self.guidingStart = np.empty(0, dtype=np.float64)
+        self.guidingEnd = np.empty(0, dtype=np.float64)
+        # Guide speed (RA, DEC) in effect, when the section begins and after it ended
+        self.rates = []
+        self.endRates = []
+        self.build()
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def build(self) -> None:
+        offsets = []
+        ends = []
+        starts = []
+        stops = []
+        rates = []
+        endRates = []
+
+        raRate = 13.5
+        decRate = 13.5
+        begin = None
+        with open(self.path, 'rb') as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                for match in SECTIONLINES.finditer(buffer):
+                    kind = match.group(1)
+                    if kind == b'RA Guide Speed':
+                        speeds = GUIDESPEED.findall(match.group(0).decode('utf-8', errors='replace'))
+                        if len(speeds) == 2:
+                            raRate = parseFloat(speeds[0])
+                            decRate = parseFloat(speeds[1])
+                        continue
+
+                    time = parseTime(match.group(2).decode('utf-8', errors='replace').strip())
+                    if begin is not None:
+                        if kind == b'Guiding Ends at ':
+                            # The section includes the `Guiding Ends` line
+                            ends.append(match.end())
+                        else:
+                            ends.append(match.start())
+                        offsets.append(begin[0])
+                        starts.append(begin[1])
+                        stops.append(time)
+                        rates.append(begin[2])
+                        endRates.append((raRate, decRate))
+                        begin = None
+                    if kind == b'Guiding Begins at ':
+                        begin = (match.start(), time, (raRate, decRate))
+
+        self.offsets = np.array(offsets, dtype=np.int64)
+        self.ends = np.array(ends, dtype=np.int64)
+        self.guidingStart = np.array(starts, dtype=np.float64)
+        self.guidingEnd = np.array(stops, dtype=np.float64)
+        self.rates = rates
+        self.endRates = endRates
+
+    def findOverlapping(self, jd1, jd2):
+        """
+        Return the numbers of the sections overlapping any of the windows [jd1, jd2] (scalars or arrays).
+        """
+        jd1 = np.atleast_1d(np.asarray(jd1, dtype=np.float64))
+        jd2 = np.atleast_1d(np.asarray(jd2, dtype=np.float64))
+        if len(self) == 0 or len(jd1) == 0:
+            return np.empty(0, dtype=np.int64)
+        # A section overlaps a window, if it starts before the window ends and ends after it starts. With the windows
+        # sorted by start, the candidates are the windows starting before the section ends, of which the one
+        # ending last decides.
+        order = np.argsort(jd1, kind='stable')
+        starts = jd1[order]
+        latestEnd = np.maximum.accumulate(jd2[order])
+        count = np.searchsorted(starts, self.guidingEnd, side='right')
+        overlaps = count > 0
+        overlaps[overlaps] = latestEnd[count[overlaps] - 1] >= self.guidingStart[overlaps]
+        return np.flatnonzero(overlaps)
+
+    def getResumePoint(self, start=None):
+        """
+        Return the byte offset after the last section starting not after `start` (after all sections, if None) and
+        the guide speed (RA, DEC) in effect there, to continue parsing the log at this offset.
+        """
+        count = len(self) if start is None else int(np.searchsorted(self.guidingStart, start, side='right'))
+        if count == 0:
+            return (0, (13.5, 13.5))
+        return (int(self.ends[count - 1]), self.endRates[count - 1])
+
+    def readSections(self, jd1, jd2) -> list:
+        """
+        Parse the sections overlapping any of the windows [jd1, jd2] and return them as `GuidingData`.
+        """
+        numbers = self.findOverlapping(jd1, jd2)
+        sections = []
+        if len(numbers) == 0:
+            return sections
+        with open(self.path, 'rb') as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                for number in numbers:
+                    sections.append(self.parseSection(buffer, number))
+        self.log.debug("Parsed %i of %i guiding sections", len(sections), len(self))
+        return sections
+
+    def parseSection(self, buffer, number):
+        parser = GuidingLogParser()
+        (parser.raRate, parser.decRate) = self.rates[number]
+        text = buffer[self.offsets[number]:self.ends[number]].decode('utf-8', errors='replace')
+        section = None
+        for line in text.replace('\r\n', '\n').splitlines(keepends=True):
+            section = parser.feed(line)
+        if section is None:
+            # Section ended by the next `Guiding Begins`
+            section = parser.finish(float(self.guidingEnd[number]))
+        return section
+
+
+def readOverlappingSections(path, jd1, jd2, cache=None) -> list:
+    """
+    Return the guiding sections of a guide log overlapping any of the windows [jd1, jd2].
+
+    If the log is in the `GuideLogCache` `cache`, the cached sections are used, otherwise only the overlapping
+    sections are parsed.
+    """
+    if cache is not None:
+        sections = cache.lookup(path)
+        if sections is not None:
+            jd1 = np.atleast_1d(np.asarray(jd1, dtype=np.float64))
+            jd2 = np.atleast_1d(np.asarray(jd2, dtype=np.float64))
+            return [section for section in sections
+                    if np.any((section.guidingEnd >= jd1) & (section.guidingStart <= jd2))]
+    return GuideLogIndex(path).readSections(jd1, jd2)
@@ -1,8 +1,44 @@
+import logging
+import math
 import re
+from collections.abc import Sequence
 
-from JulianDate import getJulianDate
+import numpy as np
+
+from JulianDate import convertToJulianDate
 from Parsing import parseFloat
 
+log = logging.getLogger("GuidingData")
+
+GUIDESPEED = re.compile("Guide Speed = ([0123456789.]+) a-s/s")
+
+# Storage of the frames of a guiding section, one record per frame. Missing values are stored as NaN.
+# snr and starMass are stored as read from the log and normalized to the maximum of the section on access.
+FRAMEDTYPE = np.dtype([
+    ('frame', np.int32),
+    ('time', np.float64),
+    ('dx', np.float32),
+    ('dy', np.float32),
+    ('raRawDistance', np.float32),
+    ('decRawDistance', np.float32),
+    ('raGuideDistance', np.float32),
+    ('decGuideDistance', np.float32),
+    ('raDuration', np.float32),
+    ('raDirection', np.int8),
+    ('decDuration', np.float32),
+    ('decDirection', np.int8),
+    ('xStep', np.float32),
+    ('yStep', np.float32),
+    ('starMass', np.float32),
+    ('snr', np.float32),
+    ('settlingAfterDither', np.bool_),
+    ('errorCode', np.int16),
+])
+
+# Guide pulse directions, stored as index into this list
+DIRECTIONS = ['', 'E', 'W', 'N', 'S']
+DIRECTIONCODES = {direction: code for code, direction in enumerate(DIRECTIONS)}
+
 
 class GuidingFrame:
     def __init__(self):
@@ -34,187 +70,365 @@ class GuidingData:
         self.maxStarmass = 0.0
         self.raRate = 13.5
         self.decRate = 13.5
-        self.frames = []
+        self.data = np.empty(0, dtype=FRAMEDTYPE)
+
+    def setFrames(self, data):
+        """
+        Set the frames of this section, from an array of FRAMEDTYPE or a list of tuples in the order of its fields.
+        """
+        self.data = np.asarray(data, dtype=FRAMEDTYPE) if len(data) > 0 else np.empty(0, dtype=FRAMEDTYPE)
+        self.maxsnr = max(0.0, float(np.nanmax(self.data['snr'], initial=0.0)))
+        self.maxStarmass = max(0.0, float(np.nanmax(self.data['starMass'], initial=0.0)))
+
+    @property
+    def frames(self):
+        """
+        The frames of this section as sequence of `GuidingFrame` objects, which are created on access.
+        """
+        return GuidingFrames(self)
+
+    def appendFrames(self, rows):
+        """
+        Append frames (tuples in the order of the fields of FRAMEDTYPE) and update the maxima of snr and star mass.
+        """
+        if len(rows) == 0:
+            return
+        if len(self.data) == 0:
+            self.setFrames(rows)
+            return
+        frames = np.asarray(rows, dtype=FRAMEDTYPE)
+        self.data = np.concatenate((self.data, frames))
+        self.maxsnr = max(self.maxsnr, float(np.nanmax(frames['snr'], initial=0.0)))
+        self.maxStarmass = max(self.maxStarmass, float(np.nanmax(frames['starMass'], initial=0.0)))
+
+    def getFrame(self, index):
+        (frame, time, dx, dy, raRaw, decRaw, raGuide, decGuide, raDuration, raDirection, decDuration, decDirection,
+         xStep, yStep, starMass, snr, settling, errorCode) = self.data[index].item()
+
+        result = GuidingFrame()
+        result.frame = frame
+        result.time = time
+        result.dx = _value(dx)
+        result.dy = _value(dy)
+        result.raRawDistance = _value(raRaw)
+        result.decRawDistance = _value(decRaw)
+        result.raGuideDistance = _value(raGuide)
+        result.decGuideDistance = _value(decGuide)
+        result.raDuration = _value(raDuration)
+        result.raDirection = DIRECTIONS[raDirection]
+        result.decDuration = _value(decDuration)
+        result.decDirection = DIRECTIONS[decDirection]
+        result.xStep = _value(xStep)
+        result.yStep = _value(yStep)
+        result.starMass = _normalize(starMass, self.maxStarmass)
+        result.snr = _normalize(snr, self.maxsnr)
+        result.settlingAfterDither = settling
+        result.errorCode = errorCode
+        return result
+
+    def getSnr(self):
+        """
+        Return the snr of all frames, normalized to the maximum snr of this section.
+        """
+        return _normalize(self.data['snr'].astype(np.float64), self.maxsnr)
+
+    def getStarMass(self):
+        """
+        Return the star mass of all frames, normalized to the maximum star mass of this section.
+        """
+        return _normalize(self.data['starMass'].astype(np.float64), self.maxStarmass)
+
+
+def _value(value):
+    return None if math.isnan(value) else value
+
+
+def _normalize(value, maximum):
+    if not isinstance(value, np.ndarray) and math.isnan(value):
+        return None
+    return value / maximum if maximum > 0.0 else value
+
+
+class GuidingFrames(Sequence):
+    """
+    Read only view of the frames of a `GuidingData` as `GuidingFrame` objects.
+    """
+
+    def __init__(self, guiding: GuidingData):
+        self.guiding = guiding
+
+    def __len__(self):
+        return len(self.guiding.data)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.guiding.getFrame(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if index < 0 or index >= len(self):
+            raise IndexError("frame index out of range")
+        return self.guiding.getFrame(index)
 
 
 class GuidingSessionData:
     def __init__(self):
         self.guidingData = []
+        self.index = None
 
     def count(self):
         count = 0
         for gd in self.guidingData:
-            count += len(gd.frames)
+            count += len(gd.data)
         return count
 
-    def getGuidingFrames(self, jd1, jd2):
-
-        values = []
-        if len(self.guidingData) > 0:
-            for gd in self.guidingData:
-                if gd.guidingEnd < jd1:
-                    continue
-                elif gd.guidingStart > jd2:
-                    continue
-
-                for frame in gd.frames:
-                    if jd1 <= frame.time and jd2 >= frame.time:
-                        values.append(frame)
-                    elif frame.time > jd2:
-                        break
+    def addSections(self, sections) -> int:
+        """
+        Add guiding sections and keep all sections ordered by their start.
+        Sections, that are already present (same start, end and number of frames), are skipped.
+
+        Returns the number of sections added.
+        """
+        known = {(gd.guidingStart, gd.guidingEnd, len(gd.data)) for gd in self.guidingData}
+        added = 0
+        for section in sections:
+            key = (section.guidingStart, section.guidingEnd, len(section.data))
+            if key not in known:
+                known.add(key)
+                self.guidingData.append(section)
+                added += 1
+        self.guidingData.sort(key=lambda gd: gd.guidingStart)
+        return added
+
+    def getIndex(self):
+        """
+        Return the time index over the frames of all sections, it is rebuilt when sections were changed.
+        """
+        if self.index is None or not self.index.isValidFor(self.guidingData):
+            self.index = GuidingTimeIndex(self.guidingData)
+        return self.index
+
+    def getGuidingFrameIndices(self, jd1, jd2):
+        """
+        Return the positions (in `getIndex().data`) of all frames between jd1 and jd2, in section and frame order.
+        """
+        return self.getIndex().find(jd1, jd2)
 
-        return values
+    def getGuidingFrames(self, jd1, jd2):
+        index = self.getIndex()
+        return [index.getFrame(position) for position in index.find(jd1, jd2)]
 
     def readTime(self, str):
-        # 2023-03-15 20:34:49
-        print('parsing ' + str)
-
-        parts = str.split(' ')
-        date = parts[0]
-        time = parts[1]
-        ymd = date.split('-')
-        hms = time.split(':')
-        year = int(ymd[0])
-        month = int(ymd[1])
-        day = int(ymd[2])
-        hour = int(hms[0])
-        minute = int(hms[1])
-        sec = int(hms[2])
-        return getJulianDate(year, month, day, hour, minute, sec) + 2400000.5
-
-    def readGuidingSessionData(self, fname):
-
-        with open(fname, newline='\r\n') as file:
-            lines = file.readlines()
-
-            guidingRanges = []
-            raRate = 13.5
-            decRate = 13.5
-
-            inBetween = False
-            for i in range(0, len(lines)):
-                line = lines[i]
-
-                if line.startswith("RA Guide Speed"):
-                    matches = re.findall(
-                        "Guide Speed = ([0123456789.]+) a-s/s", line)
-
-                    if len(matches) == 2:
-                        raRate = parseFloat(matches[0])
-                        decRate = parseFloat(matches[1])
-
-                        print("Guiding Speed RA: " + str(raRate))
-                        print("Guiding Speed DEC: " + str(decRate))
-
-                if line.startswith('Guiding Begins at'):
-                    if inBetween:
-                        guidingRanges.append(i)
-
-                    guidingRanges.append(i)
-                    inBetween = True
-                if inBetween and line.startswith('Guiding Ends at'):
-                    guidingRanges.append(i)
-                    inBetween = False
-
-            self.guidingData.clear()
-
-            for i in range(1, len(guidingRanges), 2):
-                start = guidingRanges[i-1]
-                end = guidingRanges[i]
-
-                print('reading ' + str(start) + '-' + str(end))
-
-                line1 = lines[start].replace('Guiding Begins at ', '')
-                if len(line1) == len(lines[start]):
-                    line1 = line1.replace('Guiding Ends at ', '')
-
-                jd1 = self.readTime(line1.strip())
-
-                line2 = lines[end].replace('Guiding Ends at ', '')
-                if len(line2) == len(lines[end]):
-                    line2 = line2.replace('Guiding Begins at ', '')
-
-                jd2 = self.readTime(line2)
-
-                guiding = GuidingData()
-                guiding.guidingStart = jd1
-                guiding.guidingEnd = jd2
-
-                isGuidingData = False
-                isDithering = False
-
-                for j in range(start, end):
-                    line = lines[j]
-
-                    if not isGuidingData and line.startswith('Frame,'):
-                        isGuidingData = True
-                    elif isGuidingData:
-                        if line.startswith("INFO: DITHER"):
-                            isDithering = True
-
-                        if isDithering:
-                            if line.startswith("INFO:"):
-                                if line.startswith("INFO: SETTLING STATE CHANGE, Settling started"):
-                                    continue
-                                if line.startswith("INFO: SETTLING STATE CHANGE, Settling complete"):
-                                    isDithering = False
-                                    continue
-
-                        parts = line.split(',')
-                        if parts is not None and len(parts) >= 17 and parts[0].isdigit():
-                            frame = GuidingFrame()
-                            frameNo = int(parts[0])
-                            timeoffset = float(parts[1])
-                            if parts[2].startswith('DROP'):
-                                continue
-
-                            dx = parseFloat(parts[3])
-                            dy = parseFloat(parts[4])
-                            raRaw = parseFloat(parts[5])
-                            decRaw = parseFloat(parts[6])
-                            raGuide = parseFloat(parts[7])
-                            decGuide = parseFloat(parts[8])
-                            raDuration = parseFloat(parts[9])
-                            raDirection = parts[10]
-                            decDuration = parseFloat(parts[11])
-                            decDirection = parts[12]
-                            xStep = parseFloat(parts[13])
-                            yStep = parseFloat(parts[14])
-                            starMass = parseFloat(parts[15])
-                            snr = parseFloat(parts[16])
-                            errorCode = int(parts[17])
-
-                            if raGuide is None or decGuide is None:
-                                continue
-
-                            frame.frame = frameNo
-                            frame.time = jd1 + timeoffset/86400.0
-                            frame.dx = dx
-                            frame.dy = dy
-                            frame.raRawDistance = raRaw
-                            frame.decRawDistance = decRaw
-                            frame.raGuideDistance = raGuide
-                            frame.decGuideDistance = decGuide
-                            frame.raDuration = raDuration
-                            frame.decDuration = decDuration
-                            frame.raDirection = raDirection
-                            frame.decDirection = decDirection
-                            frame.xStep = xStep
-                            frame.yStep = yStep
-                            frame.starMass = starMass
-                            frame.snr = snr
-                            frame.errorCode = errorCode
-                            frame.settlingAfterDither = isDithering
-
-                            guiding.maxsnr = max(snr, guiding.maxsnr)
-                            guiding.maxStarmass = max(starMass, guiding.maxStarmass)
-                            guiding.raRate = raRate
-                            guiding.decRate = decRate
-
-                            guiding.frames.append(frame)
-
-                for frame in guiding.frames:
-                    frame.snr /= guiding.maxsnr
-                    frame.starMass /= guiding.maxStarmass
-
-                self.guidingData.append(guiding)
+        return parseTime(str)
+
+    def readGuidingSessionData(self, fname, cache=None):
+        """
+        Read all guiding sections of a PHD2 guide log, using a `GuideLogCache` if given.
+        """
+        if cache is not None:
+            sections = cache.readGuidingLog(fname)
+        else:
+            with open(fname) as file:
+                sections = list(parseGuidingLog(file))
+        self.guidingData.clear()
+        self.guidingData.extend(sections)
+
+
+class GuidingTimeIndex:
+    """
+    Frames of all guiding sections concatenated in section order, with a sorted time index for range queries.
+    """
+
+    def __init__(self, sections):
+        self.sections = list(sections)
+        self.arrays = [gd.data for gd in self.sections]
+        lengths = np.array([len(data) for data in self.arrays], dtype=np.int64)
+        self.starts = np.concatenate(([0], np.cumsum(lengths)))
+        if len(self.arrays) > 0:
+            self.data = np.concatenate(self.arrays)
+        else:
+            self.data = np.empty(0, dtype=FRAMEDTYPE)
+        self.section = np.repeat(np.arange(len(self.sections)), lengths)
+        self.sectionStart = np.array([gd.guidingStart for gd in self.sections], dtype=np.float64)
+        self.sectionEnd = np.array([gd.guidingEnd for gd in self.sections], dtype=np.float64)
+        self.sectionMaxSnr = np.array([gd.maxsnr for gd in self.sections], dtype=np.float64)
+        self.sectionMaxStarmass = np.array([gd.maxStarmass for gd in self.sections], dtype=np.float64)
+
+        self.order = np.argsort(self.data['time'], kind='stable')
+        self.times = self.data['time'][self.order]
+
+    def isValidFor(self, sections) -> bool:
+        # The end of a section, that is still being written, changes
+        return len(sections) == len(self.sections) and \
+            all(gd is old and gd.data is data and gd.guidingEnd == end
+                for gd, old, data, end in zip(sections, self.sections, self.arrays, self.sectionEnd))
+
+    def findAll(self, jd1, jd2):
+        """
+        Vectorized `find()` for arrays of windows. Returns (window, position) arrays of all matching frames,
+        sorted by window and then in section and frame order.
+        """
+        jd1 = np.asarray(jd1, dtype=np.float64)
+        jd2 = np.asarray(jd2, dtype=np.float64)
+        lo = np.searchsorted(self.times, jd1, side='left')
+        hi = np.searchsorted(self.times, jd2, side='right')
+        lengths = np.maximum(hi - lo, 0)
+        window = np.repeat(np.arange(len(jd1)), lengths)
+        offsets = np.arange(len(window)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        positions = self.order[np.repeat(lo, lengths) + offsets]
+
+        section = self.section[positions]
+        overlaps = (self.sectionEnd[section] >= jd1[window]) & (self.sectionStart[section] <= jd2[window])
+        window = window[overlaps]
+        positions = positions[overlaps]
+        sort = np.lexsort((positions, window))
+        return window[sort], positions[sort]
+
+    def find(self, jd1, jd2):
+        """
+        Return the positions of all frames with jd1 <= time <= jd2 of sections overlapping [jd1, jd2].
+        """
+        lo = np.searchsorted(self.times, jd1, side='left')
+        hi = np.searchsorted(self.times, jd2, side='right')
+        positions = np.sort(self.order[lo:hi])
+        section = self.section[positions]
+        overlaps = (self.sectionEnd[section] >= jd1) & (self.sectionStart[section] <= jd2)
+        return positions[overlaps]
+
+    def getFrame(self, position):
+        section = self.section[position]
+        return self.sections[section].getFrame(position - self.starts[section])
+
+
+def parseTime(str):
+    # 2023-03-15 20:34:49
+    return convertToJulianDate(str)
+
+
+GUIDINGBEGINS = 'Guiding Begins at '
+GUIDINGENDS = 'Guiding Ends at '
+
+
+def parseGuidingLog(lines):
+    """
+    Parse the lines of a PHD2 guide log in a single pass and yield a `GuidingData` for each guiding section.
+
+    A section starts with `Guiding Begins` and ends with `Guiding Ends` or the next `Guiding Begins`.
+    A section, that is not terminated at the end of the log, is not returned.
+    Only the frames of the current section are kept in memory, so `lines` may be an open file of any size.
+    """
+    parser = GuidingLogParser()
+    for line in lines:
+        section = parser.feed(line)
+        if section is not None:
+            yield section
+
+
+class GuidingLogParser:
+    """
+    State of parsing a PHD2 guide log line by line: guide speed, the open section and the dithering state.
+
+    The frames of the open section are collected and only added to it by `flush()`, or when the section ends.
+    """
+
+    def __init__(self):
+        self.raRate = 13.5
+        self.decRate = 13.5
+        self.guiding = None
+        self.rows = []
+        self.isGuidingData = False
+        self.isDithering = False
+
+    def feed(self, line):
+        """
+        Parse one line, return the section finished by this line, if any.
+        """
+        if line.startswith("RA Guide Speed"):
+            matches = GUIDESPEED.findall(line)
+
+            if len(matches) == 2:
+                self.raRate = parseFloat(matches[0])
+                self.decRate = parseFloat(matches[1])
+                log.debug("Guiding Speed RA: %f, DEC: %f", self.raRate, self.decRate)
+
+        if line.startswith(GUIDINGBEGINS):
+            start = parseTime(line[len(GUIDINGBEGINS):].strip())
+            finished = self.finish(start)
+
+            self.guiding = GuidingData()
+            self.guiding.guidingStart = start
+            self.isGuidingData = False
+            self.isDithering = False
+            return finished
+
+        if self.guiding is None:
+            return None
+
+        if line.startswith(GUIDINGENDS):
+            return self.finish(parseTime(line[len(GUIDINGENDS):].strip()))
+
+        if not self.isGuidingData:
+            if line.startswith('Frame,'):
+                self.isGuidingData = True
+            return None
+
+        if line.startswith("INFO:"):
+            if line.startswith("INFO: DITHER"):
+                self.isDithering = True
+            elif self.isDithering:
+                if line.startswith("INFO: SETTLING STATE CHANGE, Settling complete"):
+                    self.isDithering = False
+            return None
+
+        row = parseGuidingFrame(line, self.guiding.guidingStart, self.isDithering)
+        if row is not None:
+            self.guiding.raRate = self.raRate
+            self.guiding.decRate = self.decRate
+            self.rows.append(row)
+        return None
+
+    def flush(self):
+        """
+        Add the frames collected so far to the open section and return it (None, if no section is open).
+        """
+        if self.guiding is not None and len(self.rows) > 0:
+            self.guiding.appendFrames(self.rows)
+            self.rows = []
+        return self.guiding
+
+    def finish(self, end):
+        """
+        End the open section at `end` and return it.
+        """
+        guiding = self.flush()
+        if guiding is not None:
+            guiding.guidingEnd = end
+            self.guiding = None
+        return guiding
+
+
+def parseGuidingFrame(line, start, settling=False):
+    """
+    Parse a frame line of a guiding section, that started at julian date `start`, into a tuple of FRAMEDTYPE.
+
+    Returns None, if the line is not a frame or the frame was dropped.
+    """
+    parts = line.split(',')
+    if len(parts) < 17 or not parts[0].isdigit():
+        return None
+    if parts[2].startswith('DROP'):
+        return None
+
+    raGuide = parseFloat(parts[7])
+    decGuide = parseFloat(parts[8])
+    if raGuide is None or decGuide is None:
+        return None
+
+    return (int(parts[0]), start + float(parts[1])/86400.0,
+            _float(parts[3]), _float(parts[4]), _float(parts[5]), _float(parts[6]), raGuide, decGuide,
+            _float(parts[9]), DIRECTIONCODES.get(parts[10], 0), _float(parts[11]), DIRECTIONCODES.get(parts[12], 0),
+            _float(parts[13]), _float(parts[14]), _float(parts[15]), _float(parts[16]), settling, int(parts[17]))
+
+
+def _float(str):
+    value = parseFloat(str)
+    return math.nan if value is None else value
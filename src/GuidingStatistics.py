@@ -0,0 +1,83 @@
+import numpy as np
+
+from GuidingData import GuidingTimeIndex
+
+# Statistics computed by analyseExposures, named like the fields of GuidingFrameAnalysis
+STATISTICS = ['rmsRA', 'rmsDEC', 'rms', 'peakRA', 'peakDEC', 'pixelRA', 'pixelDEC', 'pixelTotal',
+              'minRA', 'maxRA', 'minDEC', 'maxDEC', 'numPeaksRA', 'numPeaksDEC',
+              'minSNR', 'maxSNR', 'rmsSNR', 'minStarmass']
+
+
+def analyseExposures(index: GuidingTimeIndex, jd1, jd2, pixelSize) -> dict:
+    """
+    Compute the guiding statistics of `SessionData.analyseFrames` for many exposures at once.
+
+    `jd1`, `jd2` and `pixelSize` are arrays with one entry per exposure. The guiding frames are assigned to the
+    exposures once, then all statistics are computed with segmented reductions.
+    Returns a dict with an array per name in `STATISTICS` and `count`, the number of guiding frames of each
+    exposure. Exposures without guiding frames have count 0 and NaN statistics.
+    """
+    jd1 = np.asarray(jd1, dtype=np.float64)
+    jd2 = np.asarray(jd2, dtype=np.float64)
+    pixelSize = np.asarray(pixelSize, dtype=np.float64)
+    exposures = len(jd1)
+
+    (window, positions) = index.findAll(jd1, jd2)
+    count = np.bincount(window, minlength=exposures)
+
+    data = index.data[positions]
+    section = index.section[positions]
+    raRaw = data['raRawDistance'].astype(np.float64)
+    decRaw = data['decRawDistance'].astype(np.float64)
+    snr = _normalize(data['snr'].astype(np.float64), index.sectionMaxSnr[section])
+    starMass = _normalize(data['starMass'].astype(np.float64), index.sectionMaxStarmass[section])
+    pixel = pixelSize[window]
+
+    # Frames with missing values count for the mean, but do not contribute.
+    # Replacing their values by the initial value of each statistic has the same effect.
+    valid = ~(np.isnan(raRaw) | np.isnan(decRaw) | np.isnan(snr) | np.isnan(starMass))
+    raRaw = np.where(valid, raRaw, 0.0)
+    decRaw = np.where(valid, decRaw, 0.0)
+
+    result = {name: np.full(exposures, np.nan) for name in STATISTICS}
+    result['numPeaksRA'] = np.zeros(exposures, dtype=np.int64)
+    result['numPeaksDEC'] = np.zeros(exposures, dtype=np.int64)
+    result['count'] = count
+
+    exposed = np.flatnonzero(count)
+    if len(exposed) == 0:
+        return result
+    starts = (np.cumsum(count) - count)[exposed]
+    n = count[exposed]
+
+    def total(values):
+        return np.add.reduceat(values, starts)
+
+    sumRA = total(raRaw * raRaw)
+    sumDEC = total(decRaw * decRaw)
+    pixRA = total(np.where(valid, (raRaw / pixel) ** 2, 0.0))
+    pixDEC = total(np.where(valid, (decRaw / pixel) ** 2, 0.0))
+
+    result['rmsRA'][exposed] = np.sqrt(sumRA / n)
+    result['rmsDEC'][exposed] = np.sqrt(sumDEC / n)
+    result['rms'][exposed] = np.sqrt((sumRA + sumDEC) / n)
+    result['peakRA'][exposed] = np.maximum.reduceat(np.abs(raRaw), starts)
+    result['peakDEC'][exposed] = np.maximum.reduceat(np.abs(decRaw), starts)
+    result['pixelRA'][exposed] = np.sqrt(pixRA / n)
+    result['pixelDEC'][exposed] = np.sqrt(pixDEC / n)
+    result['pixelTotal'][exposed] = np.sqrt((pixRA + pixDEC) / n)
+    result['minRA'][exposed] = np.minimum(np.minimum.reduceat(raRaw, starts), 0.0)
+    result['maxRA'][exposed] = np.maximum(np.maximum.reduceat(raRaw, starts), 0.0)
+    result['minDEC'][exposed] = np.minimum(np.minimum.reduceat(decRaw, starts), 0.0)
+    result['maxDEC'][exposed] = np.maximum(np.maximum.reduceat(decRaw, starts), 0.0)
+    result['numPeaksRA'][exposed] = np.add.reduceat((valid & (np.abs(raRaw) > pixel)).astype(np.int64), starts)
+    result['numPeaksDEC'][exposed] = np.add.reduceat((valid & (np.abs(decRaw) > pixel)).astype(np.int64), starts)
+    result['minSNR'][exposed] = np.minimum(np.minimum.reduceat(np.where(valid, snr, 1.0), starts), 1.0)
+    result['maxSNR'][exposed] = np.maximum(np.maximum.reduceat(np.where(valid, snr, 0.0), starts), 0.0)
+    result['rmsSNR'][exposed] = np.sqrt(total(np.where(valid, snr * snr, 0.0)) / n)
+    result['minStarmass'][exposed] = np.minimum(np.minimum.reduceat(np.where(valid, starMass, 1.0), starts), 1.0)
+    return result
+
+
+def _normalize(values, maximum):
+    return np.where(maximum > 0.0, values / np.where(maximum > 0.0, maximum, 1.0), values)
@@ -0,0 +1,181 @@
+import numpy as np
+from PyQt6.QtCharts import QChart, QChartView, QLineSeries, QValueAxis
+from PyQt6.QtCore import QPointF, QRectF, Qt
+from PyQt6.QtGui import QBrush, QColor, QPen
+
+from Decimation import POINTSPERPIXEL, MinMaxPyramid, findRuns
+
+# Zoom factor of one step of the mouse wheel
+WHEELZOOM = 1.25
+
+# (name, color, right axis) of the series of the timeline
+TIMELINESERIES = [('RA', QColor(0, 0, 255, 255), False),
+                  ('DEC', QColor(255, 0, 0, 255), False),
+                  ('SNR', QColor(0, 200, 0, 200), True),
+                  ('Star Mass', QColor(200, 200, 0, 200), True)]
+
+
+class QGuidingTimeline(QChartView):
+    """
+    Guiding of the whole session: RA/DEC error (arc-sec) and normalized SNR and star mass over time (hours since the
+    first frame). Settling after dithering is shaded.
+
+    Each series is drawn from a `MinMaxPyramid`, so the number of points only depends on the width of the chart.
+    Zoom with the mouse wheel or a rubber band, pan with the arrow keys, reset with Home.
+    """
+
+    def __init__(self, parent=None):
+        self.timelineChart = QChart()
+        super().__init__(self.timelineChart, parent)
+        self.timelineChart.setBackgroundBrush(QBrush(QColor(0, 0, 0)))
+        self.timelineChart.legend().setVisible(True)
+        self.timelineChart.legend().setAlignment(Qt.AlignmentFlag.AlignBottom)
+        self.setRubberBand(QChartView.RubberBand.HorizontalRubberBand)
+
+        self.xAxis = QValueAxis()
+        self.xAxis.setTitleText("Hours")
+        self.xAxis.setGridLineColor(QColor(60, 60, 60, 128))
+        self.yAxis = QValueAxis()
+        self.yAxis.setTitleText("arc-sec")
+        self.yAxis.setLabelFormat("%0.2f")
+        self.yAxis.setGridLineColor(QColor(60, 60, 60, 128))
+        self.normAxis = QValueAxis()
+        self.normAxis.setRange(0.0, 1.05)
+        self.normAxis.setLabelFormat("%0.1f")
+        self.timelineChart.addAxis(self.xAxis, Qt.AlignmentFlag.AlignBottom)
+        self.timelineChart.addAxis(self.yAxis, Qt.AlignmentFlag.AlignLeft)
+        self.timelineChart.addAxis(self.normAxis, Qt.AlignmentFlag.AlignRight)
+
+        self.series = []
+        for name, color, right in TIMELINESERIES:
+            series = QLineSeries()
+            series.setName(name)
+            pen = series.pen()
+            pen.setColor(color)
+            series.setPen(pen)
+            self.timelineChart.addSeries(series)
+            series.attachAxis(self.xAxis)
+            series.attachAxis(self.normAxis if right else self.yAxis)
+            self.series.append(series)
+
+        self.pyramids = []
+        # Times and section maxima of the frames shown, to extend the pyramids, when frames were appended
+        self.times = np.empty(0)
+        self.maxSnr = np.empty(0)
+        self.maxStarmass = np.empty(0)
+        self.range = (0.0, 1.0)
+        self.settling = (np.empty(0), np.empty(0))
+        self.xAxis.rangeChanged.connect(self.OnRangeChanged)
+
+    def setGuidingData(self, guidingData):
+        """
+        Show the frames of a `GuidingSessionData`.
+
+        If frames were only appended since the last call (live mode), the pyramids are extended and the zoom is kept.
+        """
+        index = guidingData.getIndex()
+        frames = index.data[index.order]
+        section = index.section[index.order]
+        if len(frames) == 0:
+            self.pyramids = []
+            self.times = np.empty(0)
+            self.settling = (np.empty(0), np.empty(0))
+            for series in self.series:
+                series.clear()
+            return
+
+        times = frames['time']
+        hours = (times - times[0]) * 24.0
+        maxSnr = index.sectionMaxSnr[section]
+        maxStarmass = index.sectionMaxStarmass[section]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            snr = np.where(maxSnr > 0.0, frames['snr'] / maxSnr, frames['snr'])
+            starMass = np.where(maxStarmass > 0.0, frames['starMass'] / maxStarmass, frames['starMass'])
+        values = [frames['raRawDistance'], frames['decRawDistance'], snr, starMass]
+
+        count = len(self.times)
+        grown = 0 < count <= len(times) and len(self.pyramids) > 0 and np.array_equal(times[:count], self.times)
+        if grown:
+            # Normalized values change, when the maximum of their section grew
+            changed = np.flatnonzero((maxSnr[:count] != self.maxSnr) | (maxStarmass[:count] != self.maxStarmass))
+            normalized = int(changed[0]) if len(changed) > 0 else count
+            for pyramid, y, start in zip(self.pyramids, values, [count, count, normalized, normalized]):
+                pyramid.extend(hours[start:], y[start:], start)
+        else:
+            self.pyramids = [MinMaxPyramid(hours, y) for y in values]
+        self.times = times
+        self.maxSnr = maxSnr
+        self.maxStarmass = maxStarmass
+
+        (starts, ends) = findRuns(frames['settlingAfterDither'])
+        self.settling = (hours[starts], hours[ends - 1])
+
+        first = count if grown else 0
+        limit = min(np.nanmax(np.abs(np.concatenate((values[0][first:], values[1][first:]))), initial=1.0), 10.0)
+        # Without zoom, the view follows the new frames
+        zoomed = (self.xAxis.min(), self.xAxis.max()) != self.range
+        self.range = (0.0, max(float(hours[-1]), 1.0 / 60.0))
+        if grown:
+            if limit > self.yAxis.max():
+                self.yAxis.setRange(-limit, limit)
+            if zoomed:
+                self.updateSeries()
+            else:
+                self.resetZoom()
+        else:
+            self.yAxis.setRange(-limit, limit)
+            self.resetZoom()
+
+    def resetZoom(self):
+        self.xAxis.setRange(*self.range)
+        self.updateSeries()
+
+    def OnRangeChanged(self, low, high):
+        self.updateSeries()
+
+    def updateSeries(self):
+        if len(self.pyramids) == 0:
+            return
+        maxPoints = max(int(self.timelineChart.plotArea().width()), 100) * POINTSPERPIXEL
+        (low, high) = (self.xAxis.min(), self.xAxis.max())
+        for series, pyramid in zip(self.series, self.pyramids):
+            (x, y) = pyramid.query(low, high, maxPoints)
+            keep = ~np.isnan(y)
+            series.replace([QPointF(a, b) for a, b in zip(x[keep].tolist(), y[keep].tolist())])
+        self.viewport().update()
+
+    def wheelEvent(self, event):
+        # Zoom only the time axis, around the mouse position
+        factor = WHEELZOOM if event.angleDelta().y() > 0 else 1.0 / WHEELZOOM
+        area = self.timelineChart.plotArea()
+        x = min(max(event.position().x(), area.left()), area.right())
+        left = x - (x - area.left()) / factor
+        self.timelineChart.zoomIn(QRectF(left, area.top(), area.width() / factor, area.height()))
+        event.accept()
+
+    def keyPressEvent(self, event):
+        key = event.key()
+        if key == Qt.Key.Key_Left:
+            self.timelineChart.scroll(-self.timelineChart.plotArea().width() / 10.0, 0)
+        elif key == Qt.Key.Key_Right:
+            self.timelineChart.scroll(self.timelineChart.plotArea().width() / 10.0, 0)
+        elif key == Qt.Key.Key_Home:
+            self.resetZoom()
+        else:
+            super().keyPressEvent(event)
+
+    def drawForeground(self, painter, rect):
+        (starts, ends) = self.settling
+        if len(starts) == 0:
+            return
+        area = self.timelineChart.plotArea()
+        (low, high) = (self.xAxis.min(), self.xAxis.max())
+        visible = (ends >= low) & (starts <= high)
+        painter.save()
+        painter.setPen(QPen(Qt.PenStyle.NoPen))
+        painter.setBrush(QBrush(QColor(0xFF, 0xFF, 0xFF, 0x30)))
+        for start, end in zip(starts[visible].tolist(), ends[visible].tolist()):
+            x1 = self.timelineChart.mapToPosition(QPointF(max(start, low), 0), self.series[0]).x()
+            x2 = self.timelineChart.mapToPosition(QPointF(min(end, high), 0), self.series[0]).x()
+            painter.drawRect(QRectF(x1, area.top(), max(x2 - x1, 1.0), area.height()))
+        painter.restore()
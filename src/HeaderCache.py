@@ -0,0 +1,226 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import FitsHeader as fh
+from UserCache import getUserCacheDirectory
+
+# Key set name used for complete headers
+ALLKEYS = '*'
+
+
+def _encode(value):
+    if isinstance(value, complex):
+        return {'__complex__': [value.real, value.imag]}
+    raise TypeError("Cannot store value of type " + type(value).__name__)
+
+
+def _decode(obj):
+    if '__complex__' in obj:
+        return complex(*obj['__complex__'])
+    return obj
+
+
+class HeaderCache:
+    """
+    Persistent cache of parsed fits header values, stored in a SQLite database.
+
+    Entries are keyed by the path of the file and the set of keys that were read (`None` for all keys).
+    Each entry remembers size and modification time of the file, a lookup for a file that changed
+    invalidates the entry and counts as miss.
+    The cache holds at most `maxEntries` entries, the least recently used ones are evicted first.
+
+    The cache may be shared between threads, it is reopened lazily when passed to another process.
+    Each `lookupMany()` and `storeMany()` is one transaction, so prefer them to `lookup()` and `store()` for
+    many files.
+    """
+
+    def __init__(self, filename=None, maxEntries=200000):
+        if filename is None:
+            filename = os.path.join(getUserCacheDirectory(), 'headers.sqlite')
+        self.filename = str(filename)
+        self.maxEntries = maxEntries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.log = logging.getLogger("HeaderCache")
+        self.lock = threading.Lock()
+        self.connection = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['lock'] = None
+        state['connection'] = None
+        state['log'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+        self.log = logging.getLogger("HeaderCache")
+
+    def _connect(self):
+        if self.connection is None:
+            self.connection = sqlite3.connect(self.filename, timeout=30.0, check_same_thread=False)
+            # With a write ahead log, commits need no fsync, only checkpoints do. Losing the last commits on a
+            # power failure only costs some cache misses.
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS headers ("
+                                    "path TEXT NOT NULL, keyset TEXT NOT NULL, size INTEGER NOT NULL, "
+                                    "mtime INTEGER NOT NULL, accessed REAL NOT NULL, header TEXT NOT NULL, "
+                                    "PRIMARY KEY (path, keyset))")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS headers_accessed ON headers (accessed)")
+            self.connection.commit()
+        return self.connection
+
+    def close(self) -> None:
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+
+    @staticmethod
+    def _keyset(keys) -> str:
+        if keys is None:
+            return ALLKEYS
+        return ','.join(sorted(keys))
+
+    @staticmethod
+    def _stat(path):
+        stat = os.stat(path)
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def lookup(self, path, keys=None):
+        """
+        Return the cached header values of `path` (read with `keys`), or None.
+        """
+        return self.lookupMany([path], keys)[0]
+
+    def lookupMany(self, paths, keys=None) -> list:
+        """
+        Return a list with the cached header values for each path, None for misses.
+        """
+        keyset = self._keyset(keys)
+        result = [None] * len(paths)
+        hits = []
+        stale = []
+        now = time.time()
+        with self.lock:
+            try:
+                connection = self._connect()
+                for i, path in enumerate(paths):
+                    path = os.path.abspath(path)
+                    row = connection.execute("SELECT size, mtime, header FROM headers WHERE path = ? AND keyset = ?",
+                                             (path, keyset)).fetchone()
+                    if row is None:
+                        continue
+                    try:
+                        stat = self._stat(path)
+                    except OSError:
+                        stat = None
+                    if stat != (row[0], row[1]):
+                        stale.append((path, keyset))
+                        continue
+                    result[i] = json.loads(row[2], object_hook=_decode)
+                    hits.append((now, path, keyset))
+
+                if hits:
+                    connection.executemany("UPDATE headers SET accessed = ? WHERE path = ? AND keyset = ?", hits)
+                if stale:
+                    self.log.debug("Invalidating %i changed files", len(stale))
+                    connection.executemany("DELETE FROM headers WHERE path = ? AND keyset = ?", stale)
+                connection.commit()
+            except sqlite3.Error as e:
+                self.log.warning("Header cache lookup failed: %s", str(e))
+                result = [None] * len(paths)
+                hits = []
+
+            self.hits += len(hits)
+            self.misses += len(paths) - len(hits)
+        return result
+
+    def store(self, path, header: dict, keys=None) -> None:
+        self.storeMany([(path, header)], keys)
+
+    def storeMany(self, items, keys=None) -> None:
+        """
+        Store (path, header values) pairs, which were read with `keys`.
+        """
+        keyset = self._keyset(keys)
+        now = time.time()
+        rows = []
+        for path, header in items:
+            path = os.path.abspath(path)
+            try:
+                size, mtime = self._stat(path)
+            except OSError:
+                continue
+            rows.append((path, keyset, size, mtime, now, json.dumps(header, default=_encode)))
+        if len(rows) == 0:
+            return
+
+        with self.lock:
+            try:
+                connection = self._connect()
+                connection.executemany("INSERT OR REPLACE INTO headers (path, keyset, size, mtime, accessed, header) "
+                                       "VALUES (?, ?, ?, ?, ?, ?)", rows)
+                self._evict(connection)
+                connection.commit()
+            except (sqlite3.Error, TypeError) as e:
+                self.log.warning("Header cache store failed: %s", str(e))
+
+    def _evict(self, connection) -> None:
+        count = connection.execute("SELECT COUNT(*) FROM headers").fetchone()[0]
+        if count <= self.maxEntries:
+            return
+        # Evict down to 90% to not pay for eviction on each store
+        excess = count - int(self.maxEntries * 0.9)
+        connection.execute("DELETE FROM headers WHERE rowid IN "
+                           "(SELECT rowid FROM headers ORDER BY accessed LIMIT ?)", (excess,))
+        self.evictions += excess
+
+    def invalidate(self, path=None) -> None:
+        """
+        Remove all entries for `path`, or all entries, if no path is given.
+        """
+        with self.lock:
+            connection = self._connect()
+            if path is None:
+                connection.execute("DELETE FROM headers")
+            else:
+                connection.execute("DELETE FROM headers WHERE path = ?", (os.path.abspath(path),))
+            connection.commit()
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self._connect().execute("SELECT COUNT(*) FROM headers").fetchone()[0]
+
+    def getCounts(self) -> tuple[int, int, int]:
+        return (self.hits, self.misses, self.evictions)
+
+    def readFitsHeader(self, path, keys=None) -> dict:
+        """
+        Like `FitsHeader.readFitsHeader`, but consult the cache first and remember the result.
+        """
+        header = self.lookup(path, keys)
+        if header is None:
+            header = fh.readFitsHeader(path, keys)
+            self.store(path, header, keys)
+        return header
+
+
+_defaultCache = None
+
+
+def getDefaultHeaderCache() -> HeaderCache:
+    """
+    Return the header cache in the user cache directory.
+    """
+    global _defaultCache
+    if _defaultCache is None:
+        _defaultCache = HeaderCache()
+    return _defaultCache
@@ -1,22 +1,31 @@
+import math
 import os
 import subprocess
 import sys
 import logging
+import multiprocessing
 
 import qdarktheme
 from PyQt6.QtCharts import QChart, QChartView, QLineSeries, QValueAxis
-from PyQt6.QtCore import Qt, QSize
+from PyQt6.QtCore import Qt, QPointF, QSize, QTimer
 from PyQt6.QtGui import QBrush, QColor, QIcon
 from PyQt6.QtWidgets import QApplication, QMainWindow, QWidget, QComboBox, QToolButton, QTableWidgetItem
-from PyQt6.QtWidgets import QTabWidget, QTableWidget, QVBoxLayout, QHBoxLayout, QMessageBox
-from astropy.coordinates import SkyOffsetFrame
-from Spherical import formatHMS, formatDMS, formatAngle, formatDMSLow
+from PyQt6.QtWidgets import QTabWidget, QTableWidget, QVBoxLayout, QHBoxLayout, QMessageBox, QLabel
+from Spherical import formatHMS, formatDMS, formatDMSLow
 
 import DataColumn as DataColumn
+from AstropyConfig import configureAstropy, logIersStatus
+from DitherStatistics import REFERENCEFIRST, REFERENCEPIERSIDE, REFERENCETARGET
 import SessionData as Data
 from GuideGraph import QGuideGraph
+from GuidingTimeline import QGuidingTimeline
+from HeaderCache import getDefaultHeaderCache
+from LightFrameWatcher import LightFrameWatcher
 from OpenNewSession import OpenNewSession
 
+# Interval in ms, in which the light frame folder is checked for new frames in live mode
+WATCHINTERVAL = 500
+
 is_frozen = getattr(sys, 'frozen', False)
 frozen_temp_path = getattr(sys, '_MEIPASS', '')
 
@@ -71,6 +80,9 @@ class MainWindow(QMainWindow):
         # Model components
         self.sessionData = Data.SessionData()
         self.sessionFolder = None
+        self.watcher = None
+        self.watchTimer = QTimer(self)
+        self.watchTimer.timeout.connect(self.OnWatchTimer)
 
     def createToolBar(self):
         self.toolbar_widget = QWidget()
@@ -94,6 +106,16 @@ class MainWindow(QMainWindow):
         self.changeSettings.setFixedSize(QSize(32, 32))
         self.changeSettings.setIcon(QIcon(os.path.join(basedir, 'Icons/gearshape.png')))
         toolBarLayout.addWidget(self.changeSettings)
+        toolBarLayout.addSpacing(8)
+
+        self.watchSession = QToolButton()
+        self.watchSession.setFixedHeight(32)
+        self.watchSession.setText("Live")
+        self.watchSession.setToolTip("Watch the light frame folder and the guide log "
+                                     "and add new frames, while they are written")
+        self.watchSession.setCheckable(True)
+        self.watchSession.toggled.connect(self.OnWatchSessionToggled)
+        toolBarLayout.addWidget(self.watchSession)
 
         toolBarLayout.addStretch()
 
@@ -171,15 +193,45 @@ class MainWindow(QMainWindow):
         self.ditherChart.legend().setAlignment(Qt.AlignmentFlag.AlignBottom)
         self.ditherChart.setBackgroundBrush(QBrush(QColor(0, 0, 0)))
 
+        ditherToolsWidget = QWidget()
+        ditherToolsLayout = QHBoxLayout()
+        ditherToolsLayout.setContentsMargins(4, 2, 4, 2)
+        ditherToolsWidget.setLayout(ditherToolsLayout)
+
+        self.ditherReferenceBox = QComboBox()
+        self.ditherReferenceBox.addItem("Offsets from first frame", REFERENCEFIRST)
+        self.ditherReferenceBox.addItem("Offsets from median per target", REFERENCETARGET)
+        self.ditherReferenceBox.addItem("Offsets from median per pier side", REFERENCEPIERSIDE)
+        self.ditherReferenceBox.currentIndexChanged.connect(self.OnDitherReferenceIndexChanged)
+        self.ditherStatistics = QLabel()
+
+        ditherToolsLayout.addWidget(self.ditherReferenceBox)
+        ditherToolsLayout.addSpacing(32)
+        ditherToolsLayout.addWidget(self.ditherStatistics)
+        ditherToolsLayout.addStretch()
+
+        graphLayout.addWidget(ditherToolsWidget)
+        graphLayout.addSpacing(4)
         graphLayout.addWidget(self.ditherChartView)
 
         return self.ditherView
 
+    def createGuidingView(self):
+        self.guidingView = QWidget()
+        graphLayout = QVBoxLayout()
+        self.guidingView.setLayout(graphLayout)
+
+        self.guidingTimeline = QGuidingTimeline()
+        graphLayout.addWidget(self.guidingTimeline)
+
+        return self.guidingView
+
     def createTabWidget(self):
         tabWidget = QTabWidget()
         tabWidget.addTab(self.createImageTable(), "Data")
         tabWidget.addTab(self.createGraphView(), "Charts")
         tabWidget.addTab(self.createDitherView(), "Dither")
+        tabWidget.addTab(self.createGuidingView(), "Guiding")
 
         return tabWidget
 
@@ -199,6 +251,7 @@ class MainWindow(QMainWindow):
 
     def OnOpenNewSession(self):
         try:
+            self.watchSession.setChecked(False)
             dialog = OpenNewSession(self)
             dialog.set(self.sessionData)
             dialog.execute()
@@ -208,6 +261,7 @@ class MainWindow(QMainWindow):
                 self.updateTable()
                 self.updateSessionGraph()
                 self.updateDitherGraph()
+            self.updateGuidingTimeline()
             return
         except Exception as e:
             self.log.error("Error opening new session")
@@ -217,6 +271,53 @@ class MainWindow(QMainWindow):
             dlg.setText(str(e))
             dlg.exec()
 
+    def OnWatchSessionToggled(self, checked):
+        try:
+            if checked:
+                if self.sessionData.imageFolder is None:
+                    self.watchSession.setChecked(False)
+                    return
+                self.log.info("Watching %s for new light frames", self.sessionData.imageFolder)
+                self.watcher = LightFrameWatcher(self.sessionData, cache=getDefaultHeaderCache())
+                if self.sessionData.guidingLogFile is not None:
+                    self.log.info("Following guide log %s", self.sessionData.guidingLogFile)
+                    self.sessionData.followGuidingData()
+                self.watchTimer.start(WATCHINTERVAL)
+            else:
+                self.watchTimer.stop()
+                self.watcher = None
+        except Exception as e:
+            self.log.error("Error in OnWatchSessionToggled")
+            self.log.exception(e)
+            dlg = QMessageBox(self)
+            dlg.setWindowTitle("An error occurred")
+            dlg.setText(str(e))
+            dlg.exec()
+
+    def OnWatchTimer(self):
+        try:
+            if self.watcher is None:
+                return
+            newGuiding = self.sessionData.updateGuidingData()
+            if newGuiding > 0:
+                self.updateGuidingTimeline()
+            if len(self.watcher.poll()) > 0:
+                self.updateTable()
+                self.updateSessionGraph()
+                self.updateDitherGraph()
+            elif newGuiding > 0:
+                self.updateTable()
+                if self.imagesTable.currentRow() >= 0:
+                    self.updateGuideGraph()
+        except Exception as e:
+            self.log.error("Error in OnWatchTimer, stop watching")
+            self.log.exception(e)
+            self.watchSession.setChecked(False)
+            dlg = QMessageBox(self)
+            dlg.setWindowTitle("An error occurred")
+            dlg.setText(str(e))
+            dlg.exec()
+
     def OnLaunchImageViewer(self):
         try:
             if self.sessionData.imageFolder is not None:
@@ -282,17 +383,17 @@ class MainWindow(QMainWindow):
                 return QColor(0, 255, 0)
 
         if column == DataColumn.SUNALT:
-            if value.deg < -18.0:
+            if value < -18.0:
                 return QColor(0, 255, 0)
-            elif value.deg < -12.0:
+            elif value < -12.0:
                 return QColor(255, 255, 0)
             else:
                 return QColor(255, 0, 0)
 
         if column == DataColumn.MOONALT:
-            if value.deg < 0.0:
+            if value < 0.0:
                 return QColor(0, 255, 0)
-            elif value.deg < 10.0:
+            elif value < 10.0:
                 return QColor(255, 255, 0)
             else:
                 return QColor(255, 0, 0)
@@ -402,10 +503,10 @@ class MainWindow(QMainWindow):
             return formatDMSLow(value)
         if column == DataColumn.SITELONG or column == DataColumn.SITELAT:
             return formatDMSLow(value)
-        if column == DataColumn.MOONALT:
-            return formatAngle(value)
-        if column == DataColumn.SUNALT:
-            return formatAngle(value)
+        if column == DataColumn.MOONALT or column == DataColumn.SUNALT:
+            if math.isnan(value):
+                return "n/a"
+            return formatDMS(value)
         if column == DataColumn.DEWPOINT:
             return "{value:.1f}".format(value=value)
 
@@ -502,6 +603,22 @@ class MainWindow(QMainWindow):
             dlg.setText(str(e))
             dlg.exec()
 
+    def OnDitherReferenceIndexChanged(self, index):
+        """
+        Update the dither graph, when the user selects another reference for the offsets
+        """
+        if self.sessionData is None or self.sessionData.data is None or self.sessionData.data.empty:
+            return
+        try:
+            self.updateDitherGraph()
+        except Exception as e:
+            self.log.error("Error in OnDitherReferenceIndexChanged")
+            self.log.exception(e)
+            dlg = QMessageBox(self)
+            dlg.setWindowTitle("An error occurred")
+            dlg.setText(str(e))
+            dlg.exec()
+
     def updateDitherGraph(self):
         """
         The Dither chart is created from the solved positions of the images.
@@ -517,14 +634,15 @@ class MainWindow(QMainWindow):
         self.ditherChart.legend().hide()
         self.ditherChartAxis.clear()
 
-        positions = self.sessionData.getDitherData()
-        center = SkyOffsetFrame(origin=positions[0])
-        ditherPositionsRA = []
-        ditherPositionsDEC = []
-        for pos in positions:
-            d = pos.transform_to(center)
-            ditherPositionsRA.append(d.lon.degree * 3600.0)
-            ditherPositionsDEC.append(d.lat.degree * 3600.0)
+        dither = self.sessionData.getDitherOffsets(self.ditherReferenceBox.currentData())
+        ditherPositionsRA = dither['ra'].tolist()
+        ditherPositionsDEC = dither['dec'].tolist()
+        statistics = dither['statistics']
+        if statistics['count'] > 0:
+            self.ditherStatistics.setText("Dither steps: {count}, median {median:.1f}\", mean {mean:.1f}\", "
+                                          "min {min:.1f}\", max {max:.1f}\"".format(**statistics))
+        else:
+            self.ditherStatistics.setText("")
 
         x_axis = QValueAxis()
         x_axis.setRange(min(ditherPositionsRA), max(ditherPositionsRA))
@@ -553,8 +671,7 @@ class MainWindow(QMainWindow):
         series = QLineSeries()
         series.setPointsVisible(True)
 
-        for i in range(0, len(ditherPositionsRA)):
-            series.append(ditherPositionsRA[i], ditherPositionsDEC[i])
+        series.append([QPointF(x, y) for x, y in zip(ditherPositionsRA, ditherPositionsDEC)])
 
         pen = series.pen()
         pen.setColor(QColor(255, 255, 0, 255))   # Yellow
@@ -658,9 +775,6 @@ class MainWindow(QMainWindow):
             data = currentRow[1]
 
             if data is not None:
-                if graphType == DataColumn.MOONALT or graphType == DataColumn.SUNALT:
-                    data = data.degree
-
                 series.append(index, data)
                 values.append(data)
 
@@ -678,6 +792,11 @@ class MainWindow(QMainWindow):
 
         return indices
 
+    def updateGuidingTimeline(self):
+        if self.sessionData.guidingData is None:
+            return
+        self.guidingTimeline.setGuidingData(self.sessionData.guidingData)
+
     def updateGuideGraph(self):
         rowIndex = self.imagesTable.currentRow()
         self.log.info("Updating guide graph for row %i", rowIndex)
@@ -768,6 +887,8 @@ class MainWindow(QMainWindow):
 
 
 if __name__ == "__main__":
+    # Needed for the worker processes used to scan fits headers in the frozen application
+    multiprocessing.freeze_support()
     os.environ['PYQTGRAPH_QT_LIB'] = 'PyQt6'
 
     # Setup two log handlers: One for the console, one (more detailed) to a file.
@@ -778,6 +899,9 @@ if __name__ == "__main__":
     logging.getLogger().addHandler(fhdlr)
     logging.getLogger().setLevel(logging.INFO)  # TODO Make default log level a configuration item.
 
+    # Use the bundled IERS tables, astropy must not try to download them
+    logIersStatus(configureAstropy())
+
     app = QApplication(sys.argv)
     # Apply the complete dark theme to your Qt App.
     # qdarktheme.setup_theme()
@@ -1,9 +1,15 @@
 import math
+import re
+
+import numpy as np
+
+# Date and time, separated by 'T' (ISO, e.g. DATE-OBS) or ' ' (PHD2 logs), optional fraction of seconds
+DATETIME = re.compile(r'\s*(-?\d+)-(\d+)-(\d+)[T ](\d+):(\d+):(\d+(?:\.\d*)?)\s*$')
 
 
 def convertToJulianDate(dateTimeStr):
 
-    parts = dateTimeStr.split("T")
+    parts = dateTimeStr.replace(" ", "T", 1).split("T")
     dayParts = parts[0].split("-")
     hourParts = parts[1].split(":")
     month = int(dayParts[1])
@@ -46,3 +52,111 @@ def getJulianDate(year, month, day, hour, minute, seconds):
     midnight = 365.0 * yy - 679004.0 + (b + daysForMonths + day)
     fracOfDay = ddd(hour, minute, seconds) / 24.0
     return midnight + fracOfDay
+
+
+def getJulianDates(year, month, day, hour, minute, seconds):
+    """
+    Vectorized `getJulianDate` for arrays of date and time components, with identical results.
+    """
+    yy = np.asarray(year, dtype=np.int64)
+    mon = np.asarray(month, dtype=np.int64)
+    day = np.asarray(day, dtype=np.int64)
+    hour = np.asarray(hour, dtype=np.float64)
+    minute = np.asarray(minute, dtype=np.float64)
+    seconds = np.asarray(seconds, dtype=np.float64)
+
+    early = mon <= 2
+    mon = np.where(early, mon + 12, mon)
+    yy = np.where(early, yy - 1, yy)
+
+    julian = -2 + np.floor((yy + 4716) / 4).astype(np.int64) - 1179
+    gregorian = np.floor(yy / 400).astype(np.int64) - np.floor(yy / 100).astype(np.int64) \
+        + np.floor(yy / 4).astype(np.int64)
+    b = np.where((10000 * yy + 100 * mon + day) <= 15821004, julian, gregorian)
+
+    daysForMonths = np.floor(30.6001 * (mon + 1)).astype(np.int64)
+    midnight = 365.0 * yy - 679004.0 + (b + daysForMonths + day)
+
+    sign = np.where((hour < 0) | (minute < 0) | (seconds < 0.0), -1.0, 1.0)
+    fracOfDay = (sign * (np.abs(hour) + np.abs(minute) / 60.0 + np.abs(seconds) / 3600.0)) / 24.0
+    return midnight + fracOfDay
+
+
+def convertToJulianDates(dateTimes):
+    """
+    Convert an array (or list, Series) of date time strings to an array of julian dates.
+
+    Accepts ISO timestamps (`2024-01-10T19:40:01.396`, as in DATE-OBS) and PHD2 timestamps (`2024-01-10 19:40:01`).
+    The results are identical to `convertToJulianDate`, fractions of seconds are preserved.
+    Raises ValueError, if a string cannot be parsed.
+    """
+    values = np.asarray(dateTimes, dtype=np.str_)
+    if values.ndim != 1:
+        values = values.reshape(-1)
+    if len(values) == 0:
+        return np.empty(0, dtype=np.float64)
+
+    components = _parseFixedWidth(values)
+    if components is None:
+        components = _parseRegex(values)
+    return getJulianDates(*components) + 2400000.5
+
+
+def _parseFixedWidth(values):
+    """
+    Fast path: all strings have the same layout `YYYY-MM-DD?HH:MM:SS[.fff]`, parse their digits as arrays.
+    Returns None, if the strings do not match.
+    """
+    width = values.dtype.itemsize // 4
+    if width < 19 or width == 20:
+        return None
+    codes = values.view(np.uint32).reshape(len(values), width)
+    separators = codes[:, [4, 7, 10, 13, 16]]
+    if not (np.all(separators[:, [0, 1]] == ord('-')) and np.all(separators[:, [3, 4]] == ord(':'))
+            and np.all((separators[:, 2] == ord('T')) | (separators[:, 2] == ord(' ')))):
+        return None
+    digitColumns = [0, 1, 2, 3, 5, 6, 8, 9, 11, 12, 14, 15, 17, 18]
+    if width > 19:
+        if not np.all(codes[:, 19] == ord('.')):
+            return None
+        digitColumns += list(range(20, width))
+    digits = codes[:, digitColumns].astype(np.int64) - ord('0')
+    if np.any((digits < 0) | (digits > 9)):
+        return None
+
+    def number(first, count):
+        value = np.zeros(len(values), dtype=np.int64)
+        for i in range(first, first + count):
+            value = value * 10 + digits[:, i]
+        return value
+
+    year = number(0, 4)
+    month = number(4, 2)
+    day = number(6, 2)
+    hour = number(8, 2)
+    minute = number(10, 2)
+    # Seconds as integer of all digits divided by a power of ten, i.e. correctly rounded like float("SS.fff")
+    fraction = width - 20 if width > 19 else 0
+    seconds = number(12, 2 + fraction) / float(10 ** fraction)
+    return (year, month, day, hour, minute, seconds)
+
+
+def _parseRegex(values):
+    count = len(values)
+    year = np.empty(count, dtype=np.int64)
+    month = np.empty(count, dtype=np.int64)
+    day = np.empty(count, dtype=np.int64)
+    hour = np.empty(count, dtype=np.int64)
+    minute = np.empty(count, dtype=np.int64)
+    seconds = np.empty(count, dtype=np.float64)
+    for i, value in enumerate(values):
+        match = DATETIME.match(value)
+        if match is None:
+            raise ValueError("Cannot parse date and time: '%s'" % value)
+        year[i] = int(match.group(1))
+        month[i] = int(match.group(2))
+        day[i] = int(match.group(3))
+        hour[i] = int(match.group(4))
+        minute[i] = int(match.group(5))
+        seconds[i] = float(match.group(6))
+    return (year, month, day, hour, minute, seconds)
@@ -0,0 +1,93 @@
+import logging
+import os
+import time
+
+import DataColumn as Columns
+import FitsHeader as fh
+
+
+class LightFrameWatcher:
+    """
+    Watch the light frame folder of a session and append new frames, while they are written.
+
+    `poll()` needs to be called periodically (e.g. from a QTimer). A new file is appended, once it is
+    complete: either its size and modification time did not change since the previous poll, or it was
+    last modified more than `settleTime` seconds ago.
+    Files, that cannot be read yet are retried on the next poll, files which are not light frames are ignored.
+    """
+
+    def __init__(self, sessionData, cache=None, settleTime=2.0):
+        self.sessionData = sessionData
+        self.cache = cache
+        self.settleTime = settleTime
+        self.pending = dict()
+        self.known = set()
+        self.log = logging.getLogger("LightFrameWatcher")
+        if sessionData.data is not None and Columns.FNAME in sessionData.data.columns:
+            self.known.update(sessionData.data[Columns.FNAME])
+
+    def getFolder(self):
+        return self.sessionData.imageFolder
+
+    def findCompleteFiles(self) -> list[str]:
+        """
+        Return the names of new, completely written fits files in the watched folder.
+        """
+        now = time.time()
+        complete = []
+        seen = set()
+        with os.scandir(self.getFolder()) as entries:
+            for entry in entries:
+                name = entry.name
+                if name in self.known or not fh.isFitsFile(name) or not entry.is_file():
+                    continue
+                seen.add(name)
+                stat = entry.stat()
+                signature = (stat.st_size, stat.st_mtime_ns)
+                if self.pending.get(name) == signature or now - stat.st_mtime >= self.settleTime:
+                    complete.append(name)
+                else:
+                    self.pending[name] = signature
+
+        # Forget files, which disappeared
+        for name in list(self.pending.keys()):
+            if name not in seen:
+                del self.pending[name]
+
+        complete.sort()
+        return complete
+
+    def poll(self) -> list[str]:
+        """
+        Append new light frames to the session data, return the appended file names.
+        """
+        if self.getFolder() is None:
+            return []
+
+        files = self.findCompleteFiles()
+        if len(files) == 0:
+            return []
+
+        try:
+            self.sessionData.appendLightFrames(files, cache=self.cache)
+            appended = files
+        except (OSError, KeyError, ValueError):
+            # Isolate the files causing trouble
+            appended = []
+            for name in files:
+                try:
+                    self.sessionData.appendLightFrames([name], cache=self.cache)
+                    appended.append(name)
+                except OSError as e:
+                    self.log.info("Retrying %s later: %s", name, str(e))
+                except (KeyError, ValueError) as e:
+                    self.log.warning("Ignoring %s, not a light frame: %s", name, str(e))
+                    self.known.add(name)
+
+        for name in appended:
+            self.known.add(name)
+            self.pending.pop(name, None)
+
+        if appended:
+            self.log.info("Appended %i new light frames", len(appended))
+        return appended
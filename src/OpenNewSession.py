@@ -6,6 +6,10 @@ from PyQt6.QtWidgets import QTableWidget
 from PyQt6.QtWidgets import QVBoxLayout, QHBoxLayout
 from PyQt6.QtWidgets import QWidget, QDialog, QGroupBox, QPushButton, QTableWidgetItem, QLabel
 
+from FitsHeader import isFitsFile
+from HeaderCache import getDefaultHeaderCache
+from GuideLogCache import getDefaultGuideLogCache
+
 
 class OpenNewSession(QDialog):
     """
@@ -162,7 +166,7 @@ class OpenNewSession(QDialog):
     def OnLoadGuidingLog(self):
         logFile = QFileDialog.getOpenFileName(self, "Select the Guiding Log file...", filter="Text Files (*.txt)")
         if logFile is not None and not logFile[0] == '':
-            self.imageData.readGuidingData(logFile[0])
+            self.imageData.readGuidingData(logFile[0], cache=getDefaultGuideLogCache())
             self.guidingText.setText(str(self.imageData.guidingData.count()) + " Guiding Frames loaded...")
             self.imageData.process()
 
@@ -173,13 +177,13 @@ class OpenNewSession(QDialog):
         fileNames = []
         for (dirpath, dirnames, filenames) in walk(lightFramesDir):
             for fname in filenames:
-                if fname.endswith('.fits') or fname.endswith('.fit'):
+                if isFitsFile(fname):
                     fileNames.append(fname)
             break
 
         self.imageData.imageFolder = lightFramesDir
         self.imageData.createNew()
-        self.imageData.parseLightFrames(lightFramesDir, fileNames)
+        self.imageData.parseLightFrames(lightFramesDir, fileNames, workers=None, cache=getDefaultHeaderCache())
 
         self.imageData.process()
 
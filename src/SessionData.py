@@ -1,19 +1,139 @@
 import math
 import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 
+import numpy as np
 import pandas as pd
 # from PyQt6.QtGui import QColor
-from astropy import units as u
-from astropy.coordinates import FK5, SkyCoord
 
 import DataColumn
 import DataColumn as Columns
+from DitherStatistics import REFERENCEFIRST, REFERENCEPIERSIDE, REFERENCETARGET, computeDitherOffsets, getPositions
+from EphemerisCache import getDefaultEphemerisCache, getNightId
 import FitsHeader as fh
 import FitsHeaderKeys as fhk
+from GuideLogFollower import GuideLogFollower
+from GuideLogIndex import GuideLogIndex, readOverlappingSections
 from GuidingData import GuidingSessionData
 from GuidingFrameAnalysis import GuidingFrameAnalysis
-from JulianDate import convertToJulianDate
-from Spherical import getMoonAltAz, getSunAltAz
+from GuidingStatistics import analyseExposures
+from JulianDate import convertToJulianDates
+
+# Columns read from the light frame headers by parseLightFrames: (column, fits key, required)
+LIGHTFRAMECOLUMNS = [
+    (Columns.EXPOSURE, fhk.EXPOSURE, True),
+    (Columns.EXPSTART, fhk.STARTTIME, True),
+    (Columns.GAIN, fhk.GAIN, True),
+    (Columns.OFFSET, fhk.OFFSET, True),
+    (Columns.PIXSIZE, fhk.XPIXSZ, True),
+    (Columns.CAMERA, fhk.CAMERA, True),
+    (Columns.CCDSETTEMP, fhk.CCDSETTEMP, True),
+    (Columns.CCDTEMP, fhk.CCDTEMP, True),
+    (Columns.BAYERPAT, fhk.BAYERPATTERN, True),
+    (Columns.TELESCOPE, fhk.TELESCOPE, True),
+    (Columns.FOCALLENGTH, fhk.FOCALLENGTH, True),
+    (Columns.FOCRATIO, fhk.FOCALRATIO, True),
+    (Columns.RA, fhk.RA, True),
+    (Columns.DEC, fhk.DEC, True),
+    (Columns.ALTITUDE, fhk.ALTITUDE, True),
+    (Columns.AZIMUTH, fhk.AZIMUTH, True),
+    (Columns.AIRMASS, fhk.AIRMASS, True),
+    (Columns.PIERSIDE, fhk.PIERSIDE, True),
+    (Columns.SITEELEV, fhk.OBS_ELEVATION, True),
+    (Columns.SITELONG, fhk.OBS_LONG, True),
+    (Columns.SITELAT, fhk.OBS_LAT, True),
+    (Columns.FILTER, fhk.FILTER, True),
+    (Columns.OBJECT, fhk.TARGET, True),
+    (Columns.ROTATION, fhk.TARGETROTATION, True),
+    (Columns.FOCUSERPOS, fhk.FOCPOS, False),
+    (Columns.FOCUSERTEMP, fhk.FOCTEMP, False),
+    (Columns.DEWPOINT, fhk.DEWPOINT, False),
+    (Columns.HUMIDITY, fhk.HUMIDITY, False),
+    (Columns.PRESSURE, fhk.PRESSURE, False),
+    (Columns.AMBIENTTEMP, fhk.AMBTEMP, False),
+    (Columns.WINDDIR, fhk.WINDDIR, False),
+    (Columns.WINDSPD, fhk.WINDSPD, False),
+]
+
+LIGHTFRAMEKEYS = [key for _, key, _ in LIGHTFRAMECOLUMNS]
+
+# Columns computed by SessionData.process()
+DERIVEDCOLUMNS = [Columns.RMS, Columns.RMSRA, Columns.RMSDEC, Columns.GUIDINGPIXRA, Columns.GUIDINGPIXDEC,
+                  Columns.GUIDINGPIX, Columns.GUIDINGMINRA, Columns.GUIDINGMAXRA, Columns.GUIDINGMINDEC,
+                  Columns.GUIDINGMAXDEC, Columns.GUIDINGPEAKSRA, Columns.GUIDINGPEAKSDEC, Columns.GUIDINGMINSNR,
+                  Columns.GUIDINGMAXSNR, Columns.GUIDINGRMSSNR, Columns.GUIDINGMINSTARMASS,
+                  Columns.MOONALT, Columns.SUNALT]
+
+# Below this number of files, a process pool costs more than it saves
+PARALLELSCANMINFILES = 64
+
+
+def _emptyColumns():
+    return {column: [] for column, _, _ in LIGHTFRAMECOLUMNS}
+
+
+def _appendHeader(columns, header):
+    for column, key, required in LIGHTFRAMECOLUMNS:
+        columns[column].append(header[key] if required else header.get(key))
+
+
+def readLightFrameHeaders(folder, filenames):
+    """
+    Read the headers of the given light frames and return them as a dict of column lists.
+
+    This is a module level function, so that it can be executed in a worker process.
+    """
+    columns = _emptyColumns()
+    for fname in filenames:
+        _appendHeader(columns, fh.readFitsHeader(os.path.join(folder, fname), LIGHTFRAMEKEYS))
+    return columns
+
+
+def scanLightFrameHeaders(folder, filenames, workers=1, chunkSize=None, cache=None):
+    """
+    Read the headers of the given light frames, using a pool of `workers` processes.
+
+    The file list is split into chunks of `chunkSize` files (by default about four chunks per worker),
+    the column lists returned for the chunks are concatenated in file order.
+    If a `HeaderCache` is passed, only headers missing from the cache are read and then added to it.
+    """
+    if cache is None:
+        return _scanLightFrameHeaders(folder, filenames, workers, chunkSize)
+
+    paths = [os.path.join(folder, fname) for fname in filenames]
+    headers = cache.lookupMany(paths, LIGHTFRAMEKEYS)
+    missing = [i for i, header in enumerate(headers) if header is None]
+    if missing:
+        scanned = _scanLightFrameHeaders(folder, [filenames[i] for i in missing], workers, chunkSize)
+        stored = []
+        for j, i in enumerate(missing):
+            headers[i] = {key: scanned[column][j] for column, key, _ in LIGHTFRAMECOLUMNS}
+            stored.append((paths[i], headers[i]))
+        cache.storeMany(stored, LIGHTFRAMEKEYS)
+
+    columns = _emptyColumns()
+    for header in headers:
+        _appendHeader(columns, header)
+    return columns
+
+
+def _scanLightFrameHeaders(folder, filenames, workers, chunkSize):
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(filenames) < PARALLELSCANMINFILES:
+        return readLightFrameHeaders(folder, filenames)
+
+    if chunkSize is None:
+        chunkSize = max(1, math.ceil(len(filenames) / (4 * workers)))
+    chunks = [filenames[i:i + chunkSize] for i in range(0, len(filenames), chunkSize)]
+
+    columns = _emptyColumns()
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+        for result in pool.map(readLightFrameHeaders, repeat(folder), chunks):
+            for column, values in result.items():
+                columns[column].extend(values)
+    return columns
 
 
 class SessionData:
@@ -46,11 +166,19 @@ class SessionData:
     def __init__(self):
         self.imageFolder = None
         self.guidingData = None
+        self.guidingLogFile = None
+        # Sections read from `guidingLogFile`
+        self.guidingLogSections = []
+        self.guidingFollower = None
+        self.ephemerisCache = None
         self.data = None
 
     def createNew(self):
         self.data = pd.DataFrame(columns=Columns.Columns)
         self.guidingData = GuidingSessionData()
+        self.guidingLogFile = None
+        self.guidingLogSections = []
+        self.guidingFollower = None
         self.imageFolder = None
 
     def getColumns(self):
@@ -124,9 +252,70 @@ class SessionData:
 
         return header
 
-    def readGuidingData(self, filename):
+    def readGuidingData(self, filename, cache=None):
+        """
+        Read the guiding sections of a PHD2 guide log, using the `GuideLogCache` `cache` if given.
+
+        If light frames are loaded, only the sections overlapping their exposures are read.
+        """
         self.guidingData = GuidingSessionData()
-        self.guidingData.readGuidingSessionData(filename)
+        if self.data is not None and not self.data.empty and Columns.EXPSTARTJDD in self.data.columns:
+            jd1 = self.data[Columns.EXPSTARTJDD].to_numpy(dtype=float)
+            jd2 = jd1 + self.data[Columns.EXPOSURE].to_numpy(dtype=float) / 86400.0
+            self.guidingData.addSections(readOverlappingSections(filename, jd1, jd2, cache))
+        else:
+            self.guidingData.readGuidingSessionData(filename, cache)
+        self.guidingLogFile = filename
+        self.guidingLogSections = list(self.guidingData.guidingData)
+        self.guidingFollower = None
+
+    def followGuidingData(self, filename=None, cache=None) -> GuideLogFollower:
+        """
+        Follow a guide log, that is still being written, and return the follower, that keeps reading from it.
+        Without `filename` the guide log read last is followed, another log is read first (see `readGuidingData()`).
+
+        The sections already read from the log and sections from other logs are kept. The follower continues after
+        the last section read, so only the sections written since are parsed (see `GuideLogIndex.getResumePoint()`).
+        New frames are read by `updateGuidingData()`.
+        """
+        if filename is not None and filename != self.guidingLogFile:
+            self.readGuidingData(filename, cache)
+        if self.guidingFollower is not None:
+            # Still following the same log, e.g. after live mode was paused
+            self.updateGuidingData()
+            return self.guidingFollower
+        if self.guidingData is None:
+            self.guidingData = GuidingSessionData()
+
+        sections = self.guidingLogSections
+        start = max(section.guidingStart for section in sections) if len(sections) > 0 else None
+        (offset, rates) = GuideLogIndex(self.guidingLogFile).getResumePoint(start)
+        self.guidingFollower = GuideLogFollower(self.guidingLogFile, self.guidingData)
+        self.guidingFollower.resume(sections, offset, rates)
+        self.updateGuidingData()
+        return self.guidingFollower
+
+    def updateGuidingData(self) -> int:
+        """
+        Read the frames appended to the followed guide log and update the guiding statistics.
+        Returns the number of new frames.
+        """
+        if self.guidingFollower is None:
+            return 0
+        added = self.guidingFollower.poll()
+        if added > 0 and self.data is not None and not self.data.empty and Columns.EXPSTARTJDD in self.data.columns:
+            self.analyzeAllGuidingFrames(self.guidingData, self.data)
+        return added
+
+    def addGuidingData(self, sections) -> None:
+        """
+        Add guiding sections (e.g. imported from several guide logs) and update the guiding statistics.
+        """
+        if self.guidingData is None:
+            self.guidingData = GuidingSessionData()
+        self.guidingData.addSections(sections)
+        if self.data is not None and not self.data.empty and Columns.EXPSTARTJDD in self.data.columns:
+            self.analyzeAllGuidingFrames(self.guidingData, self.data)
 
     def readMetaData(self, filename):
         print(filename)
@@ -152,130 +341,106 @@ class SessionData:
     def getMax(self, column):
         return self.data[column].max()
 
-    def parseLightFrames(self, folder, filenames):
+    def parseLightFrames(self, folder, filenames, workers=1, cache=None):
+        """
+        Read the headers of the light frames `filenames` in `folder` into `self.data`.
+
+        With `workers` > 1 (or None for one worker per cpu) the headers are read by a process pool.
+        Headers are looked up in the `HeaderCache` `cache` first, if one is passed.
+        """
         self.imageFolder = folder
 
-        fnames = []
-        exposures = []
-        startexposuresJdd = []
-        startexposures = []
-        gains = []
-        offsets = []
-        resolutions = []
-        cameras = []
-        setTemps = []
-        sensorTemps = []
-        bayers = []
-        telescopes = []
-        focalLengths = []
-        focalRatios = []
-        focuserPositions = []
-        focuserTemps = []
-        ras = []
-        decs = []
-        altitudes = []
-        azimuths = []
-        airmasses = []
-        piersides = []
-        elevations = []
-        latitudes = []
-        longitudes = []
-        filters = []
-        objects = []
-        rotations = []
-        dewPoints = []
-        humidities = []
-        pressures = []
-        ambientTemps = []
-        windDirections = []
-        windSpeeds = []
-
-        for fname in filenames:
-            header = fh.getFitsHeader(os.path.join(folder, fname))
-            fnames.append(fname)
-            exposures.append(header[fhk.EXPOSURE])
-            startexposures.append(header[fhk.STARTTIME])
-            jdd = convertToJulianDate(header[fhk.STARTTIME])
-            startexposuresJdd.append(jdd)
-            gains.append(header[fhk.GAIN])
-            offsets.append(header[fhk.OFFSET])
-            resolutions.append(header[fhk.XPIXSZ])
-            cameras.append(header[fhk.CAMERA])
-            setTemps.append(header[fhk.CCDSETTEMP])
-            sensorTemps.append(header[fhk.CCDTEMP])
-            bayers.append(header[fhk.BAYERPATTERN])
-            telescopes.append(header[fhk.TELESCOPE])
-            focalLengths.append(header[fhk.FOCALLENGTH])
-            focalRatios.append(header[fhk.FOCALRATIO])
-            focuserPositions.append(header.get(fhk.FOCPOS))
-            focuserTemps.append(header.get(fhk.FOCTEMP))
-
-            ras.append(header[fhk.RA])
-            decs.append(header[fhk.DEC])
-            altitudes.append(header[fhk.ALTITUDE])
-            azimuths.append(header[fhk.AZIMUTH])
-            airmasses.append(header[fhk.AIRMASS])
-            piersides.append(header[fhk.PIERSIDE])
-            elevations.append(header[fhk.OBS_ELEVATION])
-            latitudes.append(header[fhk.OBS_LAT])
-            longitudes.append(header[fhk.OBS_LONG])
-            filters.append(header[fhk.FILTER])
-            objects.append(header[fhk.TARGET])
-            rotations.append(header[fhk.TARGETROTATION])
-            dewPoints.append(header.get(fhk.DEWPOINT))
-            humidities.append(header.get(fhk.HUMIDITY))
-            pressures.append(header.get(fhk.PRESSURE))
-            ambientTemps.append(header.get(fhk.AMBTEMP))
-            windDirections.append(header.get(fhk.WINDDIR))
-            windSpeeds.append(header.get(fhk.WINDSPD))
-
-        indices = []
-        startTimes = list(startexposuresJdd)
-        startTimes.sort()
-
-        for time in startexposuresJdd:
-            index = startTimes.index(time) + 1
-            indices.append(index)
+        columns = scanLightFrameHeaders(folder, filenames, workers, cache=cache)
+        frame = self.createLightFrameRecords(filenames, columns)
+        self.setExposureIndices(frame)
+
+        self.data = frame.sort_values(Columns.INDEX, kind='stable')
+
+    def appendLightFrames(self, filenames, cache=None):
+        """
+        Append new light frames from `self.imageFolder` to `self.data`.
+
+        Only the headers of the new frames are read, and derived columns (guiding statistics,
+        sun and moon altitudes) are only computed for the new rows. Returns the number of appended rows.
+        """
+        if len(filenames) == 0:
+            return 0
+        if self.data is None or self.data.empty:
+            self.parseLightFrames(self.imageFolder, filenames, cache=cache)
+            self.process()
+            return len(filenames)
+
+        columns = scanLightFrameHeaders(self.imageFolder, filenames, cache=cache)
+        first = self.data.index.max() + 1
+        frame = self.createLightFrameRecords(filenames, columns, range(first, first + len(filenames)))
+
+        data = pd.concat([self.data, frame])
+        self.setExposureIndices(data)
+        self.data = data.sort_values(Columns.INDEX, kind='stable')
+
+        self.processRows(frame.index)
+        return len(filenames)
+
+    @staticmethod
+    def createLightFrameRecords(filenames, columns, index=None):
+        """
+        Create a dataframe from the header columns returned by `scanLightFrameHeaders`.
+        """
+        startexposuresJdd = convertToJulianDates(columns[Columns.EXPSTART])
 
         records = {
-            Columns.INDEX: indices,
-            Columns.FNAME: fnames,
-            Columns.EXPOSURE: exposures,
-            Columns.EXPSTART: startexposures,
-            Columns.EXPSTARTJDD: startexposuresJdd,
-            Columns.GAIN: gains,
-            Columns.OFFSET: offsets,
-            Columns.PIXSIZE: resolutions,
-            Columns.CAMERA: cameras,
-            Columns.CCDSETTEMP: setTemps,
-            Columns.CCDTEMP: sensorTemps,
-            Columns.BAYERPAT: bayers,
-            Columns.TELESCOPE: telescopes,
-            Columns.FOCALLENGTH: focalLengths,
-            Columns.FOCRATIO: focalRatios,
-            Columns.RA: ras,
-            Columns.DEC: decs,
-            Columns.ALTITUDE: altitudes,
-            Columns.AZIMUTH: azimuths,
-            Columns.AIRMASS: airmasses,
-            Columns.PIERSIDE: piersides,
-            Columns.SITEELEV: elevations,
-            Columns.SITELONG: longitudes,
-            Columns.SITELAT: latitudes,
-            Columns.FILTER: filters,
-            Columns.OBJECT: objects,
-            Columns.ROTATION: rotations,
-            Columns.FOCUSERPOS: focuserPositions,
-            Columns.FOCUSERTEMP: focuserTemps,
-            Columns.DEWPOINT: dewPoints,
-            Columns.HUMIDITY: humidities,
-            Columns.PRESSURE: pressures,
-            Columns.AMBIENTTEMP: ambientTemps,
-            Columns.WINDDIR: windDirections,
-            Columns.WINDSPD: windSpeeds,
+            Columns.INDEX: [0] * len(filenames),
+            Columns.NIGHTINDEX: [0] * len(filenames),
+            Columns.TARGETINDEX: [0] * len(filenames),
+            Columns.FNAME: list(filenames),
         }
+        for column, _, _ in LIGHTFRAMECOLUMNS:
+            records[column] = columns[column]
+            if column == Columns.EXPSTART:
+                records[Columns.EXPSTARTJDD] = startexposuresJdd
+
+        return pd.DataFrame(records, index=index)
 
-        self.data = pd.DataFrame(records).sort_values(Columns.INDEX)
+    @staticmethod
+    def getExposureIndices(startexposuresJdd, groups=None):
+        """
+        Number the exposures by start time, starting with 1 (within each group, if `groups` are given).
+
+        Exposures with the same start time are numbered in row order, exposures without start time come last.
+        """
+        startTimes = np.asarray(startexposuresJdd, dtype=np.float64)
+        if groups is None:
+            order = np.argsort(startTimes, kind='stable')
+            groupStarts = np.zeros(len(order), dtype=np.int64)
+        else:
+            (_, codes) = np.unique(np.asarray(groups), return_inverse=True)
+            codes = codes.reshape(-1)
+            # lexsort is stable: by group, then start time, then row
+            order = np.lexsort((startTimes, codes))
+            sortedCodes = codes[order]
+            first = np.flatnonzero(np.concatenate(([True], sortedCodes[1:] != sortedCodes[:-1])))
+            groupStarts = np.repeat(first, np.diff(np.append(first, len(order))))
+
+        indices = np.empty(len(order), dtype=np.int64)
+        indices[order] = np.arange(len(order)) - groupStarts + 1
+        return indices
+
+    @classmethod
+    def setExposureIndices(cls, frame):
+        """
+        Set the sequence numbers of the exposures: `INDEX` over all exposures, `NIGHTINDEX` within the night
+        (noon to noon local mean time at the site) and `TARGETINDEX` within the exposures of the same target.
+        """
+        startTimes = frame[Columns.EXPSTARTJDD].to_numpy(dtype=float)
+        lon = np.nan_to_num(frame[Columns.SITELONG].to_numpy(dtype=float)) if Columns.SITELONG in frame.columns \
+            else np.zeros(len(startTimes))
+        nights = getNightId(np.nan_to_num(startTimes), lon)
+        targets = frame[Columns.OBJECT].astype(str).to_numpy() if Columns.OBJECT in frame.columns \
+            else np.full(len(startTimes), '')
+
+        frame[Columns.INDEX] = cls.getExposureIndices(startTimes)
+        frame[Columns.NIGHTINDEX] = cls.getExposureIndices(startTimes, nights)
+        frame[Columns.TARGETINDEX] = cls.getExposureIndices(startTimes, targets)
 
     def process(self):
         if self.guidingData.count() > 0 and not self.data.empty:
@@ -284,28 +449,65 @@ class SessionData:
 
             return
 
-    def calculateSunMoonPositions(self):
-        sunAlt = []
-        moonAlt = []
-
-        for rowIndex, image in self.data.iterrows():
-            lon = image[Columns.SITELONG]
-            lat = image[Columns.SITELAT]
-            jd = image[Columns.EXPSTARTJDD]
-            moonAlt.append(getMoonAltAz(jd, lon, lat).alt)
-            sunAlt.append(getSunAltAz(jd, lon, lat).alt)
-
-        self.data[Columns.MOONALT] = moonAlt
-        self.data[Columns.SUNALT] = sunAlt
+    def processRows(self, labels):
+        """
+        Compute the derived columns only for the rows with the given index labels.
+        """
+        if self.guidingData.count() > 0 and not self.data.empty:
+            rows = self.data.loc[labels].copy()
+            self.analyzeAllGuidingFrames(self.guidingData, rows)
+            self.calculateSunMoonPositions(rows)
+
+            for column in DERIVEDCOLUMNS:
+                if column in rows.columns:
+                    if column not in self.data.columns:
+                        self.data[column] = np.nan
+                    self.data.loc[labels, column] = rows[column]
+
+    def calculateSunMoonPositions(self, imageData=None):
+        """
+        Set the altitudes of moon and sun (float, degree) at the start of each exposure.
+
+        The positions are interpolated from the `EphemerisCache` (`self.ephemerisCache` or the default cache),
+        with one lookup per site.
+        """
+        if imageData is None:
+            imageData = self.data
+        cache = self.ephemerisCache if self.ephemerisCache is not None else getDefaultEphemerisCache()
+
+        lon = imageData[Columns.SITELONG].to_numpy(dtype=float)
+        lat = imageData[Columns.SITELAT].to_numpy(dtype=float)
+        jd = imageData[Columns.EXPSTARTJDD].to_numpy(dtype=float)
+        sunAlt = np.full(len(jd), np.nan)
+        moonAlt = np.full(len(jd), np.nan)
+
+        sites = pd.DataFrame({'lon': lon, 'lat': lat}).groupby(['lon', 'lat'], sort=False, dropna=False).indices
+        for (siteLon, siteLat), rows in sites.items():
+            positions = cache.getPositions(jd[rows], siteLon, siteLat)
+            moonAlt[rows] = positions['moonAlt']
+            sunAlt[rows] = positions['sunAlt']
+
+        imageData[Columns.MOONALT] = moonAlt
+        imageData[Columns.SUNALT] = sunAlt
 
     def getDitherData(self):
-        positions = []
-        for rowIndex, image in self.data.iterrows():
-            ra = image[Columns.RA]
-            dec = image[Columns.DEC]
-            positions.append(SkyCoord(frame=FK5, ra=ra * u.degree, dec=dec * u.degree))
-
-        return positions
+        """
+        Return the solved positions of all frames (in table order) as one array valued SkyCoord.
+        """
+        return getPositions(self.data[Columns.RA].to_numpy(dtype=float), self.data[Columns.DEC].to_numpy(dtype=float))
+
+    def getDitherOffsets(self, reference=REFERENCEFIRST) -> dict:
+        """
+        Return the dither offsets of all frames (in table order) from the first frame (`REFERENCEFIRST`), or the
+        median position of their target or pier side, and statistics of the dither steps (see `computeDitherOffsets`).
+        """
+        groups = None
+        if reference == REFERENCETARGET:
+            groups = self.data[Columns.OBJECT].astype(str).to_numpy()
+        elif reference == REFERENCEPIERSIDE:
+            groups = self.data[Columns.PIERSIDE].astype(str).to_numpy()
+        return computeDitherOffsets(self.data[Columns.RA].to_numpy(dtype=float),
+                                    self.data[Columns.DEC].to_numpy(dtype=float), groups)
 
     def analyzeGuidingFrames(self):
         self.analyzeAllGuidingFrames(self.guidingData, self.data)
@@ -318,69 +520,38 @@ class SessionData:
             return 206.0 * image[Columns.PIXSIZE] / focalLength
 
     def analyzeAllGuidingFrames(self, guidingData, imageData):
+        """
+        Set the guiding statistics columns of `imageData` from the guiding frames during each exposure.
 
-        rmsRA = []
-        rmsDEC = []
-        rms = []
-        pixelRA = []
-        pixelDEC = []
-        pixelGuiding = []
-        minRA = []
-        maxRA = []
-        minDEC = []
-        maxDEC = []
-        numPeaksRA = []
-        numPeaksDEC = []
-        minSNR = []
-        maxSNR = []
-        rmsSNR = []
-        minStarmass = []
-
-        for rowIndex, image in imageData.iterrows():
-            focalLength = image[Columns.FOCALLENGTH]
-            if focalLength <= 0.0:
-                continue
-            pixSize = 206.0 * image[Columns.PIXSIZE] / focalLength
-            jd1 = image[Columns.EXPSTARTJDD]
-            jd2 = jd1 + image[Columns.EXPOSURE] / 86400.0
-            guidingFrames = guidingData.getGuidingFrames(jd1, jd2)
-
-            if guidingFrames is not None and len(guidingFrames) > 0:
-                analyse = self.analyseFrames(guidingFrames, pixSize)
-                rmsRA.append(analyse.rmsRA)
-                rmsDEC.append(analyse.rmsDEC)
-                rms.append(analyse.rms)
-                pixelRA.append(analyse.pixelRA)
-                pixelDEC.append(analyse.pixelDEC)
-                pixelGuiding.append(analyse.pixelTotal)
-                minRA.append(analyse.minRA)
-                maxRA.append(analyse.maxRA)
-                minDEC.append(analyse.minDEC)
-                maxDEC.append(analyse.maxDEC)
-                numPeaksRA.append(analyse.numPeaksRA)
-                numPeaksDEC.append(analyse.numPeaksDEC)
-                minSNR.append(analyse.minSNR)
-                maxSNR.append(analyse.maxSNR)
-                rmsSNR.append(analyse.rmsSNR)
-                minStarmass.append(analyse.minStarmass)
-
-        if imageData.shape[0] == len(rms):
-            imageData[Columns.RMS] = rms
-            imageData[Columns.RMSRA] = rmsRA
-            imageData[Columns.RMSDEC] = rmsDEC
-            imageData[Columns.GUIDINGPIXRA] = pixelRA
-            imageData[Columns.GUIDINGPIXDEC] = pixelDEC
-            imageData[Columns.GUIDINGPIX] = pixelGuiding
-            imageData[Columns.GUIDINGMINRA] = minRA
-            imageData[Columns.GUIDINGMAXRA] = maxRA
-            imageData[Columns.GUIDINGMINDEC] = minDEC
-            imageData[Columns.GUIDINGMAXDEC] = maxDEC
-            imageData[Columns.GUIDINGPEAKSRA] = numPeaksRA
-            imageData[Columns.GUIDINGPEAKSDEC] = numPeaksDEC
-            imageData[Columns.GUIDINGMINSNR] = minSNR
-            imageData[Columns.GUIDINGMAXSNR] = maxSNR
-            imageData[Columns.GUIDINGRMSSNR] = rmsSNR
-            imageData[Columns.GUIDINGMINSTARMASS] = minStarmass
+        The columns are only set, if guiding frames were found for all exposures.
+        """
+        focalLength = imageData[Columns.FOCALLENGTH].to_numpy(dtype=float)
+        if np.any(focalLength <= 0.0):
+            return
+        pixSize = 206.0 * imageData[Columns.PIXSIZE].to_numpy(dtype=float) / focalLength
+        jd1 = imageData[Columns.EXPSTARTJDD].to_numpy(dtype=float)
+        jd2 = jd1 + imageData[Columns.EXPOSURE].to_numpy(dtype=float) / 86400.0
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            analyse = analyseExposures(guidingData.getIndex(), jd1, jd2, pixSize)
+
+        if np.all(analyse['count'] > 0):
+            imageData[Columns.RMS] = analyse['rms']
+            imageData[Columns.RMSRA] = analyse['rmsRA']
+            imageData[Columns.RMSDEC] = analyse['rmsDEC']
+            imageData[Columns.GUIDINGPIXRA] = analyse['pixelRA']
+            imageData[Columns.GUIDINGPIXDEC] = analyse['pixelDEC']
+            imageData[Columns.GUIDINGPIX] = analyse['pixelTotal']
+            imageData[Columns.GUIDINGMINRA] = analyse['minRA']
+            imageData[Columns.GUIDINGMAXRA] = analyse['maxRA']
+            imageData[Columns.GUIDINGMINDEC] = analyse['minDEC']
+            imageData[Columns.GUIDINGMAXDEC] = analyse['maxDEC']
+            imageData[Columns.GUIDINGPEAKSRA] = analyse['numPeaksRA']
+            imageData[Columns.GUIDINGPEAKSDEC] = analyse['numPeaksDEC']
+            imageData[Columns.GUIDINGMINSNR] = analyse['minSNR']
+            imageData[Columns.GUIDINGMAXSNR] = analyse['maxSNR']
+            imageData[Columns.GUIDINGRMSSNR] = analyse['rmsSNR']
+            imageData[Columns.GUIDINGMINSTARMASS] = analyse['minStarmass']
 
     @staticmethod
     def analyseFrames(guidingFrames, pixelSize):
@@ -0,0 +1,77 @@
+from array import array
+
+
+class _Column:
+    """
+    Values of one key, plus a presence bitmap (one byte per row).
+
+    Rows, in which the key was missing, are padded lazily, when the key is seen again or on materialization.
+    """
+
+    __slots__ = ("values", "present")
+
+    def __init__(self):
+        self.values = []
+        self.present = bytearray()
+
+    def pad(self, rows: int) -> None:
+        gap = rows - len(self.values)
+        if gap > 0:
+            self.values.extend([None] * gap)
+            self.present.extend(bytes(gap))
+
+
+class ColumnAccumulator:
+    """
+    Accumulates rows with heterogeneous keys column by column.
+
+    Adding a row only touches the keys present in that row, so the cost of an import stays linear
+    in the number of (row, key) pairs seen, even when new keys appear in the middle of a session.
+    Missing values are filled in once, when the columns are materialized with `toDict()`.
+    """
+
+    def __init__(self):
+        self.columns = dict()
+        self.rows = 0
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def addRow(self, values: dict) -> int:
+        """
+        Append a row, return its index.
+        """
+        row = self.rows
+        for key, value in values.items():
+            column = self.columns.get(key)
+            if column is None:
+                column = _Column()
+                self.columns[key] = column
+            column.pad(row)
+            column.values.append(value)
+            column.present.append(1)
+        self.rows += 1
+        return row
+
+    def isPresent(self, key: str, row: int) -> bool:
+        column = self.columns.get(key)
+        return column is not None and row < len(column.present) and column.present[row] == 1
+
+    def presence(self, key: str) -> array:
+        """
+        Return the presence bitmap of a column as array of bytes (1 = present) covering all rows.
+        """
+        column = self.columns[key]
+        column.pad(self.rows)
+        return array('B', column.present)
+
+    def toDict(self) -> dict:
+        """
+        Materialize all columns as `{key: {row: value}}`, i.e. in the format returned by `DataFrame.to_dict()`.
+        """
+        rows = range(self.rows)
+        result = dict()
+        for key, column in self.columns.items():
+            column.pad(self.rows)
+            result[key] = dict(zip(rows, column.values))
+        return result
@@ -1,6 +1,6 @@
 
 
-import importlib.util
+import importlib
 import os
 import sys
 import logging
@@ -55,25 +55,23 @@ class ImportFactory:
         
         # Remember the original sys.path
         original_sys_path = sys.path.copy()
+
+        # Modules are imported by their package name, so that importers can be pickled for worker processes
+        package = self.__class__.__module__.rpartition('.')[0]
   
         # Walk through all subdirectories in the base directory
         for root, dirs, files in os.walk(base_dir):
             for file_name in files:
                 # Check if the file is a Python file
-                if file_name.endswith('.py'):
+                if file_name.endswith('.py') and not file_name.startswith('__'):
                     # Remove the '.py' extension to get the class name
                     class_name = file_name[:-3] + class_suffix
-                    # Construct the full path to the file
-                    file_path = os.path.join(root, file_name)
                     # Add the directory of the file to sys.path for relative imports
                     if root not in sys.path:
                         sys.path.insert(0, root)
-                    # Create a module spec
-                    spec = importlib.util.spec_from_file_location("Importers." + class_name, file_path)
-                    # Create a module object from the spec
-                    module = importlib.util.module_from_spec(spec)
-                    # Execute the module in its own namespace
-                    spec.loader.exec_module(module)
+                    # Construct the module name from the path of the file
+                    relative = os.path.relpath(os.path.join(root, file_name[:-3]), base_dir)
+                    module = importlib.import_module('.'.join(([package] if package else []) + relative.split(os.sep)))
                     
                     # Get the class from the module
                     klass = getattr(module, class_name, None)
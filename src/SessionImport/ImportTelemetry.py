@@ -0,0 +1,94 @@
+import math
+import time
+
+from array import array
+from threading import Lock
+
+# Latency percentiles reported by getSnapshot()
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(values, p: float) -> float:
+    """
+    Return the p-th percentile (nearest rank) of a sorted sequence, None if it is empty.
+    """
+    if len(values) == 0:
+        return None
+    rank = max(1, math.ceil(p / 100.0 * len(values)))
+    return values[rank - 1]
+
+
+class ImportTelemetry:
+    """
+    Live statistics of one importer: files and bytes per second, per file latency and time spent in store.
+
+    Files are recorded by the worker threads, snapshots may be taken from any thread (e.g. the GUI) at any time.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.started = None
+        self.lastFile = None
+        self.files = 0
+        self.skipped = 0
+        self.bytes = 0
+        self.latencies = array('d')
+        self.maxQueued = 0
+        self.storeTime = None
+
+    def start(self) -> None:
+        with self.lock:
+            if self.started is None:
+                self.started = time.perf_counter()
+
+    def recordQueued(self, queued: int) -> None:
+        with self.lock:
+            self.maxQueued = max(self.maxQueued, queued)
+
+    def recordFile(self, latency: float, size: int, success: bool) -> None:
+        """
+        Record a file, that took `latency` seconds to process.
+        """
+        with self.lock:
+            now = time.perf_counter()
+            if self.started is None:
+                self.started = now - latency
+            self.lastFile = now
+            self.latencies.append(latency)
+            self.bytes += size
+            if success:
+                self.files += 1
+            else:
+                self.skipped += 1
+
+    def recordStore(self, seconds: float) -> None:
+        with self.lock:
+            self.storeTime = seconds
+
+    def getSnapshot(self) -> dict:
+        """
+        Return the current statistics as dict of plain values (times in seconds), suitable for JSON.
+        """
+        with self.lock:
+            latencies = sorted(self.latencies)
+            elapsed = 0.0
+            if self.started is not None:
+                end = self.lastFile if self.lastFile is not None else time.perf_counter()
+                elapsed = max(0.0, end - self.started)
+            snapshot = {
+                "files": self.files,
+                "skipped": self.skipped,
+                "bytes": self.bytes,
+                "elapsed": elapsed,
+                "filesPerSecond": (self.files + self.skipped) / elapsed if elapsed > 0 else None,
+                "bytesPerSecond": self.bytes / elapsed if elapsed > 0 else None,
+                "parseTime": math.fsum(latencies),
+                "storeTime": self.storeTime,
+                "maxQueued": self.maxQueued,
+                "latency": {"p%i" % p: percentile(latencies, p) for p in PERCENTILES},
+            }
+            snapshot["latency"]["max"] = latencies[-1] if latencies else None
+        return snapshot
@@ -1,5 +1,5 @@
 import sys
-import random
+import threading
 import time
 from PyQt6.QtWidgets import QApplication, QWizard, QWizardPage, QVBoxLayout, \
     QHBoxLayout, QPushButton, QListWidget, QListWidgetItem, QWidget, QLabel, \
@@ -8,6 +8,7 @@ from PyQt6.QtCore import QSettings
 from PyQt6.QtCore import QThread, pyqtSignal
 
 from SessionImport.ImportFactory import ImportFactory
+from SessionImport.Importer import Importer
 
 
 class ImportWizard(QWizard):
@@ -54,6 +55,7 @@ class ChooseSessionDirectoryWidget(QWizardPage):
         line1 = QHBoxLayout()
         self.directory = QLineEdit()
         line1.addWidget(self.directory)
+        self.registerField("directory*", self.directory)
 
         # Create the button to open the file dialog
         self.open_button = QPushButton('Select Session Directory')
@@ -103,55 +105,122 @@ class ChooseSessionDirectoryWidget(QWizardPage):
             self.settings.setValue('lastUsedDirectory', directory)
 
 
-# Worker thread that simulates a task
-class Worker(QThread):
-    # Signal to update the progress
-    progress = pyqtSignal(int)
+class ImportThread(QThread):
+    """
+    Runs an import and reports its progress and telemetry every `interval` seconds, until all importers finished.
+    """
+    # Importer name, files processed (including skipped), files enqueued so far
+    progress = pyqtSignal(str, int, int)
+    # Snapshot of Importer.getTelemetry()
+    telemetry = pyqtSignal(dict)
+
+    def __init__(self, importer: Importer, data=None, interval: float = 0.25):
+        super().__init__()
+        self.importer = importer
+        self.data = data
+        self.interval = interval
 
     def run(self):
-        for _ in range(101):
-            # Simulate work by sleeping for a random amount of time
-            time.sleep(random.uniform(0.01, 0.1))
-            # Emit signal to update the progress bar
-            self.progress.emit(1)
+        walk = threading.Thread(target=self.importer.runImport)
+        walk.start()
+        while walk.is_alive() or self.importer.isrunning():
+            self.report()
+            time.sleep(self.interval)
+        walk.join()
+        if self.data is not None:
+            self.importer.storeData(self.data)
+        self.report()
+
+    def report(self):
+        for imp in self.importer.importers:
+            (processed, skipped, total) = imp.getProcessedCounts()
+            self.progress.emit(imp.__class__.__name__, processed + skipped, total)
+        self.telemetry.emit(self.importer.getTelemetry())
 
 
 class ProgressBarWidget(QWizardPage):
     def __init__(self, factory: ImportFactory):
         super().__init__()
+        self.setTitle("Import")
 
         self.import_factory = factory
+        self.thread = None
+        self.bars = dict()
 
         # Set up the layout
-        layout = QVBoxLayout()
+        page_layout = QVBoxLayout()
+        self.bar_layout = QVBoxLayout()
+        page_layout.addLayout(self.bar_layout)
 
-        # Create and add progress bars to the layout
-        self.progress_bars = [QProgressBar(self) for _ in range(4)]
-        for bar in self.progress_bars:
-            layout.addWidget(bar)
+        self.summary = QLabel()
+        page_layout.addWidget(self.summary)
+        self.save_button = QPushButton("Save Telemetry")
+        self.save_button.setEnabled(False)
+        self.save_button.clicked.connect(self.save_telemetry)
+        page_layout.addWidget(self.save_button)
 
         # Set the layout on the application's window
-        self.setLayout(layout)
-
-        # Create and start worker threads
-        self.workers = [Worker() for _ in range(4)]
-        for bar, worker in zip(self.progress_bars, self.workers):
-            worker.progress.connect(lambda value, bar=bar: self.update_progress(bar, value))
-            # worker.start()
+        self.setLayout(page_layout)
 
     def reset(self) -> None:
-        for pgb in self.progress_bars:
-            pgb.setValue(0)
-        for worker in self.workers:
-            worker.start()
+        if self.thread is not None and self.thread.isRunning():
+            return
+
+        importer = self.import_factory.getImporter()
+        importer.setImportDirectory(self.field("directory"))
+
+        # One progress bar per importer
+        while self.bar_layout.count() > 0:
+            self.bar_layout.takeAt(0).widget().deleteLater()
+        self.bars = dict()
+        for imp in importer.importers:
+            imp.reset()
+            bar = QProgressBar(self)
+            bar.setFormat(imp.__class__.__name__ + ": %v/%m")
+            self.bar_layout.addWidget(bar)
+            self.bars[imp.__class__.__name__] = bar
+
+        self.summary.setText("")
+        self.save_button.setEnabled(False)
+        self.thread = ImportThread(importer)
+        self.thread.progress.connect(self.update_progress)
+        self.thread.telemetry.connect(self.update_telemetry)
+        self.thread.finished.connect(self.import_finished)
+        self.thread.start()
 
     def initializePage(self) -> None:
         self.reset()
         return super().initializePage()
 
-    def update_progress(self, bar, value):
-        # Update the progress bar's value
-        bar.setValue(bar.value() + value)
+    def isComplete(self) -> bool:
+        return self.thread is not None and self.thread.isFinished()
+
+    def update_progress(self, name, value, total):
+        bar = self.bars.get(name)
+        if bar is not None:
+            bar.setMaximum(max(total, 1))
+            bar.setValue(value)
+
+    def update_telemetry(self, telemetry):
+        lines = ["Walk: %i files in %.1f s" % (telemetry["files"], telemetry["walk"] or 0.0)]
+        for name, imp in telemetry["importers"].items():
+            line = "%s: %.1f files/s, %.1f MB/s, queue %i/%i" % (name, imp["filesPerSecond"] or 0.0,
+                                                                 (imp["bytesPerSecond"] or 0.0) / 1e6,
+                                                                 imp["queued"], imp["queueDepth"])
+            if imp["latency"]["p50"] is not None:
+                line += ", latency p50 %.1f ms, p99 %.1f ms" % (imp["latency"]["p50"] * 1000,
+                                                                imp["latency"]["p99"] * 1000)
+            lines.append(line)
+        self.summary.setText("\n".join(lines))
+
+    def import_finished(self):
+        self.save_button.setEnabled(True)
+        self.completeChanged.emit()
+
+    def save_telemetry(self):
+        filename, _ = QFileDialog.getSaveFileName(self, "Save Telemetry", "import-telemetry.json", "JSON (*.json)")
+        if filename:
+            self.thread.importer.dumpTelemetry(filename)
 
 
 class PageThree(QWizardPage):
@@ -1,20 +1,63 @@
-from SessionImport.Importers.ImporterBase import ImporterBase
+from SessionImport.Importers.ImporterBase import ImporterBase, DEFAULTQUEUEDEPTH
 from SessionData import SessionData
 import os
+import json
 import logging
+import time
+
+# Default number of files enqueued as one item
+DEFAULTBATCHSIZE = 32
+
+
+def walkFiles(directory: str):
+    """
+    Yield the paths of all files below directory, depth first and sorted by name within each directory.
+
+    Uses `os.scandir`, so that no per-file stat calls are needed. Symbolic links to directories are not followed.
+    """
+    stack = [directory]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError as e:
+            logging.getLogger("Importer").warning("Cannot read directory %s: %s", current, str(e))
+            continue
+
+        subdirs = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+            elif entry.is_file():
+                yield entry.path
+        # Reversed, so that subdirectories are popped in name order
+        stack.extend(reversed(subdirs))
+
 
 class Importer:
-    def __init__(self) -> None:
+    """
+    Walks the import directory and feeds the files to the importers.
+
+    Files are handed to each importer in batches of `batchSize` files, through a queue holding at most `queueDepth`
+    batches. When an importer falls behind, the walk blocks, so memory stays bounded regardless of the number of files.
+    """
+
+    def __init__(self, queueDepth: int = DEFAULTQUEUEDEPTH, batchSize: int = DEFAULTBATCHSIZE) -> None:
         self.log = logging.getLogger("Importer")
         self.directory = None
         self.importers = []
         self.total_files = 0
+        self.queueDepth = queueDepth
+        self.batchSize = batchSize
+        self.walkStart = None
+        self.walkEnd = None
 
     def addImporter(self, importer : ImporterBase) -> None:
         assert importer is not None, "Do not pass Null object"
         # assert issubclass(ImporterBase, importer.__class__), "Wrong type passed." + str(type(importer))
         self.importers.append(importer)
-    
+
     def setImportDirectory(self, directory) -> None:
         self.directory = directory
 
@@ -28,7 +71,7 @@ class Importer:
                 self.log.debug("Import running for %s", imp.__class__)
             runs |= imp.isrunning()
         return runs
-    
+
     def runImport(self):
         """
         Recursive descent into directory, ask each importer in turn, if they want to process and if yes, enqueue.
@@ -36,24 +79,32 @@ class Importer:
         self.log.info("Import started")
         # Start Importers
         for imp in self.importers:
+            if not imp.started and imp.queueDepth != self.queueDepth:
+                imp.setQueueDepth(self.queueDepth)
             imp.start()
         self.log.info("Import running")
 
-        try: 
-            self.log.info("Processing Import Directory: %s", self.directory) 
-            the_walk = os.walk(self.directory)
-            for (root, _, files) in the_walk:
-                for f in files:
-                    file_path = os.path.join(root, f)
-                    self.log.info("File: %s", file_path)
-                    self.total_files += 1
-                    for imp in self.importers:
-                        if imp.wantProcess(file_path):
-                            self.log.debug("File '%s' processed by importer '%s'", file_path, imp.__class__)
-                            imp.enqueue(file_path)
+        batches = [[] for _ in self.importers]
+        self.walkEnd = None
+        self.walkStart = time.perf_counter()
+        try:
+            self.log.info("Processing Import Directory: %s", self.directory)
+            for file_path in walkFiles(self.directory):
+                self.log.debug("File: %s", file_path)
+                self.total_files += 1
+                for imp, batch in zip(self.importers, batches):
+                    if imp.wantProcess(file_path):
+                        self.log.debug("File '%s' processed by importer '%s'", file_path, imp.__class__)
+                        batch.append(file_path)
+                        if len(batch) >= self.batchSize:
+                            imp.enqueueBatch(batch)
+                            batch.clear()
         except Exception as e:
             self.log.error("Exception in Importer.runImport")
             self.log.exception(e)
+        for imp, batch in zip(self.importers, batches):
+            imp.enqueueBatch(batch)
+        self.walkEnd = time.perf_counter()
         self.log.info("Total files processed: %d", self.total_files)
 
         # Stop Importers
@@ -61,9 +112,47 @@ class Importer:
             imp.stop()
         self.log.info("Import finalizing")
 
+    def getTimings(self) -> dict:
+        """
+        Return walk time and, for each importer, the time until its last file was processed, the time the walk
+        was blocked by the importer and the time files were processed while the walk was running (all in seconds).
+        """
+        timings = {"walk": None, "importers": {}}
+        if self.walkStart is None or self.walkEnd is None:
+            return timings
+        timings["walk"] = self.walkEnd - self.walkStart
+        for imp in self.importers:
+            entry = {"blocked": imp.blockedTime, "processing": None, "overlap": None}
+            if imp.firstProcessed is not None:
+                entry["processing"] = imp.lastProcessed - self.walkStart
+                entry["overlap"] = max(0.0, min(self.walkEnd, imp.lastProcessed) - max(self.walkStart, imp.firstProcessed))
+            timings["importers"][imp.__class__.__name__] = entry
+        return timings
+
+    def getTelemetry(self) -> dict:
+        """
+        Return the live statistics of the walk and of all importers (see `ImporterBase.getTelemetry()`).
+        """
+        walk = None
+        if self.walkStart is not None:
+            end = self.walkEnd if self.walkEnd is not None else time.perf_counter()
+            walk = end - self.walkStart
+        return {"directory": self.directory, "files": self.total_files, "walk": walk,
+                "walkFinished": self.walkEnd is not None,
+                "importers": {imp.__class__.__name__: imp.getTelemetry() for imp in self.importers}}
+
+    def dumpTelemetry(self, filename: str) -> None:
+        """
+        Write the statistics returned by `getTelemetry()` to a JSON file.
+        """
+        with open(filename, 'w') as file:
+            json.dump(self.getTelemetry(), file, indent=2)
+
     def storeData(self, data: SessionData) -> None:
         self.log.info("Storing Data: start")
         for imp in self.importers:
             self.log.debug("Storing data from importer: %s", imp.__class__)
+            start = time.perf_counter()
             imp.store(data)
-        self.log.info("Storing Data: Done")
\ No newline at end of file
+            imp.telemetry.recordStore(time.perf_counter() - start)
+        self.log.info("Storing Data: Done")
@@ -1,10 +1,15 @@
-from SessionImport.Importers.ImporterBase import ImporterBase, ImporterMetaBase
+from SessionImport.Importers.ImporterBase import ImporterBase, ImporterMetaBase, PROCESS
+from SessionImport.ColumnAccumulator import ColumnAccumulator
 from SessionData import SessionData 
-from astropy.io import fits
-from collections import defaultdict
+import FitsHeader as fh
+from HeaderCache import HeaderCache, getDefaultHeaderCache
 import logging, os
+import time
 from unittest.mock import Mock
 
+# Columns of a row, which are not read from the fits header
+ROWKEYS = ("Id", "filename")
+
 class FitsImporterMeta(ImporterMetaBase):
     def getShortName(self):
         return "Fits File Importer"
@@ -14,7 +19,8 @@ class FitsImporterMeta(ImporterMetaBase):
     
     def getInstance(self) -> ImporterBase:
         if self.instance is None:
-            self.instance = FitsImporter()
+            self.instance = FitsImporter(cache=getDefaultHeaderCache())
+            self.instance.setWorkers(os.cpu_count() or 1, PROCESS)
         return self.instance
     
     def getImporterClass(self):
@@ -22,63 +28,72 @@ class FitsImporterMeta(ImporterMetaBase):
 
 
 class FitsImporter(ImporterBase):
-    def __init__(self):
+    # The cache is only used in the worker threads (see `parseBatch()`), worker processes just read the files
+    transient = ImporterBase.transient | {'cache'}
+
+    def __init__(self, cache: HeaderCache = None):
         super().__init__()
-        self.data = defaultdict(dict)
-        self.row = 0
+        self.data = ColumnAccumulator()
+        self.cache = cache
         self.log = logging.getLogger("FitsImporter")
 
     def wantProcess(self, file: str) -> bool:
-        return file.endswith('.fits') or file.endswith('.fit') or file.endswith('.fts')
+        return fh.isFitsFile(file)
 
     def _stripFileType(self, base: str):
-        (stripped, _) = base.rsplit('.')
-        return stripped
+        return fh.stripFitsExtension(base)
     
-    def process(self, file: str) -> bool:
+    def _toRow(self, file: str, header: dict) -> dict:
+        # Handle Id and filename
+        row = {"Id": self._stripFileType(os.path.basename(file)), "filename": file}
+        row.update(header)
+        return row
+
+    def parse(self, file: str) -> dict:
         try:
-            fname = os.path.basename(file)
             self.log.info("FitsImporter processing: %s", file)
-
-            # Prefill existing keys with None
-            self.log.debug("Preprocess row %i", self.row)
-            for k in self.data.keys():
-                self.data[k][self.row] = None
-
-            # Handle Id and filename
-            self.data["Id"][self.row] = self._stripFileType(fname)
-            self.data["filename"][self.row] = file
-
-            # fits header import
-            header = fits.getheader(file)
-            
-            # Now overwrite with header information 
-            for item in header:
-                self.log.debug("Processiong Header Item: %s", item)
-                self.data[item][self.row] = header[item]
-                            
-            # handle keys, which have been missing from this file
-            self.log.debug("Postprocess row %i", self.row)
-            for k in self.data.keys():
-                if len(self.data[k]) <= self.row:
-                    self.log.debug("Fixing key %s", k)
-                    for i in range(0, self.row):
-                        if self.data[k].get(i) is None: 
-                            self.data[k][i] = None
-
-            # Next row
-            self.row += 1
-            return True
+            return self._toRow(file, fh.readFitsHeader(file))
         except (OSError, Exception) as e:
             self.log.error("Skipping %s, due to Error", file)
             self.log.exception(e)
-            return False
+            return None
+
+    def parseBatch(self, files: list) -> list:
+        """
+        Look up the headers of a batch in the cache and parse only the missing files.
+
+        Lookups and stores each take one cache transaction per batch.
+        """
+        if self.cache is None:
+            return self.parseFiles(files)
+        start = time.perf_counter()
+        headers = self.cache.lookupMany(files)
+        lookupTime = (time.perf_counter() - start) / len(files)
+        parsed = iter(self.parseFiles([file for (file, header) in zip(files, headers) if header is None]))
+
+        results = []
+        stored = []
+        for (file, header) in zip(files, headers):
+            if header is None:
+                (row, latency) = next(parsed)
+                if row is not None:
+                    stored.append((file, {k: v for (k, v) in row.items() if k not in ROWKEYS}))
+            else:
+                (row, latency) = (self._toRow(file, header), 0.0)
+            results.append((row, latency + lookupTime))
+        self.cache.storeMany(stored)
+        return results
 
     def store(self, data: SessionData) -> bool:
-        if not self.data:  # empty
+        # Keys missing from a file are filled with None
+        self.data = ColumnAccumulator()
+        for row in self.getResults():
+            self.data.addRow(row)
+
+        if len(self.data) == 0:  # empty
             return False
         else:
-            data.add(self.data)
+            data.add(self.data.toDict())
             return True
 
 if __name__ == "__main__":
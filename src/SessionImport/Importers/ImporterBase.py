@@ -1,8 +1,42 @@
+import heapq
 import logging
+import multiprocessing
+import os
+import time
 
-from queue import Queue
-from threading import Thread
+from concurrent.futures import ProcessPoolExecutor
+from queue import Queue, Empty
+from threading import Thread, Lock
 from SessionData import SessionData
+from SessionImport.ImportTelemetry import ImportTelemetry
+
+# Default maximum number of items (files or batches of files) waiting in the queue of an importer
+DEFAULTQUEUEDEPTH = 64
+
+THREAD = 'thread'
+PROCESS = 'process'
+
+# In process mode, worker processes are only started once this many files were enqueued.
+# Parsing fewer files in the worker threads is faster than starting the processes.
+PROCESSMINFILES = 64
+
+
+def _parseAll(importer, files: list) -> list:
+    """
+    Parse a batch of files, return (result, seconds) for each file. A file that raises an exception is skipped.
+    """
+    results = []
+    for file in files:
+        start = time.perf_counter()
+        try:
+            result = importer.parse(file)
+        except Exception as e:
+            importer.log.error("Skipping %s, due to Error", file)
+            importer.log.exception(e)
+            result = None
+        results.append((result, time.perf_counter() - start))
+    return results
+
 
 class ImporterBase:
     """
@@ -10,78 +44,303 @@ class ImporterBase:
 
     Assumption is that all relevant data is stored in one or more directories as files.
     The Ìmporter` class instantiates all relevant Importers, given some configuration and then:
-     - Starts all Importers using `start()` which executes `run()` in a separate process,
+     - Starts all Importers using `start()` which executes `run()` in one or more separate threads,
      - iterates over all files in the specified directory,
      - Calls `wantProcess(absolutePathToFile)` on each file and then
-     - enqueues all files for which the previous method returned True. 
+     - enqueues all files for which the previous method returned True, in batches (`enqueueBatch()`).
+       The queue is bounded (see `setQueueDepth()`), so enqueuing blocks while the importer is behind.
      - `run` consumes each enqueued file and calls `process()` on them.
      - An end marker is finally enqueued for each Importer with `stop()`, so that `run()` exits.
      - Finally `store()`is called for each Importer with the data object holding the current session. 
 
+    Importers which parse each file independently, should implement `parse()` instead of `process()`.
+    Such importers can use several workers (see `setWorkers()`), either threads or processes.
+    Each worker collects the results of `parse()` in its own shard, `getResults()` merges the shards in file order
+    and is meant to be called from `store()`.
+    In process mode `parse()` runs in a worker process on a copy of the importer, so it must not modify the importer.
+    The worker processes are only started, once `PROCESSMINFILES` files were enqueued, smaller imports use threads.
+    Attributes, which cannot or should not be copied to the worker processes, are listed in `transient`.
+    `parseBatch()` is called in the worker thread for each batch of files, override it to work on whole batches.
+
     The ImporterBase keeps track of import statistics:
      - total: The number of files processed (number of items which were enqueued)
-     - skipped: the number of files which could not be processed successfully (`process()` returned False)
+     - skipped: the number of files which could not be processed successfully (`process()` returned False or raised)
      - processed: the number of files which could be processed.
+    and of timings:
+     - firstProcessed, lastProcessed: `time.perf_counter()` when processing of the first and the last file ended
+     - blockedTime: seconds the producer waited for space in the queue.
+    Live statistics (throughput, latencies, ...) are collected in `telemetry`, see `getTelemetry()`.
     """
 
-    def __init__(self):
+    transient = frozenset(['queue', 'threads', 'pool', 'active', 'shards', 'lock', 'log', 'telemetry'])
+
+    # Number of files, from which on worker processes are started, `PROCESSMINFILES` if None
+    processMinFiles = None
+
+    def __init__(self, queueDepth: int = DEFAULTQUEUEDEPTH, workers: int = 1, workerMode: str = THREAD):
         """
         Initialize statistics and create a queue.
         """
-        self.queue = Queue()
+        self.queueDepth = queueDepth
+        self.queue = Queue(maxsize=queueDepth)
+        self.workers = 1
+        self.workerMode = THREAD
+        self.threads = []
+        self.pool = None
+        self.active = 0
+        self.shards = [[]]
+        self.sequence = 0
+        self.lock = Lock()
         self.total = 0
         self.processed = 0
         self.skipped = 0
+        self.firstProcessed = None
+        self.lastProcessed = None
+        self.blockedTime = 0.0
+        self.telemetry = ImportTelemetry()
         self.started = False
         self.log = logging.getLogger(self.__class__.__name__)
         if self.__class__ == ImporterBase:
             raise NotImplementedError("You cannot instantiate ImporterBase! Please derive a class from it.")
+        self.setWorkers(workers, workerMode)
+
+    def __getstate__(self):
+        return {k: v for k, v in self.__dict__.items() if k not in self.transient}
+
+    def __setstate__(self, state):
+        # Transient attributes are None in worker processes
+        self.__dict__.update(dict.fromkeys(self.transient))
+        self.__dict__.update(state)
+        self.log = logging.getLogger(self.__class__.__name__)
 
     def reset(self) -> None:
         self.total = 0
         self.processed = 0
         self.skipped = 0
-        self.queue.clear()
+        self.firstProcessed = None
+        self.lastProcessed = None
+        self.blockedTime = 0.0
+        self.sequence = 0
+        self.shards = [[] for _ in range(self.workers)]
+        self.telemetry.reset()
+        self._drain()
         # self.stop()
 
+    def setQueueDepth(self, depth: int) -> None:
+        """
+        Set the maximum number of items in the queue. Only possible, while the importer is not started.
+        """
+        assert not self.started, "Cannot change queue depth of a running importer"
+        self.queueDepth = depth
+        self.queue = Queue(maxsize=depth)
+
+    def canParse(self) -> bool:
+        """
+        True, if the importer implements `parse()` instead of `process()` and thus supports several workers.
+        """
+        return type(self).parse is not ImporterBase.parse and type(self).process is ImporterBase.process
+
+    def setWorkers(self, workers: int, workerMode: str = THREAD) -> None:
+        """
+        Set number and kind (`THREAD` or `PROCESS`) of workers. Only possible, while the importer is not started.
+
+        Importers which do not implement `parse()` always use a single thread.
+        """
+        assert not self.started, "Cannot change workers of a running importer"
+        assert workerMode in (THREAD, PROCESS), "Unknown worker mode: " + str(workerMode)
+        if not self.canParse():
+            workers = 1
+            workerMode = THREAD
+        self.workers = max(1, workers)
+        self.workerMode = workerMode
+        self.shards = [[] for _ in range(self.workers)]
+
+    def _drain(self) -> None:
+        try:
+            while True:
+                self.queue.get_nowait()
+                self.queue.task_done()
+        except Empty:
+            pass
+
     def start(self):
         if not self.started:
-            self.log.info("Start Import Thread: %s", self.__class__)
-            self.thread_ref = Thread(target=self.run)
-            self.thread_ref.start()
+            self.log.info("Start %i Import %s(s): %s", self.workers, self.workerMode, self.__class__)
+            self.shards = [[] for _ in range(self.workers)]
+            self.telemetry.start()
+            self.threads = [Thread(target=self.run, args=(worker,)) for worker in range(self.workers)]
+            self.active = self.workers
+            for thread in self.threads:
+                thread.start()
             self.started = True
 
     def stop(self):
         if self.started:
-            self.queue.put(None)
+            for _ in self.threads:
+                self.queue.put(None)
             self.started = False
 
     def forceStop(self):
-        self.queue.clear()
-        self.queue.put(None)
+        self._drain()
+        for _ in range(max(1, len(self.threads))):
+            self.queue.put(None)
+
+    def _put(self, item) -> None:
+        start = time.perf_counter()
+        self.queue.put(item)  # Blocks, if full
+        self.blockedTime += time.perf_counter() - start
+        self.telemetry.recordQueued(self.queue.qsize())
 
-    def enqueue(self, file: str) -> bool:
+    def enqueue(self, file: str) -> None:
+        self._put((self.sequence, [file]))
+        self.sequence += 1
         self.total += 1
-        self.queue.put(file, block=False)
 
-    def run(self) -> None:
+    def enqueueBatch(self, files: list[str]) -> None:
+        """
+        Enqueue several files as one queue item.
+        """
+        if len(files) > 0:
+            self._put((self.sequence, list(files)))
+            self.sequence += len(files)
+            self.total += len(files)
+
+    def run(self, worker: int = 0) -> None:
         """
         This runs in a separate thread, until the element to process is None.
-        For each element in the queue the self.process(item) method is called.
+        For each file in the queue the self.process(item) method is called, or for importers implementing
+        `parse()` its result is added to the shard of this worker.
         """
 
+        shard = self.shards[worker]
         item = self.queue.get()  # Blocks, if empty
         while item is not None:   # Check for 'end' marker
-            if self.process(item):
+            (sequence, files) = item
+            try:
+                if self.canParse():
+                    try:
+                        results = self.parseBatch(files)
+                    except Exception as e:
+                        self.log.error("Skipping %i files, due to Error", len(files))
+                        self.log.exception(e)
+                        results = [(None, 0.0)] * len(files)
+                    for (offset, (result, latency)) in enumerate(results):
+                        if result is not None:
+                            shard.append((sequence + offset, result))
+                        self._count(files[offset], result is not None, latency)
+                else:
+                    self._processAll(files)
+            finally:
+                # Always, otherwise a full queue blocks the producer and `stop()` forever
+                self.queue.task_done()
+            item = self.queue.get()
+
+        with self.lock:
+            self.active -= 1
+            if self.active == 0 and self.pool is not None:
+                # The last worker shuts down the process pool
+                self.pool.shutdown()
+                self.pool = None
+        self.queue.task_done()
+        self.log.info("Stopping Import %s %i: %s", self.workerMode, worker, self.__class__)
+
+    def parseBatch(self, files: list) -> list:
+        """
+        Parse a batch of files, return (result, seconds) for each file.
+
+        This runs in the worker thread of the importer. Override it to handle a whole batch at once, e.g. to look up
+        cached results, and let `parseFiles()` parse the remaining files.
+        """
+        return self.parseFiles(files)
+
+    def _getPool(self):
+        """
+        Return the process pool in process mode, once `PROCESSMINFILES` (or `processMinFiles`) files were enqueued,
+        otherwise None.
+        """
+        minFiles = PROCESSMINFILES if self.processMinFiles is None else self.processMinFiles
+        if self.workerMode != PROCESS or self.active == 0 or self.total < minFiles:
+            return self.pool
+        with self.lock:
+            if self.pool is None:
+                self.log.info("Start %i worker processes", self.workers)
+                self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+            return self.pool
+
+    def parseFiles(self, files: list) -> list:
+        """
+        Call `parse()` for each file, in a worker process in process mode. Return (result, seconds) for each file.
+        """
+        pool = self._getPool()
+        if pool is None or len(files) == 0:
+            return _parseAll(self, files)
+        # One chunk per worker process, so that the files of a batch are parsed concurrently
+        size = -(-len(files) // self.workers)
+        chunks = [files[i:i + size] for i in range(0, len(files), size)]
+        futures = [pool.submit(_parseAll, self, chunk) for chunk in chunks]
+        results = []
+        for chunk, future in zip(chunks, futures):
+            try:
+                results.extend(future.result())
+            except Exception as e:
+                self.log.error("Worker process failed, skipping %i files", len(chunk))
+                self.log.exception(e)
+                results.extend([(None, 0.0)] * len(chunk))
+        return results
+
+    def _processAll(self, files: list) -> None:
+        """
+        Call `process()` for a batch of files. A file that raises an exception is skipped, like in `_parseAll`.
+        """
+        for file in files:
+            start = time.perf_counter()
+            try:
+                success = self.process(file)
+            except Exception as e:
+                self.log.error("Skipping %s, due to Error", file)
+                self.log.exception(e)
+                success = False
+            self._count(file, success, time.perf_counter() - start)
+
+    def _count(self, file: str, success: bool, latency: float) -> None:
+        try:
+            size = os.path.getsize(file)
+        except OSError:
+            size = 0
+        self.telemetry.recordFile(latency, size, success)
+        with self.lock:
+            if success:
                 self.processed += 1
             else:
                 self.skipped += 1
-            item = self.queue.get()
-        self.log.info("Stopping Import thread: %s", self.__class__)
-    
+            self.lastProcessed = time.perf_counter()
+            if self.firstProcessed is None:
+                self.firstProcessed = self.lastProcessed
+
+    def getResults(self) -> list:
+        """
+        Return the results of `parse()` of all workers, in the order in which the files were enqueued.
+        """
+        return [result for (_, result) in heapq.merge(*self.shards, key=lambda entry: entry[0])]
+
     def isrunning(self) -> bool:
-        return not self.queue.empty()
-    
+        return self.queue.unfinished_tasks > 0
+
+    def getQueueDepth(self) -> int:
+        """
+        Number of items currently waiting in the queue.
+        """
+        return self.queue.qsize()
+
+    def getTelemetry(self) -> dict:
+        """
+        Return a snapshot of the live statistics of this importer, see `ImportTelemetry.getSnapshot()`.
+        """
+        snapshot = self.telemetry.getSnapshot()
+        snapshot.update({"total": self.total, "queued": self.getQueueDepth(), "queueDepth": self.queueDepth,
+                         "blocked": self.blockedTime, "workers": self.workers, "workerMode": self.workerMode})
+        return snapshot
+
     def getProcessedCounts(self) -> tuple[int, int, int]:
         return (self.processed, self.skipped, self.total)
 
@@ -96,7 +355,7 @@ class ImporterBase:
 
     def process(self, file: str) -> bool:
         """
-        Process a file. This method needs to be overriden.
+        Process a file. This method needs to be overriden, unless `parse()` is implemented.
 
         This method is called in a separate thread, it is called for each file where
         Expectation is that the derived class stores the imported data internally and then updates the data on "store()"
@@ -104,6 +363,23 @@ class ImporterBase:
         When the item was processed successfully, return True, if the processing failed and no data is used return False. 
         The item is then considered 'skipped'
         """
+        if not self.canParse():
+            raise NotImplementedError("you called an abstract method, that you need to implement yourself!")
+        [(result, _)] = self.parseBatch([file])
+        if result is None:
+            return False
+        with self.lock:
+            self.shards[0].append((self.sequence, result))
+            self.sequence += 1
+        return True
+
+    def parse(self, file: str) -> object:
+        """
+        Parse a file and return the result, which is collected for `store()`, or None if the file is skipped.
+
+        Override this instead of `process()` to support several workers. This method may run in a worker process,
+        so the result needs to be picklable and the importer must not be modified.
+        """
         raise NotImplementedError("you called an abstract method, that you need to implement yourself!")
 
     def wantProcess(self, file:str) -> bool:
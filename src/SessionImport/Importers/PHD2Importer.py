@@ -1,15 +1,75 @@
-from SessionImport.Importers.ImporterBase import ImporterBase, ImporterMetaBase
+from SessionImport.Importers.ImporterBase import ImporterBase, ImporterMetaBase, PROCESS
 from SessionData import SessionData
+from GuidingData import parseGuidingLog
+from GuideLogCache import GuideLogCache, getDefaultGuideLogCache
+import logging
+import os
+import time
 
 class PHD2Importer(ImporterBase):
+    """
+    Imports the guiding sections of all PHD2 guide logs (`PHD2_GuideLog_*.txt`) of a session.
+
+    The logs are parsed independently (see `parse()`), `store()` merges the sections of all logs in time order.
+    With a `GuideLogCache`, cached logs are looked up in the worker thread and only the other logs are parsed by
+    `parse()` (in worker processes in process mode). It stores them in the cache and returns just the path, so the
+    sections are loaded memory mapped from the cache instead of being copied back from the worker process.
+    """
+    # Guide logs are large, worker processes pay off from two logs on
+    processMinFiles = 2
+
+    def __init__(self, cache: GuideLogCache = None):
+        super().__init__()
+        self.cache = cache
+        self.log = logging.getLogger("PHD2Importer")
+
     def wantProcess(self, file: str) -> bool:
-        return file.startswith('PHDGuidelog')
+        name = os.path.basename(file)
+        return name.startswith('PHD2_GuideLog') and name.endswith('.txt')
+
+    def parse(self, file: str):
+        """
+        Return the sections of a log, or with a cache the path of the log, after storing it in the cache.
+        """
+        self.log.info("PHD2Importer processing: %s", file)
+        if self.cache is not None:
+            sections = self.cache.storeGuidingLog(file)
+            self.log.debug("%i guiding sections in %s", len(sections), file)
+            return file
+        with open(file) as log:
+            sections = list(parseGuidingLog(log))
+        self.log.debug("%i guiding sections in %s", len(sections), file)
+        return sections
+
+    def parseBatch(self, files: list) -> list:
+        if self.cache is None:
+            return self.parseFiles(files)
+        start = time.perf_counter()
+        cached = [self.cache.lookup(file) for file in files]
+        lookupTime = (time.perf_counter() - start) / len(files)
+        parsed = iter(self.parseFiles([file for (file, sections) in zip(files, cached) if sections is None]))
+
+        results = []
+        for (file, sections) in zip(files, cached):
+            latency = 0.0
+            if sections is None:
+                (path, latency) = next(parsed)
+                if path is not None:
+                    sections = self.cache.load(path)
+                    if sections is None:
+                        # The log changed since it was stored
+                        sections = self.cache.storeGuidingLog(path)
+            results.append((sections, latency + lookupTime))
+        return results
 
-    def process(self, file: str) -> bool:
-        return False
-    
     def store(self, data: SessionData) -> bool:
-        return False
+        sections = [section for sections in self.getResults() for section in sections]
+        if len(sections) == 0:
+            return False
+        else:
+            sections.sort(key=lambda section: section.guidingStart)
+            data.addGuidingData(sections)
+            return True
 
 class PHD2ImporterMeta(ImporterMetaBase):
     def getShortName(self) -> str:
@@ -20,9 +80,10 @@ class PHD2ImporterMeta(ImporterMetaBase):
     
     def getInstance(self) -> ImporterBase:
         if self.instance is None:
-            self.instance = PHD2Importer()
+            self.instance = PHD2Importer(cache=getDefaultGuideLogCache())
+            self.instance.setWorkers(os.cpu_count() or 1, PROCESS)
         return self.instance
     
     def getImporterClass(self):
         return PHD2Importer
-    
\ No newline at end of file
+    
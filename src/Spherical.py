@@ -1,15 +1,20 @@
 import math
 
+import numpy as np
 from astropy.coordinates import (EarthLocation, AltAz)
 from astropy.coordinates import get_sun, get_body
 from astropy.time import Time
 
+from AstropyConfig import configureAstropy
+
 
 def getTime(jd):
+    configureAstropy()
     return Time(jd, None, 'jd')
 
 
 def getLocalTime(jd, loc):
+    configureAstropy()
     return Time(jd, location=loc, format='jd')
 
 
@@ -119,6 +124,28 @@ def getSunAltAz(jd, lon, lat):
     return coord.transform_to(aa)
 
 
+def getMoonAltAzs(jd, lon, lat):
+    """
+    Like `getMoonAltAz`, for an array of julian dates at one site, transformed in one call.
+    """
+    loc = getEarthLocation(lon, lat)
+    time = getLocalTime(np.asarray(jd, dtype=np.float64), loc)
+    coord = get_body("moon", time)
+    aa = AltAz(location=loc, obstime=time)
+    return coord.transform_to(aa)
+
+
+def getSunAltAzs(jd, lon, lat):
+    """
+    Like `getSunAltAz`, for an array of julian dates at one site, transformed in one call.
+    """
+    loc = getEarthLocation(lon, lat)
+    time = getLocalTime(np.asarray(jd, dtype=np.float64), loc)
+    coord = get_sun(time)
+    aa = AltAz(location=loc, obstime=time)
+    return coord.transform_to(aa)
+
+
 def getAltAz(coord, jd, lon, lat):
     loc = getEarthLocation(lon, lat)
     time = getLocalTime(jd, loc)
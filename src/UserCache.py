@@ -0,0 +1,20 @@
+import os
+import sys
+
+APPLICATION = 'DataDrivenAstroImaging'
+
+
+def getUserCacheDirectory():
+    """
+    Return (and create) the per-user cache directory of the application.
+    """
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~/AppData/Local')
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Caches')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+
+    directory = os.path.join(base, APPLICATION)
+    os.makedirs(directory, exist_ok=True)
+    return directory
@@ -0,0 +1,39 @@
+import warnings
+
+from astropy.time import Time
+from astropy.utils import data, iers
+
+from AstropyConfig import configureAstropy, getIersStatus
+from Spherical import getMoonAltAz
+
+
+def testOfflineConfiguration():
+    status = configureAstropy()
+    assert configureAstropy() is status
+    assert not data.conf.allow_internet
+    assert not iers.conf.auto_download
+    assert iers.earth_orientation_table.get().meta['data_path'] == iers.IERS_A_FILE
+    assert status['measuredUntil'] < status['predictedUntil']
+
+    # No download is attempted for a date covered by the bundled table
+    jd = Time(status['measuredUntil']).jd - 30.0
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', iers.IERSWarning)
+        getMoonAltAz(jd, 11.5, 48.1)
+
+
+def testStaleReport():
+    configureAstropy()
+    table = iers.earth_orientation_table.get()
+    leapSeconds = iers.LeapSeconds.auto_open()
+
+    current = getIersStatus(table, leapSeconds, now=Time(getIersStatus(table, leapSeconds)['measuredUntil']))
+    assert not current['stale']
+    assert current['reasons'] == []
+
+    with warnings.catch_warnings():
+        # Leap seconds are unknown that far ahead
+        warnings.simplefilter('ignore')
+        late = getIersStatus(table, leapSeconds, now=Time('2099-01-01'))
+    assert late['stale']
+    assert len(late['reasons']) == 3
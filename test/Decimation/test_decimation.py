@@ -0,0 +1,92 @@
+import numpy as np
+
+from Decimation import MinMaxPyramid, findRuns
+
+
+def makeSeries(n=100000):
+    rng = np.random.default_rng(7)
+    x = np.arange(n) * 2.0
+    y = rng.normal(size=n)
+    y[rng.integers(0, n, 100)] = np.nan
+    return x, y
+
+
+def testRawSamples():
+    (x, y) = makeSeries(1000)
+    pyramid = MinMaxPyramid(x, y)
+    (qx, qy) = pyramid.query(10.0, 20.0, 100)
+    assert list(qx) == [10.0, 12.0, 14.0, 16.0, 18.0, 20.0]
+    assert np.array_equal(qy, y[5:11], equal_nan=True)
+
+
+def testBoundedPointsKeepExtremes():
+    (x, y) = makeSeries()
+    pyramid = MinMaxPyramid(x, y)
+    (qx, qy) = pyramid.query(x[0], x[-1], 2000)
+    assert len(qx) <= 2000 + 2
+    assert np.all(np.diff(qx) >= 0), "Points must be in time order"
+    assert np.nanmax(qy) == np.nanmax(y)
+    assert np.nanmin(qy) == np.nanmin(y)
+    # Every point is a sample
+    positions = (qx / 2.0).astype(int)
+    assert np.array_equal(y[positions], qy)
+
+
+def testZoomedRange():
+    (x, y) = makeSeries()
+    pyramid = MinMaxPyramid(x, y)
+    (x1, x2) = (x[12345], x[45678])
+    (qx, qy) = pyramid.query(x1, x2, 500)
+    assert len(qx) <= 500 + 2
+    inside = y[12345:45679]
+    # Buckets at the edges may reach beyond the range
+    assert np.nanmax(qy) >= np.nanmax(inside)
+    assert np.nanmin(qy) <= np.nanmin(inside)
+    assert qx[0] <= x1 + 2.0 * 512 and qx[-1] >= x2 - 2.0 * 512
+
+    assert len(pyramid.query(-10.0, -5.0, 500)[0]) == 0
+
+
+def testOddLengthAndAllNan():
+    pyramid = MinMaxPyramid([0.0, 1.0, 2.0], [1.0, np.nan, 3.0])
+    assert len(pyramid.levels) == 3
+    (xMin, yMin, xMax, yMax) = pyramid.levels[-1]
+    assert (xMin[0], yMin[0], xMax[0], yMax[0]) == (0.0, 1.0, 2.0, 3.0)
+
+    pyramid = MinMaxPyramid([0.0, 1.0], [np.nan, np.nan])
+    assert np.isnan(pyramid.levels[-1][1][0])
+
+
+def testFindRuns():
+    (starts, ends) = findRuns([True, True, False, False, True, False, True])
+    assert list(starts) == [0, 4, 6]
+    assert list(ends) == [2, 5, 7]
+    assert len(findRuns([])[0]) == 0
+
+
+def assertSamePyramid(pyramid, expected):
+    assert len(pyramid.levels) == len(expected.levels)
+    for level, other in zip(pyramid.levels, expected.levels):
+        for values, otherValues in zip(level, other):
+            assert np.array_equal(values, otherValues, equal_nan=True)
+
+
+def testExtend():
+    (x, y) = makeSeries(10001)
+    pyramid = MinMaxPyramid(x[:1], y[:1])
+    for (start, end) in [(1, 2), (2, 7), (7, 4096), (4096, 4097), (4097, 10001)]:
+        pyramid.extend(x[start:end], y[start:end])
+        assertSamePyramid(pyramid, MinMaxPyramid(x[:end], y[:end]))
+
+    # Replace samples, e.g. when normalized values changed
+    changed = y.copy()
+    changed[5000:] *= 0.5
+    pyramid.extend(x[5000:], changed[5000:], 5000)
+    assertSamePyramid(pyramid, MinMaxPyramid(x, changed))
+    pyramid.extend(x[3000:4000], y[3000:4000], 3000)
+    assertSamePyramid(pyramid, MinMaxPyramid(x[:4000], y[:4000]))
+
+    empty = MinMaxPyramid([], [])
+    assert len(empty.query(0.0, 1.0, 100)[0]) == 0
+    empty.extend(x[:3], y[:3])
+    assertSamePyramid(empty, MinMaxPyramid(x[:3], y[:3]))
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+from astropy.coordinates import SkyOffsetFrame
+
+import DataColumn as Columns
+from DitherStatistics import REFERENCEPIERSIDE, REFERENCETARGET, computeDitherOffsets, getPositions, getReferences
+from SessionData import SessionData
+
+
+def makePositions(n=50):
+    rng = np.random.default_rng(5)
+    # Across RA 0h
+    ra = (359.995 + rng.normal(0.0, 0.003, n)) % 360.0
+    dec = 62.0 + rng.normal(0.0, 0.003, n)
+    return ra, dec
+
+
+def testOffsetsFromFirstFrame():
+    (ra, dec) = makePositions()
+    dither = computeDitherOffsets(ra, dec)
+
+    positions = getPositions(ra, dec)
+    center = SkyOffsetFrame(origin=positions[0])
+    for i in [0, 1, 17, 49]:
+        offset = positions[i].transform_to(center)
+        assert dither['ra'][i] == pytest.approx(offset.lon.degree * 3600.0, abs=1e-6)
+        assert dither['dec'][i] == pytest.approx(offset.lat.degree * 3600.0, abs=1e-6)
+
+    assert np.isnan(dither['steps'][0])
+    assert dither['steps'][5] == pytest.approx(positions[5].separation(positions[4]).arcsec)
+    statistics = dither['statistics']
+    assert statistics['count'] == 49
+    assert statistics['max'] == pytest.approx(np.nanmax(dither['steps']))
+
+
+def testGroupReferences():
+    (ra, dec) = makePositions()
+    groups = np.array(['East', 'West'] * 25)
+    (refRa, refDec) = getReferences(ra, dec, groups)
+    assert refRa[0] == refRa[2] and refRa[0] != refRa[1]
+    assert refDec[1] == pytest.approx(np.median(dec[1::2]))
+    # The median of RA around 0h is close to the positions, not around 180 degree
+    assert abs((refRa[0] - 359.995 + 180.0) % 360.0 - 180.0) < 0.01
+
+    dither = computeDitherOffsets(ra, dec, groups)
+    assert np.median(dither['dec'][0::2]) == pytest.approx(0.0, abs=0.5)
+    assert np.median(dither['ra'][1::2]) == pytest.approx(0.0, abs=0.5)
+
+
+def testEmpty():
+    dither = computeDitherOffsets([], [])
+    assert len(dither['ra']) == 0
+    assert dither['statistics']['count'] == 0
+
+
+def testSessionData():
+    (ra, dec) = makePositions(6)
+    data = SessionData()
+    data.data = pd.DataFrame({Columns.RA: ra, Columns.DEC: dec, Columns.OBJECT: ['M31'] * 3 + ['M33'] * 3,
+                              Columns.PIERSIDE: ['East', 'West'] * 3})
+    assert len(data.getDitherData()) == 6
+    first = data.getDitherOffsets()
+    assert (first['ra'][0], first['dec'][0]) == pytest.approx((0.0, 0.0), abs=1e-9)
+    target = data.getDitherOffsets(REFERENCETARGET)
+    assert target['dec'][:3] == pytest.approx(computeDitherOffsets(ra[:3], dec[:3], ['M31'] * 3)['dec'])
+    pier = data.getDitherOffsets(REFERENCEPIERSIDE)
+    assert pier['dec'][0::2] == pytest.approx(computeDitherOffsets(ra[0::2], dec[0::2], ['East'] * 3)['dec'])
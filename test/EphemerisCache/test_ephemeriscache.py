@@ -0,0 +1,59 @@
+import numpy as np
+
+import EphemerisCache as ec
+from EphemerisCache import EphemerisCache, getNightId
+from Spherical import getMoonAltAzs, getSunAltAzs
+
+LON = 11.5
+LAT = 48.1
+
+
+def testNightId():
+    # 2024-01-10 23:00 UT and 2024-01-11 03:00 UT are the same night in Europe, noon UT is not
+    evening = 2460320.4583
+    morning = 2460320.625
+    assert getNightId(evening, LON) == getNightId(morning, LON)
+    assert getNightId(2460320.0 - LON / 360.0 - 1e-6, LON) == getNightId(evening, LON) - 1
+    assert list(getNightId([evening, morning], [LON, -70.7])) == [2460320, 2460320]
+
+
+def testInterpolationError(tmp_path):
+    cache = EphemerisCache(tmp_path)
+    rng = np.random.default_rng(3)
+    jd = 2460320.4 + rng.uniform(0.0, 0.9, 40)
+    positions = cache.getPositions(jd, LON, LAT)
+    sun = getSunAltAzs(jd, LON, LAT)
+    moon = getMoonAltAzs(jd, LON, LAT)
+    assert np.max(np.abs(positions['sunAlt'] - sun.alt.deg)) < 0.01
+    assert np.max(np.abs(positions['moonAlt'] - moon.alt.deg)) < 0.01
+    azimuth = np.abs((positions['sunAz'] - sun.az.deg + 180.0) % 360.0 - 180.0)
+    assert np.max(azimuth) < 0.05
+    assert np.all((positions['moonIllumination'] >= 0.0) & (positions['moonIllumination'] <= 1.0))
+    # Two nights
+    assert cache.getCounts()[1] == 2
+
+
+def testMoonIllumination(tmp_path):
+    cache = EphemerisCache(tmp_path)
+    # Full moon 2024-01-25 17:54 UT, new moon 2024-01-11 11:57 UT
+    full = cache.getPositions(2460335.246, LON, LAT)['moonIllumination'][0]
+    new = cache.getPositions(2460320.998, LON, LAT)['moonIllumination'][0]
+    assert full > 0.99
+    assert new < 0.01
+
+
+def testPersistence(tmp_path, mocker):
+    jd = [2460320.45, 2460320.55, np.nan]
+    first = EphemerisCache(tmp_path).getPositions(jd, LON, LAT)
+    assert np.isnan(first['sunAlt'][2])
+
+    compute = mocker.patch.object(ec, "computeEphemeris")
+    cache = EphemerisCache(tmp_path)
+    second = cache.getPositions(jd, LON, LAT)
+    compute.assert_not_called()
+    assert cache.getCounts() == (1, 0)
+    for name in ec.POSITIONS:
+        assert np.array_equal(first[name], second[name], equal_nan=True)
+
+    missing = cache.getPositions(jd, np.nan, LAT)
+    assert np.all(np.isnan(missing['moonAlt']))
@@ -0,0 +1,76 @@
+from astropy.io import fits
+import pytest
+
+import FitsHeader as fh
+import FitsHeaderKeys as fhk
+
+
+def astropyValues(name):
+    header = fits.getheader(name)
+    return {key: header[key] for key in header if key not in fh.COMMENTARY}
+
+@pytest.mark.parametrize("name", ["testdata/fits/LIGHT.fits", "testdata/fits/DARK.fits", "testdata/fits/FLAT.fits",
+                                  "testdata/fits/session/A.fits"])
+def testSameValuesAsAstropy(name):
+    values = fh.readFitsHeader(name)
+    expected = astropyValues(name)
+    assert values == expected
+    for key in expected:
+        assert type(values[key]) is type(expected[key]), "Type differs for " + key
+
+@pytest.mark.parametrize("name, hdu", [("testdata/fits/compressed/LIGHT.fits.gz", 0),
+                                       ("testdata/fits/compressed/LIGHT.fits.fz", 1)])
+def testCompressedSameValuesAsAstropy(name, hdu):
+    values = fh.readFitsHeader(name)
+    with fits.open(name) as hdul:
+        header = hdul[hdu].header
+        expected = {key: header[key] for key in header if key not in fh.COMMENTARY}
+    assert values == expected
+    assert values == astropyValues("testdata/fits/compressed/LIGHT.fits")
+
+@pytest.mark.parametrize("name", ["testdata/fits/compressed/LIGHT.fits.gz", "testdata/fits/compressed/LIGHT.fits.fz"])
+def testCompressedKeyProjection(name):
+    values = fh.readFitsHeader(name, [fhk.EXPOSURE, "BITPIX", "NAXIS1", "ZBITPIX", "TFIELDS"])
+    assert values == {fhk.EXPOSURE: 180.0, "BITPIX": 16, "NAXIS1": 64}
+
+def testStripFitsExtension():
+    assert fh.stripFitsExtension("A.fits") == "A"
+    assert fh.stripFitsExtension("A.B.fts") == "A.B"
+    assert fh.stripFitsExtension("A.fits.fz") == "A"
+    assert fh.stripFitsExtension("A.fit.gz") == "A"
+
+def testKeyProjection():
+    keys = [fhk.EXPOSURE, fhk.STARTTIME, fhk.TELESCOPE, fhk.FOCPOS]
+    values = fh.readFitsHeader("testdata/fits/LIGHT.fits", keys)
+    assert values == {fhk.EXPOSURE: 180.0, fhk.STARTTIME: '2024-01-10T20:40:01.396', fhk.TELESCOPE: 'Newton 8"'}
+
+def testInvalidFits():
+    with pytest.raises(OSError):
+        fh.readFitsHeader("testdata/invalidfits/invalid.fits")
+
+def testOddCards(tmp_path):
+    header = fits.Header()
+    header['SIMPLE'] = True
+    header['BITPIX'] = 8
+    header['NAXIS'] = 0
+    header['QUOTED'] = "it's"
+    header['EMPTY'] = ''
+    header['LONGSTR'] = 'x' * 100 + ' and more text to force a CONTINUE card'
+    header['HIERARCH LONG KEYWORD'] = 12
+    header['CPLX'] = complex(1, 2)
+    header['UNDEF'] = None
+    header['COMMENT'] = 'a comment'
+    for i in range(60):  # more than one header block
+        header['KEY%i' % i] = i * 0.5
+    name = tmp_path / "odd.fits"
+    fits.PrimaryHDU(header=header).writeto(name)
+
+    values = fh.readFitsHeader(name)
+    assert values['QUOTED'] == "it's"
+    assert values['EMPTY'] == ''
+    assert values['LONGSTR'] == header['LONGSTR']
+    assert values['LONG KEYWORD'] == 12
+    assert values['CPLX'] == complex(1, 2)
+    assert values['UNDEF'] is None
+    assert values['KEY59'] == 29.5
+    assert 'COMMENT' not in values
@@ -0,0 +1,88 @@
+import os
+import shutil
+
+import numpy as np
+
+from GuideLogCache import GuideLogCache
+from GuidingData import GuidingSessionData
+
+
+def copyLog(tmp_path):
+    dest = tmp_path / "PHD2_GuideLog_2024-01-10_203000.txt"
+    shutil.copy("testdata/guiding/PHD2_GuideLog_2024-01-10_203000.txt", dest)
+    return str(dest)
+
+def testMissThenHit(tmp_path):
+    cache = GuideLogCache(tmp_path / "cache")
+    log = copyLog(tmp_path)
+    assert cache.lookup(log) is None
+    parsed = cache.readGuidingLog(log)
+    cached = cache.readGuidingLog(log)
+    assert cache.getCounts() == (1, 2)
+
+    assert isinstance(cached[0].data, np.memmap)
+    assert len(cached) == len(parsed) == 3
+    for a, b in zip(parsed, cached):
+        assert (a.guidingStart, a.guidingEnd, a.maxsnr, a.maxStarmass, a.raRate, a.decRate) == \
+               (b.guidingStart, b.guidingEnd, b.maxsnr, b.maxStarmass, b.raRate, b.decRate)
+        assert a.data.tobytes() == b.data.tobytes()
+        assert [vars(f) for f in a.frames] == [vars(f) for f in b.frames]
+
+def testGrownLogIsParsedAgain(tmp_path):
+    cache = GuideLogCache(tmp_path / "cache")
+    log = copyLog(tmp_path)
+    cache.readGuidingLog(log)
+    with open(log, "a", newline="") as file:
+        file.write("Guiding Ends at 2024-01-10 21:31:00\r\n")
+    sections = cache.readGuidingLog(log)
+    assert len(sections) == 4
+    assert cache.getCounts() == (0, 2)
+    assert len(cache.readGuidingLog(log)) == 4
+
+def testStoreGrownLogWhileMapped(tmp_path, mocker):
+    cache = GuideLogCache(tmp_path / "cache")
+    log = copyLog(tmp_path)
+    cache.readGuidingLog(log)
+    held = cache.readGuidingLog(log)
+    frames = held[0].data.tobytes()
+    mapped = held[0].data.filename
+
+    # Like on Windows, a memory mapped file can neither be replaced nor deleted
+    def failForMapped(function):
+        def call(name, *args):
+            if os.path.abspath(args[0] if args else name) == mapped:
+                raise PermissionError("File is mapped: " + mapped)
+            return function(name, *args)
+        return call
+    mocker.patch("os.replace", failForMapped(os.replace))
+    mocker.patch("os.remove", failForMapped(os.remove))
+
+    with open(log, "a", newline="") as file:
+        file.write("Guiding Ends at 2024-01-10 21:31:00\r\n")
+    assert len(cache.readGuidingLog(log)) == 4
+    assert len(cache.readGuidingLog(log)) == 4
+    assert cache.getCounts() == (2, 2), "Grown log was not stored"
+    assert held[0].data.tobytes() == frames
+    assert os.path.exists(mapped)
+
+    del held
+    mocker.stopall()
+    cache.invalidate(log)
+    assert os.listdir(tmp_path / "cache") == []
+
+def testSessionDataUsesCache(tmp_path):
+    cache = GuideLogCache(tmp_path / "cache")
+    log = copyLog(tmp_path)
+    for _ in range(2):
+        data = GuidingSessionData()
+        data.readGuidingSessionData(log, cache)
+        assert data.count() == 12
+    assert cache.getCounts() == (1, 1)
+
+def testLogWithoutGuiding(tmp_path):
+    cache = GuideLogCache(tmp_path / "cache")
+    log = tmp_path / "PHD2_GuideLog_empty.txt"
+    log.write_text("PHD2 version 2.6.11, Log version 2.5. Log enabled at 2024-01-10 20:30:00\n")
+    assert cache.readGuidingLog(str(log)) == []
+    assert cache.readGuidingLog(str(log)) == []
+    assert cache.getCounts() == (1, 1)
@@ -0,0 +1,114 @@
+from GuideLogFollower import GuideLogFollower
+from GuideLogIndex import GuideLogIndex
+from GuidingData import GuidingData, GuidingLogParser, GuidingSessionData, parseGuidingLog, parseTime
+from SessionData import SessionData
+
+LOG = "testdata/guiding/PHD2_GuideLog_2024-01-10_203000.txt"
+
+
+def readBytes():
+    with open(LOG, 'rb') as file:
+        return file.read()
+
+
+def testFollowInChunks(tmp_path):
+    content = readBytes()
+    path = tmp_path / "PHD2_GuideLog.txt"
+    path.write_bytes(b'')
+    data = GuidingSessionData()
+    follower = GuideLogFollower(path, data)
+
+    added = 0
+    # Chunks end in the middle of lines
+    for start in range(0, len(content), 97):
+        with open(path, 'ab') as file:
+            file.write(content[start:start + 97])
+        added += follower.poll()
+        index = data.getIndex()
+        assert len(index.data) == data.count()
+    assert follower.poll() == 0
+
+    with open(LOG) as file:
+        expected = list(parseGuidingLog(file))
+    # The unterminated last section is visible while it is written
+    assert len(data.guidingData) == len(expected) + 1
+    assert added == data.count()
+    for section, batch in zip(data.guidingData, expected):
+        assert section.guidingStart == batch.guidingStart
+        assert section.guidingEnd == batch.guidingEnd
+        assert section.maxsnr == batch.maxsnr
+        assert section.maxStarmass == batch.maxStarmass
+        assert section.data.tobytes() == batch.data.tobytes()
+
+    last = data.guidingData[-1]
+    assert last.guidingEnd == last.data['time'][-1]
+    assert last.guidingStart > expected[-1].guidingStart
+
+
+def testTruncation(tmp_path):
+    content = readBytes()
+    path = tmp_path / "PHD2_GuideLog.txt"
+    path.write_bytes(content)
+    data = GuidingSessionData()
+    follower = GuideLogFollower(path, data)
+    total = follower.poll()
+    assert total == data.count()
+
+    path.write_bytes(content[:len(content) // 2])
+    follower.poll()
+    with open(path) as file:
+        expected = list(parseGuidingLog(file))
+    assert len(data.guidingData) >= len(expected)
+    assert data.guidingData[0].guidingStart == parseTime("2024-01-10 20:40:00")
+    assert data.count() < total
+
+
+def otherSection():
+    section = GuidingData()
+    section.guidingStart = parseTime("2024-01-09 21:00:00")
+    section.guidingEnd = parseTime("2024-01-09 21:10:00")
+    return section
+
+
+def testResume(tmp_path):
+    path = tmp_path / "PHD2_GuideLog.txt"
+    path.write_bytes(readBytes())
+    with open(LOG) as file:
+        expected = list(parseGuidingLog(file))
+    other = otherSection()
+    read = expected[:2]
+    data = GuidingSessionData()
+    data.addSections([other] + read)
+
+    follower = GuideLogFollower(path, data)
+    follower.resume(read, *GuideLogIndex(path).getResumePoint(read[-1].guidingStart))
+    added = follower.poll()
+
+    assert data.guidingData[0] is other
+    assert data.guidingData[1] is read[0] and data.guidingData[2] is read[1], "Sections read before were parsed again"
+    assert len(data.guidingData) == len(expected) + 2
+    assert added == data.count() - sum(len(section.data) for section in read)
+    for section, batch in zip(data.guidingData[3:], expected[2:]):
+        assert section.guidingStart == batch.guidingStart
+        assert section.guidingEnd == batch.guidingEnd
+        assert (section.raRate, section.decRate) == (batch.raRate, batch.decRate)
+        assert section.data.tobytes() == batch.data.tobytes()
+
+
+def testFollowKeepsSectionsOfOtherLogs(tmp_path, mocker):
+    path = tmp_path / "PHD2_GuideLog.txt"
+    path.write_bytes(readBytes())
+    session = SessionData()
+    session.createNew()
+    session.readGuidingData(str(path))
+    other = otherSection()
+    session.addGuidingData([other])
+    before = list(session.guidingData.guidingData)
+
+    feed = mocker.spy(GuidingLogParser, "feed")
+    follower = session.followGuidingData()
+    assert other in session.guidingData.guidingData
+    assert session.guidingData.guidingData[:len(before)] == before
+    assert len(session.guidingData.guidingData) == len(before) + 1, "Only the open section is new"
+    assert feed.call_count < len(readBytes().splitlines()) // 2, "The log was parsed again"
+    assert session.followGuidingData() is follower
@@ -0,0 +1,58 @@
+from GuideLogCache import GuideLogCache
+from GuideLogIndex import GuideLogIndex, readOverlappingSections
+from GuidingData import parseGuidingLog, parseTime
+
+LOG = "testdata/guiding/PHD2_GuideLog_2024-01-10_203000.txt"
+
+
+def parseAll():
+    with open(LOG) as file:
+        return list(parseGuidingLog(file))
+
+
+def assertSameSection(section, expected):
+    assert section.guidingStart == expected.guidingStart
+    assert section.guidingEnd == expected.guidingEnd
+    assert (section.raRate, section.decRate) == (expected.raRate, expected.decRate)
+    assert (section.maxsnr, section.maxStarmass) == (expected.maxsnr, expected.maxStarmass)
+    assert section.data.tobytes() == expected.data.tobytes()
+
+
+def testIndex():
+    expected = parseAll()
+    index = GuideLogIndex(LOG)
+    assert len(index) == len(expected), "Unterminated last section must not be indexed"
+    assert list(index.guidingStart) == [section.guidingStart for section in expected]
+    assert list(index.guidingEnd) == [section.guidingEnd for section in expected]
+
+    sections = index.readSections(index.guidingStart, index.guidingEnd)
+    assert len(sections) == len(expected)
+    for section, batch in zip(sections, expected):
+        assertSameSection(section, batch)
+
+
+def testOverlapping():
+    expected = parseAll()
+    index = GuideLogIndex(LOG)
+    second = expected[1]
+    # Windows inside the second section, before all sections and in a gap between sections
+    jd1 = [second.guidingStart + 1.0 / 86400.0, parseTime("2024-01-10 19:00:00"), parseTime("2024-01-10 20:50:00")]
+    jd2 = [second.guidingStart + 3.0 / 86400.0, parseTime("2024-01-10 19:10:00"), parseTime("2024-01-10 20:55:00")]
+    assert list(index.findOverlapping(jd1, jd2)) == [1]
+
+    sections = index.readSections(jd1, jd2)
+    assert len(sections) == 1
+    assertSameSection(sections[0], second)
+
+    assert len(index.findOverlapping([], [])) == 0
+
+
+def testCachedSections(tmp_path):
+    cache = GuideLogCache(tmp_path)
+    cache.readGuidingLog(LOG)
+    expected = parseAll()
+    first = expected[0]
+    sections = readOverlappingSections(LOG, first.guidingStart, first.guidingStart, cache)
+    assert len(sections) == 1
+    assertSameSection(sections[0], first)
+    assert cache.getCounts() == (1, 1)
@@ -0,0 +1,48 @@
+from GuidingData import GuidingSessionData, GuidingData, parseTime
+
+LOG = "testdata/guiding/PHD2_GuideLog_2024-01-10_203000.txt"
+
+
+def linearGuidingFrames(data, jd1, jd2):
+    """
+    Reference: scan all frames of all overlapping sections.
+    """
+    values = []
+    for gd in data.guidingData:
+        if gd.guidingEnd < jd1 or gd.guidingStart > jd2:
+            continue
+        for frame in gd.frames:
+            if jd1 <= frame.time <= jd2:
+                values.append((frame.frame, frame.time))
+    return values
+
+def testSameFramesAsLinearScan():
+    data = GuidingSessionData()
+    data.readGuidingSessionData(LOG)
+    times = [f.time for gd in data.guidingData for f in gd.frames]
+    start = parseTime("2024-01-10 20:30:00")
+    windows = [(start, start + 1.0), (times[0], times[0]), (times[1], times[5]), (times[6], times[8]),
+               (times[2] - 1e-7, times[2] + 1e-7), (start, start + 1e-3), (times[-1] + 1e-6, times[-1] + 1.0)]
+    for (jd1, jd2) in windows:
+        frames = [(f.frame, f.time) for f in data.getGuidingFrames(jd1, jd2)]
+        assert frames == linearGuidingFrames(data, jd1, jd2)
+    assert len(data.getGuidingFrames(start, start + 1.0)) == data.count()
+
+def testIndexIsRebuiltOnChange():
+    data = GuidingSessionData()
+    data.readGuidingSessionData(LOG)
+    start = parseTime("2024-01-10 20:30:00")
+    assert len(data.getGuidingFrames(start, start + 1.0)) == 12
+
+    section = GuidingData()
+    section.guidingStart = start + 0.5
+    section.guidingEnd = start + 0.6
+    section.setFrames([(1, start + 0.55, 0, 0, 0.1, 0.2, 0.1, 0.2, 10, 1, 10, 3, 0, 0, 100, 10, False, 0)])
+    data.guidingData.append(section)
+    assert len(data.getGuidingFrames(start, start + 1.0)) == 13
+    assert data.getGuidingFrames(start + 0.54, start + 0.56)[0].raDirection == 'E'
+
+def testEmpty():
+    data = GuidingSessionData()
+    assert data.getGuidingFrames(0.0, 1e7) == []
+    assert len(data.getGuidingFrameIndices(0.0, 1e7)) == 0
@@ -0,0 +1,75 @@
+import pytest
+
+from GuidingData import GuidingSessionData, parseGuidingLog, parseTime
+
+LOG = "testdata/guiding/PHD2_GuideLog_2024-01-10_203000.txt"
+
+
+def readLog():
+    data = GuidingSessionData()
+    data.readGuidingSessionData(LOG)
+    return data
+
+def testSections():
+    data = readLog()
+    sections = data.guidingData
+    assert len(sections) == 3, "Unterminated last section must be ignored"
+    assert data.count() == 7 + 2 + 3
+
+    assert sections[0].guidingStart == parseTime("2024-01-10 20:40:00")
+    assert sections[0].guidingEnd == parseTime("2024-01-10 20:40:20")
+    # Section ended by the next "Guiding Begins"
+    assert sections[1].guidingEnd == parseTime("2024-01-10 21:10:00")
+    assert sections[2].guidingStart == sections[1].guidingEnd
+
+def testFrames():
+    frames = readLog().guidingData[0].frames
+    assert [f.frame for f in frames] == [1, 2, 3, 4, 5, 6, 8], "Dropped frame 7 must be skipped"
+    assert [f.settlingAfterDither for f in frames] == [False, False, False, True, True, False, False]
+
+    first = frames[0]
+    assert first.time == pytest.approx(parseTime("2024-01-10 20:40:00") + 2.014 / 86400.0)
+    # Distances are stored as float32
+    assert (first.dx, first.dy) == pytest.approx((0.12, -0.08), rel=1e-6)
+    assert (first.raRawDistance, first.decRawDistance) == pytest.approx((0.14, 0.03), rel=1e-6)
+    assert first.raDirection == 'W'
+    assert first.decDirection == 'N'
+    assert first.xStep is None
+    assert first.errorCode == 0
+
+def testNormalization():
+    section = readLog().guidingData[0]
+    assert section.maxsnr == 40.0
+    assert section.maxStarmass == 14000
+    assert max(f.snr for f in section.frames) == 1.0
+    assert section.frames[0].snr == 0.75
+    assert max(f.starMass for f in section.frames) == 1.0
+
+def testGuideSpeedPerSection():
+    sections = readLog().guidingData
+    assert (sections[0].raRate, sections[0].decRate) == (7.5, 7.5)
+    assert (sections[2].raRate, sections[2].decRate) == (15.0, 10.0)
+
+def testParseIsLazy():
+    with open(LOG) as file:
+        sections = parseGuidingLog(file)
+        first = next(sections)
+        assert len(first.frames) == 7
+        assert not file.closed
+
+def testFrameView():
+    section = readLog().guidingData[0]
+    assert section.data.dtype.itemsize < 80
+    frames = section.frames
+    assert len(frames) == 7
+    assert frames[-1].frame == 8
+    assert [f.frame for f in frames[1:3]] == [2, 3]
+    with pytest.raises(IndexError):
+        frames[7]
+    assert list(section.getSnr()) == pytest.approx([f.snr for f in frames])
+    assert list(section.getStarMass()) == pytest.approx([f.starMass for f in frames])
+
+def testMissingValues():
+    section = readLog().guidingData[0]
+    assert section.frames[0].xStep is None
+    assert section.frames[0].yStep is None
@@ -0,0 +1,100 @@
+import os
+import pickle
+import shutil
+
+from HeaderCache import HeaderCache
+from SessionData import LIGHTFRAMEKEYS, scanLightFrameHeaders
+from SessionImport.Importers.FitsImporter import FitsImporter
+
+
+def copyLight(tmp_path, name="LIGHT.fits"):
+    dest = tmp_path / name
+    shutil.copy("testdata/fits/LIGHT.fits", dest)
+    return str(dest)
+
+def testMissThenHit(tmp_path):
+    cache = HeaderCache(tmp_path / "cache.sqlite")
+    f = copyLight(tmp_path)
+    assert cache.lookup(f) is None
+    header = cache.readFitsHeader(f)
+    assert header["OBJECT"] == "M 81 M 82"
+    assert cache.readFitsHeader(f) == header
+    assert cache.getCounts() == (1, 2, 0)
+
+def testKeySetsAreSeparate(tmp_path):
+    cache = HeaderCache(tmp_path / "cache.sqlite")
+    f = copyLight(tmp_path)
+    cache.readFitsHeader(f, ["OBJECT"])
+    assert cache.lookup(f) is None, "Projected header returned for a full header lookup"
+    assert cache.lookup(f, ["OBJECT"]) == {"OBJECT": "M 81 M 82"}
+
+def testChangedFileIsInvalidated(tmp_path):
+    cache = HeaderCache(tmp_path / "cache.sqlite")
+    f = copyLight(tmp_path)
+    cache.readFitsHeader(f)
+    stat = os.stat(f)
+    os.utime(f, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+    assert cache.lookup(f) is None
+    assert len(cache) == 0
+
+def testInvalidate(tmp_path):
+    cache = HeaderCache(tmp_path / "cache.sqlite")
+    f = copyLight(tmp_path)
+    cache.readFitsHeader(f)
+    cache.invalidate(f)
+    assert len(cache) == 0
+
+def testEviction(tmp_path):
+    cache = HeaderCache(tmp_path / "cache.sqlite", maxEntries=10)
+    files = [copyLight(tmp_path, "L%i.fits" % i) for i in range(12)]
+    for f in files:
+        cache.readFitsHeader(f, ["OBJECT"])
+    assert len(cache) <= 10
+    assert cache.getCounts()[2] > 0
+    assert cache.lookup(files[-1], ["OBJECT"]) is not None, "Most recent entry was evicted"
+
+def testPersistentAndPicklable(tmp_path):
+    cache = HeaderCache(tmp_path / "cache.sqlite")
+    f = copyLight(tmp_path)
+    header = cache.readFitsHeader(f)
+    cache.close()
+
+    other = pickle.loads(pickle.dumps(cache))
+    assert other.lookup(f) == header
+
+def testScanUsesCache(tmp_path):
+    cache = HeaderCache(tmp_path / "cache.sqlite")
+    copyLight(tmp_path)
+    first = scanLightFrameHeaders(tmp_path, ["LIGHT.fits"], cache=cache)
+    second = scanLightFrameHeaders(tmp_path, ["LIGHT.fits"], cache=cache)
+    assert first == second
+    assert cache.getCounts()[0] == 1
+    assert cache.lookup(tmp_path / "LIGHT.fits", LIGHTFRAMEKEYS) is not None
+
+def testFitsImporterUsesCache(tmp_path, mocker):
+    cache = HeaderCache(tmp_path / "cache.sqlite")
+    imp = FitsImporter(cache=cache)
+    f = "testdata/fits/session/A.fits"
+    assert imp.process(f)
+    assert imp.process(f)
+    assert cache.getCounts()[0] == 1
+
+    data = mocker.Mock()
+    imp.store(data)
+    data.add.assert_called_once_with({"Id": {0: "A", 1: "A"}, "filename": {0: f, 1: f}, "SIMPLE": {0: True, 1: True},
+                                      "BITPIX": {0: 8, 1: 8}, "NAXIS": {0: 0, 1: 0}, "AAA": {0: 1, 1: 1}})
+
+def testFitsImporterUsesOneTransactionPerBatch(tmp_path, mocker):
+    cache = HeaderCache(tmp_path / "cache.sqlite")
+    lookups = mocker.spy(cache, "lookupMany")
+    stores = mocker.spy(cache, "storeMany")
+    imp = FitsImporter(cache=cache)
+    files = ["testdata/fits/session/A.fits", "testdata/fits/session/B.fits", "testdata/fits/session/C.fits"]
+    results = imp.parseBatch(files)
+    assert [row["Id"] for (row, _) in results] == ["A", "B", "C"]
+    assert (lookups.call_count, stores.call_count) == (1, 1)
+    assert cache.getCounts()[:2] == (0, 3)
+
+    assert [row for (row, _) in imp.parseBatch(files)] == [row for (row, _) in results]
+    assert (lookups.call_count, stores.call_count) == (2, 2)
+    assert cache.getCounts()[:2] == (3, 3)
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from JulianDate import convertToJulianDate, convertToJulianDates, getJulianDate, getJulianDates
+
+
+def randomTimestamps(count, fraction, separator='T', seed=1):
+    rng = np.random.default_rng(seed)
+    values = []
+    for _ in range(count):
+        stamp = "%04i-%02i-%02i%s%02i:%02i:%02i" % (rng.integers(1500, 2100), rng.integers(1, 13), rng.integers(1, 29),
+                                                    separator, rng.integers(0, 24), rng.integers(0, 60),
+                                                    rng.integers(0, 60))
+        if fraction > 0:
+            stamp += "." + "".join(str(d) for d in rng.integers(0, 10, fraction))
+        values.append(stamp)
+    return values
+
+@pytest.mark.parametrize("fraction", [0, 1, 3, 6])
+def testIdenticalToScalar(fraction):
+    values = randomTimestamps(500, fraction)
+    expected = np.array([convertToJulianDate(value) for value in values])
+    assert np.array_equal(convertToJulianDates(values), expected)
+
+def testPHD2Timestamps():
+    values = randomTimestamps(100, 0, separator=' ')
+    expected = np.array([convertToJulianDate(value.replace(' ', 'T')) for value in values])
+    assert np.array_equal(convertToJulianDates(values), expected)
+
+def testMixedWidths():
+    values = ["2024-01-10T19:40:01.396", "2024-01-10T19:40:01", "2024-01-10 19:40:01.5", " 2024-1-9T1:2:3 "]
+    expected = np.array([convertToJulianDate(value.strip()) for value in values[:3]] +
+                        [convertToJulianDate("2024-01-09T01:02:03")])
+    assert np.array_equal(convertToJulianDates(values), expected)
+
+def testSeries():
+    values = pd.Series(["2024-01-10T19:40:01.396", "2024-01-10T19:43:01.396"], index=[5, 3])
+    result = convertToJulianDates(values)
+    assert result[1] - result[0] == pytest.approx(180.0 / 86400.0)
+    assert len(convertToJulianDates([])) == 0
+
+def testInvalid():
+    with pytest.raises(ValueError):
+        convertToJulianDates(["2024-01-10T19:40:01", "yesterday"])
+
+def testGetJulianDates():
+    components = [(1582, 10, 4, 12, 0, 0.0), (1582, 10, 15, 12, 0, 0.0), (2000, 1, 1, 12, 0, 0.0),
+                  (2024, 2, 29, 23, 59, 59.999)]
+    expected = np.array([getJulianDate(*c) for c in components])
+    assert np.array_equal(getJulianDates(*zip(*components)), expected)
+    assert expected[2] + 2400000.5 == 2451545.0
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+import DataColumn as Columns
+from SessionData import SessionData
+
+
+def testIndicesAreStableRanks():
+    indices = SessionData.getExposureIndices([3.0, 1.0, 2.0, 1.0, np.nan, 0.5])
+    # Equal start times are numbered in row order, missing start times come last
+    assert list(indices) == [5, 2, 4, 3, 6, 1]
+
+
+def testIndicesWithinGroups():
+    indices = SessionData.getExposureIndices([3.0, 1.0, 2.0, 4.0, 0.0], ['b', 'a', 'b', 'a', 'b'])
+    assert list(indices) == [3, 1, 2, 2, 1]
+
+
+def testSetExposureIndices():
+    # Two nights in Europe, the second night starts at local noon
+    jd = [2460320.40, 2460320.45, 2460320.60, 2460321.40, 2460321.41, 2460320.50]
+    frame = pd.DataFrame({Columns.EXPSTARTJDD: jd, Columns.SITELONG: [11.5] * 6,
+                          Columns.OBJECT: ['M31', 'M31', 'M33', 'M31', 'M33', 'M33']})
+    SessionData.setExposureIndices(frame)
+    assert list(frame[Columns.INDEX]) == [1, 2, 4, 5, 6, 3]
+    assert list(frame[Columns.NIGHTINDEX]) == [1, 2, 4, 1, 2, 3]
+    assert list(frame[Columns.TARGETINDEX]) == [1, 2, 2, 3, 3, 1]
+
+
+def testManyExposures():
+    rng = np.random.default_rng(11)
+    jd = 2460000.0 + rng.integers(0, 20000, 50000) / 100.0
+    indices = SessionData.getExposureIndices(jd)
+    assert sorted(indices) == list(range(1, 50001))
+    assert np.all(np.diff(jd[np.argsort(indices)]) >= 0)
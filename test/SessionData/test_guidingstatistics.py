@@ -0,0 +1,97 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import DataColumn as Columns
+from GuidingData import GuidingData, GuidingSessionData
+from GuidingStatistics import STATISTICS, analyseExposures
+from SessionData import SessionData
+
+START = 2460320.5
+STEP = 2.0 / 86400.0
+
+
+def createGuidingData(seed=1):
+    """
+    Three sections of random guiding frames with a few missing values, the second one starting right at the
+    end of the first.
+    """
+    rng = np.random.default_rng(seed)
+    data = GuidingSessionData()
+    for (start, count) in [(START, 400), (START + 400 * STEP, 300), (START + 0.1, 500)]:
+        rows = []
+        for i in range(count):
+            ra, dec = rng.normal(0.0, 0.8, 2)
+            snr = rng.uniform(10.0, 50.0)
+            mass = rng.uniform(5000.0, 20000.0)
+            if rng.uniform() < 0.03:
+                ra = math.nan
+            if rng.uniform() < 0.02:
+                snr = math.nan
+            rows.append((i + 1, start + (i + 0.5) * STEP, ra, dec, ra, dec, 0.7 * ra, 0.7 * dec,
+                         100, 1, 100, 3, math.nan, math.nan, mass, snr, False, 0))
+        section = GuidingData()
+        section.guidingStart = start
+        section.guidingEnd = start + count * STEP
+        section.setFrames(rows)
+        data.guidingData.append(section)
+    return data
+
+def createExposures(count=60, seed=2):
+    rng = np.random.default_rng(seed)
+    jd1 = START + np.where(rng.uniform(size=count) < 0.7, rng.uniform(-0.0005, 0.0165, count),
+                           0.1 + rng.uniform(-0.0005, 0.012, count))
+    exposure = rng.choice([30.0, 60.0, 120.0, 300.0], count)
+    pixelSize = rng.uniform(0.5, 2.0, count)
+    return jd1, jd1 + exposure / 86400.0, pixelSize
+
+def testSameAsAnalyseFrames():
+    data = createGuidingData()
+    jd1, jd2, pixelSize = createExposures()
+    result = analyseExposures(data.getIndex(), jd1, jd2, pixelSize)
+
+    withFrames = 0
+    for i in range(len(jd1)):
+        frames = data.getGuidingFrames(jd1[i], jd2[i])
+        assert result['count'][i] == len(frames)
+        if len(frames) == 0:
+            assert math.isnan(result['rms'][i])
+            continue
+        withFrames += 1
+        expected = SessionData.analyseFrames(frames, pixelSize[i])
+        for name in STATISTICS:
+            assert result[name][i] == pytest.approx(getattr(expected, name), rel=1e-12, abs=1e-15), name
+    assert withFrames > 45, "Test exposures should mostly overlap guiding"
+
+def createImageData(jd1, jd2, pixelSize):
+    return pd.DataFrame({Columns.FOCALLENGTH: [500.0] * len(jd1),
+                         Columns.PIXSIZE: pixelSize * 500.0 / 206.0,
+                         Columns.EXPSTARTJDD: jd1,
+                         Columns.EXPOSURE: (jd2 - jd1) * 86400.0})
+
+def testAnalyzeAllGuidingFrames():
+    data = createGuidingData()
+    jd1, jd2, pixelSize = createExposures()
+    inside = (jd1 > START) & (jd2 < START + 700 * STEP)
+    imageData = createImageData(jd1[inside], jd2[inside], pixelSize[inside])
+
+    SessionData().analyzeAllGuidingFrames(data, imageData)
+
+    for i, (_, image) in enumerate(imageData.iterrows()):
+        pixSize = 206.0 * image[Columns.PIXSIZE] / image[Columns.FOCALLENGTH]
+        frames = data.getGuidingFrames(image[Columns.EXPSTARTJDD],
+                                       image[Columns.EXPSTARTJDD] + image[Columns.EXPOSURE] / 86400.0)
+        expected = SessionData.analyseFrames(frames, pixSize)
+        assert image[Columns.RMS] == pytest.approx(expected.rms, rel=1e-12)
+        assert image[Columns.GUIDINGPIX] == pytest.approx(expected.pixelTotal, rel=1e-12)
+        assert image[Columns.GUIDINGPEAKSRA] == expected.numPeaksRA
+        assert image[Columns.GUIDINGMINSTARMASS] == pytest.approx(expected.minStarmass, rel=1e-12)
+
+def testAllOrNothing():
+    data = createGuidingData()
+    jd1 = np.array([START + 0.001, START + 1.0])
+    imageData = createImageData(jd1, jd1 + 60.0 / 86400.0, np.array([1.0, 1.0]))
+    SessionData().analyzeAllGuidingFrames(data, imageData)
+    assert Columns.RMS not in imageData.columns, "Exposure without guiding must leave the columns unset"
@@ -0,0 +1,76 @@
+import os
+import time
+
+from astropy.io import fits
+
+import DataColumn as Columns
+from LightFrameWatcher import LightFrameWatcher
+from SessionData import SessionData
+
+
+def writeLight(folder, name, start):
+    header = fits.getheader("testdata/fits/LIGHT.fits")
+    header['DATE-LOC'] = start
+    fits.PrimaryHDU(header=header).writeto(os.path.join(folder, name))
+
+def createSession(folder):
+    writeLight(folder, "L2.fits", '2024-01-10T20:43:01.000')
+    writeLight(folder, "L1.fits", '2024-01-10T20:40:01.000')
+    data = SessionData()
+    data.createNew()
+    data.parseLightFrames(str(folder), ["L2.fits", "L1.fits"])
+    return data
+
+def testAppendLightFrames(tmp_path):
+    data = createSession(tmp_path)
+    writeLight(tmp_path, "L0.fits", '2024-01-10T20:37:01.000')
+    assert data.appendLightFrames(["L0.fits"]) == 1
+    assert list(data.data[Columns.FNAME]) == ["L0.fits", "L1.fits", "L2.fits"]
+    assert list(data.data[Columns.INDEX]) == [1, 2, 3]
+
+def testAppendOnlyProcessesNewRows(tmp_path, mocker):
+    data = createSession(tmp_path)
+    mocker.patch.object(data.guidingData, "count", return_value=1)
+    analyze = mocker.patch.object(data, "analyzeAllGuidingFrames")
+    sunMoon = mocker.patch.object(data, "calculateSunMoonPositions")
+
+    writeLight(tmp_path, "L3.fits", '2024-01-10T20:46:01.000')
+    data.appendLightFrames(["L3.fits"])
+    rows = analyze.call_args[0][1]
+    assert list(rows[Columns.FNAME]) == ["L3.fits"]
+    assert list(sunMoon.call_args[0][0][Columns.FNAME]) == ["L3.fits"]
+
+def testWatcherPicksUpNewFrames(tmp_path):
+    data = createSession(tmp_path)
+    watcher = LightFrameWatcher(data, settleTime=0.0)
+    assert watcher.poll() == []
+
+    writeLight(tmp_path, "L3.fits", '2024-01-10T20:46:01.000')
+    (tmp_path / "notes.txt").write_text("not a frame")
+    assert watcher.poll() == ["L3.fits"]
+    assert data.data.shape[0] == 3
+    assert watcher.poll() == []
+
+def testWatcherWaitsForCompleteFiles(tmp_path):
+    data = createSession(tmp_path)
+    watcher = LightFrameWatcher(data, settleTime=3600.0)
+
+    # A file that is still being written: only the first block is there.
+    partial = tmp_path / "L3.fits"
+    with open("testdata/fits/LIGHT.fits", "rb") as f:
+        partial.write_bytes(f.read(2880))
+    assert watcher.poll() == [], "File appended after it was seen for the first time"
+    assert watcher.poll() == [], "Truncated file appended"
+
+    writeLight(tmp_path, "L4.fits", '2024-01-10T20:49:01.000')
+    os.utime(tmp_path / "L4.fits", (time.time() - 7200, time.time() - 7200))
+    assert watcher.poll() == ["L4.fits"], "Old file not appended immediately"
+    assert "L3.fits" not in watcher.known
+
+def testWatcherIgnoresNonLightFrames(tmp_path):
+    data = createSession(tmp_path)
+    watcher = LightFrameWatcher(data, settleTime=0.0)
+    fits.PrimaryHDU(header=fits.getheader("testdata/fits/FLAT.fits")).writeto(tmp_path / "FLAT.fits")
+    writeLight(tmp_path, "L3.fits", '2024-01-10T20:46:01.000')
+    assert watcher.poll() == ["L3.fits"]
+    assert watcher.poll() == []
@@ -0,0 +1,34 @@
+from astropy.io import fits
+import pytest
+
+import DataColumn as Columns
+from SessionData import SessionData, scanLightFrameHeaders, PARALLELSCANMINFILES
+
+
+def testParseLightFrame():
+    data = SessionData()
+    data.createNew()
+    data.parseLightFrames("testdata/fits", ["LIGHT.fits"])
+    assert data.data.shape[0] == 1
+    row = data.data.iloc[0]
+    assert row[Columns.EXPOSURE] == 180.0
+    assert row[Columns.OBJECT] == 'M 81 M 82'
+    assert row[Columns.EXPSTARTJDD] == pytest.approx(2460320.3611272685)
+    assert row[Columns.FOCUSERPOS] is None
+
+def testMissingRequiredKey():
+    with pytest.raises(KeyError):
+        scanLightFrameHeaders("testdata/fits/session", ["A.fits"])
+
+def testParallelScanKeepsFileOrder(tmp_path):
+    header = fits.getheader("testdata/fits/LIGHT.fits")
+    filenames = []
+    for i in range(PARALLELSCANMINFILES + 10):
+        header['EXPOSURE'] = float(i)
+        filenames.append("L%03i.fits" % (PARALLELSCANMINFILES + 10 - i))
+        fits.PrimaryHDU(header=header).writeto(tmp_path / filenames[-1])
+
+    serial = scanLightFrameHeaders(tmp_path, filenames, workers=1)
+    parallel = scanLightFrameHeaders(tmp_path, filenames, workers=3, chunkSize=5)
+    assert parallel[Columns.EXPOSURE] == [float(i) for i in range(len(filenames))]
+    assert serial == parallel
@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import DataColumn as Columns
+from EphemerisCache import EphemerisCache
+from SessionData import SessionData
+from Spherical import getMoonAltAz, getSunAltAz
+
+
+def testInterpolatedMatchesSingleLookups(tmp_path):
+    jd = 2460320.4 + np.arange(6) * 0.02
+    # Two sites, rows interleaved
+    lon = [11.5, -70.7, 11.5, -70.7, 11.5, 11.5]
+    lat = [48.1, -30.2, 48.1, -30.2, 48.1, 48.1]
+    data = SessionData()
+    data.ephemerisCache = EphemerisCache(tmp_path)
+    data.data = pd.DataFrame({Columns.SITELONG: lon, Columns.SITELAT: lat, Columns.EXPSTARTJDD: jd},
+                             index=[10, 11, 12, 13, 14, 15])
+
+    data.calculateSunMoonPositions()
+    assert data.data[Columns.MOONALT].dtype == np.float64
+    assert data.data[Columns.SUNALT].dtype == np.float64
+
+    for (label, row), moon, sun in zip(data.data.iterrows(), data.data[Columns.MOONALT], data.data[Columns.SUNALT]):
+        site = (row[Columns.EXPSTARTJDD], row[Columns.SITELONG], row[Columns.SITELAT])
+        assert moon == pytest.approx(getMoonAltAz(*site).alt.deg, abs=0.01)
+        assert sun == pytest.approx(getSunAltAz(*site).alt.deg, abs=0.01)
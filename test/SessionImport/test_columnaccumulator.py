@@ -0,0 +1,26 @@
+from SessionImport.ColumnAccumulator import ColumnAccumulator
+
+
+def testEmptyAccumulator():
+    acc = ColumnAccumulator()
+    assert len(acc) == 0
+    assert acc.toDict() == {}
+
+def testHeterogeneousRows():
+    acc = ColumnAccumulator()
+    assert acc.addRow({"A": 1, "B": "x"}) == 0
+    assert acc.addRow({"C": 2.5}) == 1
+    assert acc.addRow({"A": 3}) == 2
+
+    assert acc.toDict() == {"A": {0: 1, 1: None, 2: 3},
+                            "B": {0: "x", 1: None, 2: None},
+                            "C": {0: None, 1: 2.5, 2: None}}
+
+def testPresenceDistinguishesNoneValues():
+    acc = ColumnAccumulator()
+    acc.addRow({"A": None})
+    acc.addRow({"B": 1})
+    assert acc.isPresent("A", 0), "Explicit None value should count as present"
+    assert not acc.isPresent("A", 1), "Missing key should not count as present"
+    assert list(acc.presence("A")) == [1, 0]
+    assert list(acc.presence("B")) == [0, 1]
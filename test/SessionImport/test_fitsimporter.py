@@ -18,12 +18,15 @@ def testFitsAcceptance():
     assert imp.wantProcess("A.fits"), "FitsImporter does not process A.fits"
     assert imp.wantProcess("A.fts"), "FitsImporter does not process A.fts"
     assert imp.wantProcess("A.fit"), "FitsImporter does not process A.fit"
+    assert imp.wantProcess("A.fits.fz"), "FitsImporter does not process A.fits.fz"
+    assert imp.wantProcess("A.fits.gz"), "FitsImporter does not process A.fits.gz"
 
 def testNonAcceptance():
     imp = FitsImporter()
     assert not imp.wantProcess("A.xisf"), "FitsImporter accepts XISF, what's that?"
     assert not imp.wantProcess("A.nef"), "FitsImporter accepts NEF, what's that?"
     assert not imp.wantProcess("A.cr2"), "FitsImporter accepts CR2, what's that?"
+    assert not imp.wantProcess("A.tar.gz"), "FitsImporter accepts TAR.GZ, what's that?"
 
 def testImportInvalidFits():
     imp = FitsImporter()
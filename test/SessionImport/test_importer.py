@@ -0,0 +1,125 @@
+import os
+import threading
+import time
+
+from SessionImport.Importer import Importer, walkFiles
+from SessionImport.Importers.ImporterBase import ImporterBase
+
+
+class SlowImporter(ImporterBase):
+    def __init__(self):
+        super().__init__()
+        self.files = []
+        self.maxQueued = 0
+
+    def wantProcess(self, file: str) -> bool:
+        return file.endswith('.txt')
+
+    def process(self, file: str) -> bool:
+        self.maxQueued = max(self.maxQueued, self.getQueueDepth())
+        time.sleep(0.001)
+        self.files.append(file)
+        return True
+
+    def store(self, data) -> bool:
+        return False
+
+
+class FailingImporter(SlowImporter):
+    def process(self, file: str) -> bool:
+        if os.path.basename(file) == "1.txt":
+            raise ValueError("Cannot process " + file)
+        return super().process(file)
+
+
+class FailingBatchImporter(ImporterBase):
+    def wantProcess(self, file: str) -> bool:
+        return file.endswith('.txt')
+
+    def parse(self, file: str):
+        return file
+
+    def parseBatch(self, files: list) -> list:
+        if os.path.basename(files[0]) == "1.txt":
+            raise ValueError("Cannot parse batch")
+        return super().parseBatch(files)
+
+    def store(self, data) -> bool:
+        return False
+
+
+def createTree(root):
+    for d in ["b", "a", os.path.join("a", "c")]:
+        os.makedirs(os.path.join(root, d), exist_ok=True)
+    files = []
+    for d in ["", "a", os.path.join("a", "c"), "b"]:
+        for name in ["2.txt", "1.txt", "skip.dat"]:
+            path = os.path.join(root, d, name)
+            with open(path, "w") as f:
+                f.write("x")
+            files.append(path)
+    return files
+
+def testWalkFilesIsSorted(tmp_path):
+    createTree(str(tmp_path))
+    walked = [os.path.relpath(f, tmp_path) for f in walkFiles(str(tmp_path))]
+    assert walked == ["1.txt", "2.txt", "skip.dat",
+                      os.path.join("a", "1.txt"), os.path.join("a", "2.txt"), os.path.join("a", "skip.dat"),
+                      os.path.join("a", "c", "1.txt"), os.path.join("a", "c", "2.txt"), os.path.join("a", "c", "skip.dat"),
+                      os.path.join("b", "1.txt"), os.path.join("b", "2.txt"), os.path.join("b", "skip.dat")]
+
+def testBoundedQueue(tmp_path):
+    createTree(str(tmp_path))
+    importer = Importer(queueDepth=1, batchSize=2)
+    imp = SlowImporter()
+    importer.addImporter(imp)
+    importer.setImportDirectory(str(tmp_path))
+    importer.runImport()
+    while importer.isrunning():
+        time.sleep(0.01)
+
+    assert imp.getProcessedCounts() == (8, 0, 8)
+    assert imp.maxQueued <= 1, "Queue grew beyond its depth"
+    assert [os.path.basename(f) for f in imp.files] == ["1.txt", "2.txt"] * 4
+
+    timings = importer.getTimings()
+    assert timings["walk"] is not None
+    assert timings["importers"]["SlowImporter"]["processing"] > 0.0
+
+
+def testFailingProcessDoesNotBlockImport(tmp_path):
+    createTree(str(tmp_path))
+    importer = Importer(queueDepth=1, batchSize=1)
+    imp = FailingImporter()
+    importer.addImporter(imp)
+    importer.setImportDirectory(str(tmp_path))
+    # With a full queue a dead worker would block the walk forever, so walk in a thread
+    walk = threading.Thread(target=importer.runImport, daemon=True)
+    walk.start()
+    walk.join(10.0)
+    deadline = time.perf_counter() + 10.0
+    while importer.isrunning() and time.perf_counter() < deadline:
+        time.sleep(0.01)
+
+    assert not walk.is_alive(), "Walk blocked"
+    assert not importer.isrunning(), "Import did not finish"
+    assert imp.getProcessedCounts() == (4, 4, 8)
+    assert [os.path.basename(f) for f in imp.files] == ["2.txt"] * 4
+
+
+def testFailingBatchDoesNotBlockImport(tmp_path):
+    createTree(str(tmp_path))
+    importer = Importer(queueDepth=1, batchSize=1)
+    imp = FailingBatchImporter()
+    importer.addImporter(imp)
+    importer.setImportDirectory(str(tmp_path))
+    walk = threading.Thread(target=importer.runImport, daemon=True)
+    walk.start()
+    walk.join(10.0)
+    deadline = time.perf_counter() + 10.0
+    while importer.isrunning() and time.perf_counter() < deadline:
+        time.sleep(0.01)
+
+    assert not walk.is_alive(), "Walk blocked"
+    assert not importer.isrunning(), "Import did not finish"
+    assert imp.getProcessedCounts() == (4, 4, 8)
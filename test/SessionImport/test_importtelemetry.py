@@ -0,0 +1,58 @@
+import json
+import time
+
+from SessionImport.Importer import Importer
+from SessionImport.ImportTelemetry import ImportTelemetry, percentile
+from SessionImport.Importers.FitsImporter import FitsImporter
+
+
+def testPercentile():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile(values, 100) == 100
+    assert percentile([3.0], 90) == 3.0
+    assert percentile([], 50) is None
+
+def testRecordFiles():
+    telemetry = ImportTelemetry()
+    telemetry.start()
+    for latency in [0.1, 0.2, 0.3, 0.4]:
+        telemetry.recordFile(latency, 100, True)
+    telemetry.recordFile(0.5, 0, False)
+    telemetry.recordQueued(3)
+    telemetry.recordQueued(1)
+
+    snapshot = telemetry.getSnapshot()
+    assert snapshot["files"] == 4
+    assert snapshot["skipped"] == 1
+    assert snapshot["bytes"] == 400
+    assert snapshot["maxQueued"] == 3
+    assert snapshot["latency"] == {"p50": 0.3, "p90": 0.5, "p99": 0.5, "max": 0.5}
+    assert abs(snapshot["parseTime"] - 1.5) < 1e-9
+    assert snapshot["filesPerSecond"] > 0
+    assert snapshot["storeTime"] is None
+
+def testImportTelemetry(tmp_path, mocker):
+    importer = Importer()
+    imp = FitsImporter()
+    importer.addImporter(imp)
+    importer.setImportDirectory("testdata/fits/session")
+    importer.runImport()
+    while importer.isrunning():
+        time.sleep(0.01)
+    importer.storeData(mocker.Mock())
+
+    name = tmp_path / "telemetry.json"
+    importer.dumpTelemetry(name)
+    with open(name) as file:
+        telemetry = json.load(file)
+
+    assert telemetry["files"] == 3
+    assert telemetry["walkFinished"]
+    assert telemetry["walk"] >= 0
+    fits = telemetry["importers"]["FitsImporter"]
+    assert fits["files"] == 3 and fits["skipped"] == 0 and fits["total"] == 3
+    assert fits["bytes"] == 3 * 2880
+    assert fits["storeTime"] >= 0
+    assert fits["latency"]["p50"] <= fits["latency"]["max"]
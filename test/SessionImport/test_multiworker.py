@@ -0,0 +1,111 @@
+import os
+import pickle
+import random
+import time
+
+from HeaderCache import HeaderCache
+
+from SessionImport.Importer import Importer
+from SessionImport.Importers.ImporterBase import ImporterBase, THREAD, PROCESS
+from SessionImport.Importers.FitsImporter import FitsImporter
+
+
+class ParseImporter(ImporterBase):
+    def wantProcess(self, file: str) -> bool:
+        return file.endswith('.txt')
+
+    def parse(self, file: str):
+        time.sleep(random.random() * 0.002)
+        name = os.path.basename(file)
+        if name.startswith("skip"):
+            return None
+        return name
+
+    def store(self, data) -> bool:
+        return False
+
+
+class ProcessImporter(ParseImporter):
+    def process(self, file: str) -> bool:
+        return True
+
+
+def createFiles(root, count):
+    names = []
+    for i in range(count):
+        name = "%03i.txt" % i if i % 10 != 5 else "skip%03i.txt" % i
+        with open(os.path.join(root, name), "w") as f:
+            f.write("x")
+        names.append(name)
+    return names
+
+
+def runImport(root, imp):
+    importer = Importer(batchSize=3)
+    importer.addImporter(imp)
+    importer.setImportDirectory(str(root))
+    importer.runImport()
+    while importer.isrunning():
+        time.sleep(0.01)
+
+
+def testThreadWorkersKeepFileOrder(tmp_path):
+    names = createFiles(str(tmp_path), 100)
+    imp = ParseImporter(workers=4)
+    assert imp.workers == 4
+    runImport(tmp_path, imp)
+
+    assert imp.getProcessedCounts() == (90, 10, 100)
+    assert imp.getResults() == [n for n in names if not n.startswith("skip")]
+
+def testLegacyImporterUsesSingleWorker():
+    imp = ProcessImporter()
+    imp.setWorkers(4, PROCESS)
+    assert imp.workers == 1
+    assert imp.workerMode == THREAD
+
+def testProcessWithoutWorkers():
+    imp = ParseImporter()
+    assert imp.process("a.txt")
+    assert not imp.process("skip.txt")
+    assert imp.process("b.txt")
+    assert imp.getResults() == ["a.txt", "b.txt"]
+
+def testFitsImportInWorkerProcesses(mocker):
+    mocker.patch("SessionImport.Importers.ImporterBase.PROCESSMINFILES", 0)
+    pool = mocker.spy(ImporterBase, "_getPool")
+    imp = FitsImporter()
+    imp.setWorkers(2, PROCESS)
+    runImport("testdata/fits/session", imp)
+    assert any(result is not None for result in pool.spy_return_list)
+
+    assert imp.getProcessedCounts() == (3, 0, 3)
+    data = mocker.Mock()
+    assert imp.store(data)
+    stored = data.add.call_args[0][0]
+    assert stored["Id"] == {0: "A", 1: "B", 2: "C"}
+    assert stored["AAA"] == {0: 1, 1: None, 2: None}
+    assert stored["BBB"] == {0: None, 1: 1, 2: None}
+
+def testFewFilesAreParsedInThreads(mocker):
+    pool = mocker.spy(ImporterBase, "_getPool")
+    imp = FitsImporter()
+    imp.setWorkers(2, PROCESS)
+    runImport("testdata/fits/session", imp)
+
+    assert imp.getProcessedCounts() == (3, 0, 3)
+    assert pool.call_count > 0
+    assert all(result is None for result in pool.spy_return_list)
+
+def testCacheStaysInParentProcess(tmp_path, mocker):
+    mocker.patch("SessionImport.Importers.ImporterBase.PROCESSMINFILES", 0)
+    cache = HeaderCache(tmp_path / "cache.sqlite")
+    imp = FitsImporter(cache=cache)
+    assert pickle.loads(pickle.dumps(imp)).cache is None
+    imp.setWorkers(2, PROCESS)
+    runImport("testdata/fits/session", imp)
+    imp.reset()
+    runImport("testdata/fits/session", imp)
+
+    assert imp.getProcessedCounts() == (3, 0, 3)
+    assert cache.getCounts()[:2] == (3, 3)
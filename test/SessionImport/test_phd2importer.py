@@ -1,5 +1,18 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+from GuideLogCache import GuideLogCache
+from GuidingData import parseTime
+from SessionData import SessionData
+from SessionImport.Importer import Importer
+from SessionImport.Importers.ImporterBase import ImporterBase, THREAD, PROCESS
 from SessionImport.Importers.PHD2Importer import PHD2Importer
 
+LOG = "testdata/guiding/PHD2_GuideLog_2024-01-10_203000.txt"
+
 
 def testPHD2ImporterEmptyCreation():
     PHD2Importer()
@@ -9,4 +22,83 @@ def testEmptyPHD2ImporterStoresNothing(mocker):
 
     data = mocker.Mock()
     assert not imp.store(data), "Empty PHD2Importer stores somthing? What goes?"
-    data.add.assert_not_called()
\ No newline at end of file
+    data.add.assert_not_called()
+
+
+def testWantProcess():
+    imp = PHD2Importer()
+    assert imp.wantProcess(os.path.abspath(LOG)), "PHD2Importer should accept guide logs given with full path"
+    assert not imp.wantProcess("/session/PHD2_DebugLog_2024-01-10_203000.txt"), "PHD2Importer accepts debug logs"
+    assert not imp.wantProcess("/session/PHD2_GuideLog_2024-01-10_203000.fits")
+
+def testParse():
+    sections = PHD2Importer().parse(LOG)
+    assert len(sections) == 3
+    assert [len(s.frames) for s in sections] == [7, 2, 3]
+
+def createLogs(root):
+    # The log of the first night is found last
+    for (folder, night) in [("a", "2024-01-10"), ("b", "2024-01-09")]:
+        os.makedirs(os.path.join(root, folder))
+        with open(LOG, newline='') as src:
+            text = src.read().replace("2024-01-10", night)
+        with open(os.path.join(root, folder, "PHD2_GuideLog_%s_203000.txt" % night), "w", newline='') as dest:
+            dest.write(text)
+
+@pytest.mark.parametrize("mode", [THREAD, PROCESS])
+def testImportMergesLogsInTimeOrder(tmp_path, mode):
+    createLogs(str(tmp_path))
+    importer = Importer()
+    imp = PHD2Importer()
+    imp.setWorkers(2, mode)
+    importer.addImporter(imp)
+    importer.setImportDirectory(str(tmp_path))
+    importer.runImport()
+    while importer.isrunning():
+        time.sleep(0.01)
+    assert imp.getProcessedCounts() == (2, 0, 2)
+
+    data = SessionData()
+    data.createNew()
+    assert imp.store(data)
+    sections = data.guidingData.guidingData
+    assert len(sections) == 6
+    assert [s.guidingStart for s in sections] == sorted(s.guidingStart for s in sections)
+    assert sections[0].guidingStart == parseTime("2024-01-09 20:40:00")
+    assert data.guidingData.count() == 24
+
+def testAddGuidingDataSkipsDuplicates():
+    data = SessionData()
+    data.createNew()
+    data.addGuidingData(PHD2Importer().parse(LOG))
+    data.addGuidingData(PHD2Importer().parse(LOG))
+    assert len(data.guidingData.guidingData) == 3
+
+def testCachedLogsStayInParentProcess(tmp_path, mocker):
+    createLogs(str(tmp_path))
+    cache = GuideLogCache(tmp_path / "cache")
+    cached = os.path.join(str(tmp_path), "a", "PHD2_GuideLog_2024-01-10_203000.txt")
+    cache.readGuidingLog(cached)
+    parseFiles = mocker.spy(PHD2Importer, "parseFiles")
+    pool = mocker.spy(ImporterBase, "_getPool")
+
+    imp = PHD2Importer(cache=cache)
+    imp.setWorkers(2, PROCESS)
+    importer = Importer()
+    importer.addImporter(imp)
+    importer.setImportDirectory(str(tmp_path))
+    importer.runImport()
+    while importer.isrunning():
+        time.sleep(0.01)
+    assert imp.getProcessedCounts() == (2, 0, 2)
+
+    # Only the log, that was not cached, is parsed, in a worker process, which stores it in the cache
+    assert [os.path.basename(file) for call in parseFiles.call_args_list for file in call.args[1]] == \
+        ["PHD2_GuideLog_2024-01-09_203000.txt"]
+    assert [result for (result, _) in parseFiles.spy_return_list[0]] == \
+        [os.path.join(str(tmp_path), "b", "PHD2_GuideLog_2024-01-09_203000.txt")]
+    assert any(result is not None for result in pool.spy_return_list)
+    assert cache.getCounts() == (1, 2)
+    results = imp.getResults()
+    assert [len(sections) for sections in results] == [3, 3]
+    assert all(isinstance(section.data, np.memmap) for sections in results for section in sections)
@@ -1,5 +1,8 @@
 from astropy.io import fits
+import gzip
 import logging
+import numpy as np
+import shutil
 import sys
 
 
@@ -25,6 +28,19 @@ def dropPictureData(src, dest):
     hdu.writeto(dest, overwrite=True)
 
 
+def compressFits(src, dest):
+    """
+    Write the header of src with a small image as tile compressed (dest.fits.fz) and gzipped (dest.fits.gz) file.
+    """
+    h = fits.getheader(src)
+    data = (np.arange(64 * 48, dtype=np.uint16) % 4096).reshape((48, 64))
+
+    fits.PrimaryHDU(data=data, header=h).writeto(dest + '.fits', overwrite=True)
+    with open(dest + '.fits', 'rb') as fin, gzip.open(dest + '.fits.gz', 'wb') as fout:
+        shutil.copyfileobj(fin, fout)
+    fits.CompImageHDU(data=data, header=h).writeto(dest + '.fits.fz', overwrite=True)
+
+
 def showHeader(src):
     h = fits.getheader(src).cards
     for item in h:
@@ -51,3 +67,6 @@ if __name__ == "__main__":
     # DARK
     # dropPictureData("d:\Bilder\\astroupload\\2024-01-09\DARK\\2024-01-10_09-03-26__-14.80_180.00s_0100.fits", "fits/DARK.fits")
 
+    # Compressed
+    # compressFits("fits/LIGHT.fits", "fits/compressed/LIGHT")
+